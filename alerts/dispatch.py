@@ -0,0 +1,333 @@
+"""Background alert delivery, off the frame loop.
+
+AlertDispatcher.submit() copies the frame and puts the alert on a bounded queue;
+it never blocks on the network. One worker thread takes alerts off the queue,
+JPEG-encodes the frame once and hands the alert to every channel. A channel is
+any object with a name and send(alert). A failed send is retried with
+exponential backoff. Bursts are coalesced: the first alert goes out at once,
+and alerts that arrive within coalesce_seconds of a delivery (or while one is
+in progress) are merged into a single follow-up alert.
+"""
+import base64
+import json
+import logging
+import queue
+import smtplib
+import ssl
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+
+import cv2
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    ALERT_QUEUE_SIZE, ALERT_COALESCE_SECONDS, ALERT_MAX_RETRIES, ALERT_RETRY_BACKOFF, ALERT_RETRY_BACKOFF_MAX,
+)
+from monitoring.metrics import (
+    ALERT_SEND_SECONDS, ALERT_DELIVERY_SECONDS, ALERT_SEND_FAILURES, ALERTS_COALESCED, ALERTS_DROPPED,
+    ALERT_QUEUE_DEPTH,
+)
+
+logger = logging.getLogger(__name__)
+
+# One delivery. messages holds every coalesced alert message, oldest first; message is
+# the first. jpeg is the first alert's frame (None without a frame); created is its
+# time.monotonic() at submit, timestamp its wall-clock time.
+Alert = namedtuple("Alert", ["message", "messages", "count", "jpeg", "created", "timestamp", "location"])
+
+
+class LogChannel:
+    """Writes alerts to the log (stderr without logging configuration)."""
+
+    name = "log"
+
+    def __init__(self, log=logger):
+        self.log = log
+
+    def send(self, alert):
+        more = f" (+{alert.count - 1} more)" if alert.count > 1 else ""
+        self.log.warning("%s%s", alert.message, more)
+
+    def close(self):
+        pass
+
+
+class SMTPChannel:
+    """Email with the alert frame attached, over one SMTP connection kept open between alerts.
+
+    use_ssl: SMTP_SSL (port 465); otherwise plain SMTP upgraded with STARTTLS when the
+    server offers it. password None skips login. A reused connection that the server
+    has closed in the meantime is reopened once without counting as a failure.
+    """
+
+    name = "email"
+
+    def __init__(self, sender, receiver, password=None, server="smtp.gmail.com", port=465, use_ssl=True,
+                 timeout=10.0):
+        self.sender = sender
+        self.receiver = receiver
+        self.password = password
+        self.server = server
+        self.port = port
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self._conn = None
+        self.connections = 0
+
+    def _connect(self):
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.server, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            conn = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+            conn.ehlo()
+            if conn.has_extn("starttls"):
+                conn.starttls(context=ssl.create_default_context())
+                conn.ehlo()
+        if self.password:
+            conn.login(self.sender, self.password)
+        self.connections += 1
+        return conn
+
+    def build_message(self, alert):
+        msg = MIMEMultipart()
+        subject = "🆘 DISTRESS SIGNAL DETECTED"
+        msg['Subject'] = subject if alert.count == 1 else f"{subject} ({alert.count} alerts)"
+        msg['From'] = self.sender
+        msg['To'] = self.receiver
+        body = "\n".join(alert.messages)
+        body += f"\n\nTime: {time.ctime(alert.timestamp)}"
+        if alert.location:
+            body += f"\nLocation: {alert.location}"
+        msg.attach(MIMEText(body, 'plain'))
+        if alert.jpeg is not None:
+            msg.attach(MIMEImage(alert.jpeg, name="distress_frame.jpg"))
+        return msg
+
+    def send(self, alert):
+        msg = self.build_message(alert)
+        reused = self._conn is not None
+        try:
+            if self._conn is None:
+                self._conn = self._connect()
+            self._conn.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            if not reused:
+                raise
+            self._conn = self._connect()
+            self._conn.send_message(msg)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.quit()
+            except Exception:
+                conn.close()
+
+
+class WebhookChannel:
+    """POSTs the alert as JSON: message, messages, count, timestamp, location and,
+    with include_image, the JPEG frame base64-encoded."""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=5.0, include_image=False):
+        self.url = url
+        self.timeout = timeout
+        self.include_image = include_image
+
+    def send(self, alert):
+        payload = {
+            "message": alert.message,
+            "messages": list(alert.messages),
+            "count": alert.count,
+            "timestamp": alert.timestamp,
+            "location": alert.location,
+        }
+        if self.include_image and alert.jpeg is not None:
+            payload["image_jpeg"] = base64.b64encode(alert.jpeg).decode("ascii")
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode(), method="POST",
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()  # urlopen raises HTTPError for 4xx/5xx
+
+    def close(self):
+        pass
+
+
+class AlertDispatcher:
+    """Delivers alerts to channels on a background worker thread."""
+
+    def __init__(self, channels, max_queue=ALERT_QUEUE_SIZE, coalesce_seconds=ALERT_COALESCE_SECONDS,
+                 max_retries=ALERT_MAX_RETRIES, backoff=ALERT_RETRY_BACKOFF, backoff_max=ALERT_RETRY_BACKOFF_MAX,
+                 clock=time.monotonic, sleep=None, name="alerts"):
+        """
+        channels: objects with name, send(alert) (raising on failure) and close().
+        max_queue: alerts waiting for the worker; submit() drops alerts beyond this.
+        max_retries / backoff / backoff_max: a failed send is retried up to max_retries
+            times, waiting backoff * 2**attempt seconds (at most backoff_max) before each.
+        sleep: function(seconds) used between retries; by default a wait that stop() cuts short.
+        name: dispatcher label of its gesture_alert_queue_depth series. Dispatchers that run
+            at the same time need different names, or only the last one is reported.
+        """
+        self.name = name
+        self.channels = list(channels)
+        self.coalesce_seconds = coalesce_seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._sleep = sleep or self._stop.wait
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._last_delivery = None
+        self._thread = None
+        self._sending = threading.Lock()  # channels (an SMTP connection) serve one alert at a time
+        self.submitted = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failures = {channel.name: 0 for channel in self.channels}
+        ALERT_QUEUE_DEPTH.labels(dispatcher=name).set_function(self._queue.qsize)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-dispatch", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, message, frame=None, location=None):
+        """Queue an alert; returns False if the queue was full and the alert was dropped.
+        The frame is copied, so the caller may keep drawing on it."""
+        item = (self.clock(), time.time(), message, None if frame is None else frame.copy(), location)
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+            self.dropped += 1
+            ALERTS_DROPPED.inc()
+            return False
+        self.submitted += 1
+        return True
+
+    def _collect(self):
+        """Next batch of queued alerts, or None when stopping with an empty queue."""
+        while True:
+            try:
+                first = self._queue.get(timeout=0.2)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    return None
+        batch = [first]
+        # Leading edge goes out at once; a follow-up waits out the coalescing window.
+        if self._last_delivery is not None:
+            deadline = self._last_delivery + self.coalesce_seconds
+            while not self._stop.is_set():
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _merge(self, batch):
+        created, timestamp, message, frame, location = batch[0]
+        jpeg = None
+        if frame is not None:
+            ok, buf = cv2.imencode(".jpg", frame)
+            jpeg = buf.tobytes() if ok else None
+        return Alert(message, tuple(item[2] for item in batch), len(batch), jpeg, created, timestamp, location)
+
+    def _send(self, channel, alert):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with ALERT_SEND_SECONDS.labels(channel=channel.name).time():
+                    channel.send(alert)
+                ALERT_DELIVERY_SECONDS.labels(channel=channel.name).observe(self.clock() - alert.created)
+                return True
+            except Exception as e:
+                self.failures[channel.name] += 1
+                ALERT_SEND_FAILURES.labels(channel=channel.name).inc()
+                logger.warning("Alert via %s failed (attempt %d/%d): %s",
+                               channel.name, attempt + 1, self.max_retries + 1, e)
+                if attempt < self.max_retries:
+                    self._sleep(min(self.backoff * 2 ** attempt, self.backoff_max))
+        return False
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+            alert = self._merge(batch)
+            if alert.count > 1:
+                self.coalesced += alert.count - 1
+                ALERTS_COALESCED.inc(alert.count - 1)
+            with self._sending:
+                for channel in self.channels:
+                    self._send(channel, alert)
+            self._last_delivery = self.clock()
+            self.delivered += 1
+            with self._idle:
+                self._pending -= len(batch)
+                self._idle.notify_all()
+
+    def send_now(self, message, frame=None, location=None, channels=None):
+        """Deliver one alert on the calling thread, bypassing the queue and coalescing, to
+        channels (default: all of them) with the usual retries. True if every channel took it."""
+        alert = self._merge([(self.clock(), time.time(), message, frame, location)])
+        with self._sending:
+            results = [self._send(channel, alert) for channel in (self.channels if channels is None else channels)]
+        return all(results)
+
+    def flush(self, timeout=None):
+        """Wait until every submitted alert has been handed to the channels; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def stop(self, timeout=10.0):
+        """Deliver what is queued (retries are no longer waited for), stop the worker and
+        close the channels."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        for channel in self.channels:
+            channel.close()
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "failures": dict(self.failures),
+        }
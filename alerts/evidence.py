@@ -0,0 +1,341 @@
+"""Pre- and post-event evidence clips for alerts.
+
+EvidenceBuffer keeps the most recent frames JPEG-compressed in memory, together
+with the persons, hand landmarks and hand tracks detected in them. Its size is
+capped in bytes: the oldest frames are dropped once the JPEGs, the raw copies
+still waiting to be encoded and the detection arrays together exceed max_bytes,
+however large or small each frame compresses. A dropped frame that was not
+encoded yet gives up its copy at once. The cap applies to the buffer only: frames
+already taken into a clip that is still collecting post-event frames, or still
+waiting for the writer, stay in memory until the clip is saved.
+
+EvidenceRecorder wraps the buffer for the frame loop. On trigger() it takes
+the buffered frames from the last pre_seconds and then collects frames for
+another post_seconds. The finished clip goes to a writer thread, which saves it
+as an alert_<time>_<n>/ directory:
+  clip.mjpeg      the JPEGs concatenated (an MJPEG dump like test_feed.mjpeg)
+  detections.npz  columnar per-frame, per-person and per-hand arrays
+  metadata.json   alert messages, time range and frame count
+The frame loop only copies each frame and appends it. Downscaling, JPEG
+encoding and writing all happen on the writer thread, in the order the frames
+and clips were queued, so a clip is written once all its frames are encoded.
+At most encode_backlog frames wait to be encoded; while the writer is that far
+behind (e.g. on a slow disk) new frames are dropped and counted.
+"""
+import json
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    EVIDENCE_DIR, EVIDENCE_BUFFER_BYTES, EVIDENCE_PRE_SECONDS, EVIDENCE_POST_SECONDS, EVIDENCE_MAX_WIDTH,
+    EVIDENCE_JPEG_QUALITY, EVIDENCE_ENCODE_BACKLOG,
+)
+from monitoring.metrics import EVIDENCE_FRAMES_DROPPED
+
+_NO_PERSONS = np.zeros((0, 5), dtype=np.int32)
+_NO_HANDS = np.zeros((0, 21, 3), dtype=np.float16)
+_NO_IDS = np.zeros(0, dtype=np.int32)
+
+
+class EvidenceFrame:
+    """One buffered frame. persons: (P, 5) id, x0, y0, x1, y1; hands: (H, 21, 3) landmarks;
+    hand_ids / owners: (H,) hand track and owning person IDs. inferred is False for frames
+    that reused earlier detections (their arrays are empty)."""
+
+    __slots__ = ("seq", "timestamp", "jpeg", "pixels", "persons", "hands", "hand_ids", "owners", "inferred")
+
+    def __init__(self, seq, timestamp, pixels):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.jpeg = b""
+        self.pixels = pixels  # the BGR copy until it is encoded
+        self.persons, self.hands, self.hand_ids, self.owners = _NO_PERSONS, _NO_HANDS, _NO_IDS, _NO_IDS
+        self.inferred = False
+
+    @property
+    def nbytes(self):
+        pixels = self.pixels.nbytes if self.pixels is not None else 0
+        return pixels + len(self.jpeg) + self.persons.nbytes + self.hands.nbytes + self.hand_ids.nbytes + self.owners.nbytes
+
+
+class EvidenceBuffer:
+    """Recent frames as JPEGs, oldest dropped first to stay within max_bytes.
+
+    add() encodes on the caller's thread. EvidenceRecorder instead uses append()
+    on the frame loop and encode() on its writer thread.
+    """
+
+    def __init__(self, max_bytes=EVIDENCE_BUFFER_BYTES, max_width=EVIDENCE_MAX_WIDTH, quality=EVIDENCE_JPEG_QUALITY):
+        self.max_bytes = max_bytes
+        self.max_width = max_width
+        self.quality = quality
+        self._frames = deque()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.nbytes = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    def _trim(self):
+        # The newest frame is always kept, even if it alone exceeds max_bytes.
+        while self.nbytes > self.max_bytes and len(self._frames) > 1:
+            item = self._frames.popleft()
+            self.nbytes -= item.nbytes
+            item.pixels = None  # not encoded yet: encode() will skip it
+            self.dropped += 1
+
+    def _buffered(self, item):
+        return self._frames and item.seq >= self._frames[0].seq
+
+    def add(self, frame, timestamp=None):
+        """Encode a BGR frame and append it; returns its EvidenceFrame, or None if encoding failed."""
+        item = self.append(frame, timestamp)
+        return item if self.encode(item) else None
+
+    def append(self, frame, timestamp=None):
+        """Append a copy of a BGR frame, to be passed to encode() later; returns its EvidenceFrame."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._seq += 1
+            item = EvidenceFrame(self._seq, timestamp, frame.copy())
+            self._frames.append(item)
+            self.nbytes += item.nbytes
+            self._trim()
+        return item
+
+    def encode(self, item):
+        """Downscale and JPEG-encode an appended frame. A frame that fails to encode is
+        removed from the buffer, and so is one dropped from it before it was encoded; returns
+        whether encoding succeeded."""
+        with self._lock:
+            frame = item.pixels
+        if frame is None:
+            return False
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            frame = cv2.resize(frame, (self.max_width, max(1, round(h * self.max_width / w))),
+                               interpolation=cv2.INTER_AREA)
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        with self._lock:
+            buffered = self._buffered(item) and item.pixels is not None
+            if buffered:
+                self.nbytes -= item.nbytes
+            item.pixels = None
+            if not ok:
+                if buffered:
+                    self._frames.remove(item)
+                return False
+            item.jpeg = buf.tobytes()
+            if buffered:
+                self.nbytes += item.nbytes
+                self._trim()
+        return True
+
+    def set_detections(self, item, persons, hands, tracks):
+        """Attach a frame's detections. persons: [{"id", "box"}] as from PersonTracker;
+        hands: (H, 21, 3) landmarks; tracks: the HandTrack of each hand."""
+        persons_arr = hands_arr = hand_ids = owners = None
+        if persons:
+            persons_arr = np.array([[p["id"], *np.asarray(p["box"]).reshape(4)] for p in persons], dtype=np.int32)
+        if len(hands):
+            hands_arr = np.asarray(hands, dtype=np.float16).reshape(-1, 21, 3)
+            hand_ids = np.array([track.id for track in tracks], dtype=np.int32)
+            owners = np.array([track.person_id for track in tracks], dtype=np.int32)
+        with self._lock:
+            before = item.nbytes
+            if persons_arr is not None:
+                item.persons = persons_arr
+            if hands_arr is not None:
+                item.hands, item.hand_ids, item.owners = hands_arr, hand_ids, owners
+            item.inferred = True
+            if self._buffered(item):
+                self.nbytes += item.nbytes - before
+                self._trim()
+
+    def since(self, timestamp):
+        """Buffered frames at or after timestamp, oldest first."""
+        frames = []
+        with self._lock:
+            for item in reversed(self._frames):
+                if item.timestamp < timestamp:
+                    break
+                frames.append(item)
+        frames.reverse()
+        return frames
+
+    def stats(self):
+        with self._lock:
+            span = self._frames[-1].timestamp - self._frames[0].timestamp if self._frames else 0.0
+            return {"frames": len(self._frames), "bytes": self.nbytes, "seconds": round(span, 2),
+                    "dropped": self.dropped}
+
+
+class _Clip:
+    __slots__ = ("messages", "alert_time", "end", "frames")
+
+    def __init__(self, message, alert_time, end, frames):
+        self.messages = [message]
+        self.alert_time = alert_time
+        self.end = end
+        self.frames = frames
+
+
+def write_clip(clip, directory, pre_seconds, post_seconds):
+    """Save a clip's frames, detections and metadata into directory."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    frames = [item for item in clip.frames if item.jpeg]  # skips frames that failed to encode
+    with open(directory / "clip.mjpeg", "wb") as f:
+        for item in frames:
+            f.write(item.jpeg)
+
+    def rows(attr, empty):
+        parts = [getattr(item, attr) for item in frames]
+        return np.concatenate(parts) if parts else empty
+
+    n_persons = [len(item.persons) for item in frames]
+    n_hands = [len(item.hands) for item in frames]
+    index = np.arange(len(frames), dtype=np.int32)
+    persons = rows("persons", _NO_PERSONS)
+    np.savez_compressed(
+        directory / "detections.npz",
+        frame_timestamp=np.array([item.timestamp for item in frames], dtype=np.float64),
+        frame_inferred=np.array([item.inferred for item in frames], dtype=bool),
+        person_frame=np.repeat(index, n_persons),
+        person_id=persons[:, 0],
+        person_box=persons[:, 1:],
+        hand_frame=np.repeat(index, n_hands),
+        hand_id=rows("hand_ids", _NO_IDS),
+        hand_owner=rows("owners", _NO_IDS),
+        hand_landmarks=rows("hands", _NO_HANDS).astype(np.float32),
+    )
+    start = frames[0].timestamp if frames else clip.alert_time
+    end = frames[-1].timestamp if frames else clip.alert_time
+    metadata = {
+        "messages": clip.messages,
+        "alert_time": clip.alert_time,
+        "alert_time_local": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(clip.alert_time)),
+        "start": start,
+        "end": end,
+        "pre_seconds": pre_seconds,
+        "post_seconds": post_seconds,
+        "frames": len(frames),
+        "fps": round((len(frames) - 1) / (end - start), 2) if end > start else None,
+        "files": {"clip": "clip.mjpeg", "detections": "detections.npz"},
+    }
+    with open(directory / "metadata.json", "w") as f:
+        json.dump(metadata, f, indent=2)
+    return directory
+
+
+class EvidenceRecorder:
+    """Frame-loop side of evidence recording; frames are encoded and clips written by a background thread.
+
+    Alerts triggered while a clip is still collecting post-event frames extend that
+    clip instead of starting an overlapping one.
+    """
+
+    def __init__(self, buffer=None, out_dir=EVIDENCE_DIR, pre_seconds=EVIDENCE_PRE_SECONDS,
+                 post_seconds=EVIDENCE_POST_SECONDS, encode_backlog=EVIDENCE_ENCODE_BACKLOG):
+        self.buffer = buffer if buffer is not None else EvidenceBuffer()
+        self.out_dir = Path(out_dir)
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self._pending = None
+        self._last_timestamp = None
+        self._queue = queue.Queue()
+        self._encode_slots = threading.Semaphore(encode_backlog)  # bounds the encode jobs in _queue
+        self._count = 0
+        self.frames_dropped = 0
+        self.clips_written = 0
+        self.failures = 0
+        self.last_written = None
+        self._thread = threading.Thread(target=self._run, name="evidence-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, frame, timestamp=None):
+        """Buffer a copy of a frame (before anything is drawn on it) and queue it for encoding;
+        returns its EvidenceFrame, or None if the encode backlog is full and the frame was dropped."""
+        if not self._encode_slots.acquire(blocking=False):
+            self.frames_dropped += 1
+            EVIDENCE_FRAMES_DROPPED.inc()
+            return None
+        item = self.buffer.append(frame, timestamp)
+        self._queue.put(("encode", item))
+        self._last_timestamp = item.timestamp
+        clip = self._pending
+        if clip is not None:
+            if item.timestamp > clip.end:
+                self._finish()
+            else:
+                clip.frames.append(item)
+        return item
+
+    def set_detections(self, item, persons, hands, tracks):
+        if item is not None:
+            self.buffer.set_detections(item, persons, hands, tracks)
+
+    def trigger(self, message, timestamp=None):
+        """Start (or extend) a clip around an alert at timestamp (default: the last frame's)."""
+        if timestamp is None:
+            timestamp = self._last_timestamp if self._last_timestamp is not None else time.time()
+        clip = self._pending
+        if clip is not None:
+            clip.messages.append(message)
+            clip.end = max(clip.end, timestamp + self.post_seconds)
+            return
+        frames = self.buffer.since(timestamp - self.pre_seconds)
+        self._pending = _Clip(message, timestamp, timestamp + self.post_seconds, frames)
+
+    def _finish(self):
+        clip, self._pending = self._pending, None
+        self._count += 1
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(clip.alert_time))
+        self._queue.put(("clip", clip, self.out_dir / f"alert_{stamp}_{self._count:03d}"))
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job[0] == "encode":
+                self.buffer.encode(job[1])
+                self._encode_slots.release()
+                self._queue.task_done()
+                continue
+            _, clip, directory = job
+            try:
+                write_clip(clip, directory, self.pre_seconds, self.post_seconds)
+                self.clips_written += 1
+                self.last_written = directory
+                print(f"Evidence saved to {directory} ({len(clip.frames)} frames)")
+            except OSError as e:
+                self.failures += 1
+                print(f"ERROR: Failed to save evidence clip {directory}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Wait until every queued frame has been encoded and every finished clip written."""
+        self._queue.join()
+
+    def close(self):
+        """Write the clip in progress (with the post-event frames seen so far) and stop the writer."""
+        if self._pending is not None:
+            self._finish()
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        return {**self.buffer.stats(), "clips_written": self.clips_written, "failures": self.failures,
+                "frames_dropped": self.frames_dropped, "recording": self._pending is not None}
@@ -1,62 +1,63 @@
-import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
-import cv2
-import os
-import time
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alerts.dispatch import AlertDispatcher, LogChannel, SMTPChannel, WebhookChannel
+from config import ALERT_SMTP_SERVER, ALERT_SMTP_PORT, ALERT_SMTP_SSL, ALERT_WEBHOOK_URL
+from monitoring.metrics import ALERTS_TRIGGERED
+
 
 class AlertEngine:
-    def __init__(self, smtp_server="smtp.gmail.com", smtp_port=465, sender_email=None, receiver_email=None, password=None):
+    def __init__(self, smtp_server=ALERT_SMTP_SERVER, smtp_port=ALERT_SMTP_PORT, sender_email=None,
+                 receiver_email=None, password=None, use_ssl=ALERT_SMTP_SSL, webhook_url=ALERT_WEBHOOK_URL,
+                 channels=None, **dispatcher_kwargs):
+        """
+        Alerts always go to the log; by email when sender, receiver and password are set;
+        to webhook_url when it is not empty. channels replaces that list.
+        Delivery runs on an AlertDispatcher thread, so trigger() returns immediately.
+        """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.sender_email = sender_email
         self.receiver_email = receiver_email
         self.password = password
-        
+
+        if channels is None:
+            channels = [LogChannel()]
+            if all([sender_email, receiver_email, password]):
+                channels.append(SMTPChannel(sender_email, receiver_email, password, smtp_server, smtp_port, use_ssl))
+            else:
+                print("DEBUG: Email alert not configured; alerts go to the log only.")
+            if webhook_url:
+                channels.append(WebhookChannel(webhook_url))
+        self.dispatcher = AlertDispatcher(channels, **dispatcher_kwargs).start()
+
     def get_location(self):
         # Mock location - in a real app, use requests to ipinfo.io or similar
         return "Lat: 12.9716, Lon: 77.5946 (Bangalore, India)"
 
+    def _channels(self, kind):
+        return [channel for channel in self.dispatcher.channels if isinstance(channel, kind)]
+
     def send_email_alert(self, frame, message):
-        """Send email with message and captured frame."""
-        if not all([self.sender_email, self.receiver_email, self.password]):
+        """Email message and frame now, on the calling thread; True once sent.
+        trigger() queues the alert for every channel instead."""
+        channels = self._channels(SMTPChannel)
+        if not channels:
             print(f"DEBUG: Email alert not configured. Message: {message}")
             return False
-
-        try:
-            msg = MIMEMultipart()
-            msg['Subject'] = "🆘 DISTRESS SIGNAL DETECTED"
-            msg['From'] = self.sender_email
-            msg['To'] = self.receiver_email
-
-            location = self.get_location()
-            body = f"{message}\n\nTime: {time.ctime()}\nLocation: {location}"
-            msg.attach(MIMEText(body, 'plain'))
-
-            # Attach Frame
-            _, img_encoded = cv2.imencode('.jpg', frame)
-            image_attachment = MIMEImage(img_encoded.tobytes(), name="distress_frame.jpg")
-            msg.attach(image_attachment)
-
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context) as server:
-                server.login(self.sender_email, self.password)
-                server.send_message(msg)
-            
-            print(f"SUCCESS: Email alert sent to {self.receiver_email}")
-            return True
-        except Exception as e:
-            print(f"ERROR: Failed to send email alert: {e}")
-            return False
+        return self.dispatcher.send_now(message, frame, location=self.get_location(), channels=channels)
 
     def send_local_notification(self, message):
-        """Display a system notification (macOS specific)."""
-        os.system(f'osascript -e \'display notification "{message}" with title "Distress Alert"\'')
+        """Write message to the local alert log now, on the calling thread."""
+        return self.dispatcher.send_now(message, channels=self._channels(LogChannel))
 
     def trigger(self, frame, message):
+        """Queue the alert for delivery; does not wait for it."""
         print(f"TRIGGERED: {message}")
-        self.send_local_notification(message)
-        # Email is sent only if configured
-        self.send_email_alert(frame, message)
+        ALERTS_TRIGGERED.inc()
+        self.dispatcher.submit(message, frame, location=self.get_location())
+
+    def close(self, timeout=10.0):
+        """Deliver queued alerts and release the channels."""
+        self.dispatcher.stop(timeout)
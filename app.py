@@ -1,6 +1,7 @@
 """Flask app: login, register, monitor, video feed, data collection, training."""
 import io
 import os
+import time
 import base64
 from pathlib import Path
 
@@ -22,15 +23,37 @@ load_dotenv()
 import config
 from auth.login import register_user, check_user
 from detection.pipeline import get_pipeline
-from data.collect import save_samples
+from detection.broadcast import get_broadcaster
+from detection.multi_source import get_engine
 from data.preprocess import landmarks_to_features
-from model.train import train
+from model.jobs import get_job_queue
+from model.registry import get_registry
+from model.feature_store import get_feature_store
+from monitoring.metrics import REGISTRY, CONTENT_TYPE, HTTP_REQUEST_SECONDS
 
 app = Flask(__name__)
 app.secret_key = config.SECRET_KEY
 CORS(app)
 
 
+# Streaming responses live for the whole connection; their time is not request latency.
+_UNTIMED_ENDPOINTS = {"video_feed", "source_video_feed", "static"}
+
+
+@app.before_request
+def _start_timer():
+    request._started_at = time.perf_counter()
+
+
+@app.after_request
+def _record_latency(response):
+    endpoint = request.endpoint or "unknown"
+    started = getattr(request, "_started_at", None)
+    if started is not None and endpoint not in _UNTIMED_ENDPOINTS:
+        HTTP_REQUEST_SECONDS.labels(endpoint=endpoint).observe(time.perf_counter() - started)
+    return response
+
+
 def login_required(f):
     from functools import wraps
     @wraps(f)
@@ -90,47 +113,81 @@ def monitor():
     )
 
 
-def generate_frames():
-    import cv2
-    import numpy as np
-    import time
-    
-    pipeline = get_pipeline()
+def generate_frames(max_fps=None, level=None):
+    """Stream the broadcaster's latest JPEG; viewers never trigger extra capture or inference."""
     print("DEBUG: generate_frames started")
+    with get_broadcaster().subscribe(max_fps=max_fps, level=level) as subscription:
+        for _, jpeg in subscription:
+            yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n")
+
+
+@app.route("/video_feed")
+def video_feed():
+    """MJPEG stream. Optional query args: fps (max frame rate), quality (ladder level, default auto)."""
+    max_fps = request.args.get("fps", default=config.STREAM_MAX_FPS, type=float)
+    level = request.args.get("quality", type=int)
+    return Response(
+        generate_frames(max_fps=max_fps or None, level=level),
+        mimetype="multipart/x-mixed-replace; boundary=frame",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def generate_source_frames(source_id):
+    """Stream the latest JPEG a multi-source worker produced for source_id, until the source
+    finishes or the engine stops."""
+    engine = get_engine()
+    seq = 0
     while True:
-        try:
-            frame, _, _, _ = pipeline.read_frame()
-        except Exception as e:
-            print(f"DEBUG: Frame read exception: {e}")
-            time.sleep(1)
+        result = engine.wait_for(source_id, seq, timeout=1.0)
+        if result is None:
+            if engine.states[source_id].finished or not engine.running:
+                return  # recorded source exhausted, source failed or engine stopped
             continue
-            
-        if frame is None:
-            print("DEBUG: frame is None")
-            # Create a black frame with error text
-            error_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(error_frame, "Camera Error: Not found or no permission", (50, 240),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
-            cv2.putText(error_frame, "Check System Settings > Privacy > Camera", (50, 280),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-            _, buf = cv2.imencode(".jpg", error_frame)
-            yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + buf.tobytes() + b"\r\n")
-            time.sleep(1) # Wait before retry
+        seq = result["seq"]  # a result without a JPEG is skipped, not waited on again
+        if result["jpeg"] is None:
             continue
-            
-        _, buf = cv2.imencode(".jpg", frame)
-        yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + buf.tobytes() + b"\r\n")
+        yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + result["jpeg"] + b"\r\n")
 
 
-@app.route("/video_feed")
-def video_feed():
+@app.route("/video_feed/<int:source_id>")
+def source_video_feed(source_id):
+    engine = get_engine()
+    if engine is None or source_id not in engine.states:
+        return jsonify({"ok": False, "message": "Unknown source"}), 404
     return Response(
-        generate_frames(),
+        generate_source_frames(source_id),
         mimetype="multipart/x-mixed-replace; boundary=frame",
         headers={"Cache-Control": "no-store"},
     )
 
 
+@app.route("/api/sources")
+@login_required
+def api_sources():
+    """List configured camera sources with per-source fps and latest prediction."""
+    engine = get_engine()
+    if engine is None:
+        return jsonify({"ok": False, "message": "No CAMERA_SOURCES configured", "sources": []})
+    return jsonify({"ok": True, **engine.stats()})
+
+
+@app.route("/api/predict/<int:source_id>")
+@login_required
+def api_predict_source(source_id):
+    """Latest prediction for one multi-source camera."""
+    engine = get_engine()
+    result = engine.latest(source_id) if engine is not None else None
+    if result is None:
+        return jsonify({"label": "—", "confidence": 0.0, "emoji": "👋", "landmarks": None})
+    return jsonify({
+        "label": result["label"],
+        "confidence": result["confidence"],
+        "emoji": result["emoji"],
+        "landmarks": result["landmarks"],
+    })
+
+
 @app.route("/api/predict")
 @login_required
 def api_predict():
@@ -141,9 +198,16 @@ def api_predict():
         "confidence": pipeline._current_conf,
         "emoji": pipeline._current_emoji,
         "landmarks": pipeline._last_landmarks,
+        "stats": pipeline.stats(),
     })
 
 
+@app.route("/api/metrics")
+def api_metrics():
+    """Pipeline, alert and web metrics in Prometheus text format (unauthenticated for scrapers)."""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
 @app.route("/api/collect", methods=["POST"])
 @login_required
 def api_collect():
@@ -157,8 +221,8 @@ def api_collect():
         return jsonify({"ok": False, "message": "gesture and landmarks required"}), 400
     try:
         import numpy as np
-        arrs = [np.array(lm, dtype=np.float32) for lm in landmarks_list]
-        n = save_samples(label, arrs)
+        features = np.stack([landmarks_to_features(np.array(lm, dtype=np.float32)) for lm in landmarks_list])
+        n = get_feature_store().append(features, label)
         return jsonify({"ok": True, "saved": n})
     except Exception as e:
         return jsonify({"ok": False, "message": str(e)}), 500
@@ -167,11 +231,55 @@ def api_collect():
 @app.route("/api/train", methods=["POST"])
 @login_required
 def api_train():
-    """Trigger model training."""
-    ok, msg = train()
-    if ok:
-        get_pipeline().reload_model()
-    return jsonify({"ok": ok, "message": msg})
+    """Queue a background training job; poll /api/train/<job_id> for progress.
+    Optional JSON body {"mode": "auto" | "incremental" | "full" | "select"}."""
+    mode = (request.get_json(silent=True) or {}).get("mode", "auto")
+    if mode not in ("auto", "incremental", "full", "select"):
+        return jsonify({"ok": False, "message": f"Unknown training mode: {mode}"}), 400
+    job = get_job_queue().submit(mode=mode)
+    return jsonify({"ok": True, "message": "Training started.", **job.to_dict()}), 202
+
+
+@app.route("/api/train/<job_id>")
+@login_required
+def api_train_status(job_id):
+    """Status, progress and result of a training job."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "message": "Unknown job"}), 404
+    return jsonify({"ok": job.status != "failed", **job.to_dict()})
+
+
+@app.route("/api/train/<job_id>/cancel", methods=["POST"])
+@login_required
+def api_train_cancel(job_id):
+    """Cancel a queued or running training job."""
+    if not get_job_queue().cancel(job_id):
+        return jsonify({"ok": False, "message": "Job not found or already finished"}), 409
+    return jsonify({"ok": True, "message": "Cancelling."})
+
+
+@app.route("/api/model")
+@login_required
+def api_model():
+    """Published model versions, oldest first, recent training runs (mode, dataset size, wall time)
+    and the ranking from the last model selection run."""
+    from model.train import load_manifest  # keeps sklearn out of the serving process
+    manifest = load_manifest() or {}
+    return jsonify({"ok": True, "versions": get_registry().versions(),
+                    "training_history": manifest.get("history", []),
+                    "selection": manifest.get("selection")})
+
+
+@app.route("/api/model/rollback", methods=["POST"])
+@login_required
+def api_model_rollback():
+    """Switch back to the previously published model."""
+    version = get_registry().rollback()
+    if version is None:
+        return jsonify({"ok": False, "message": "No earlier model to roll back to"}), 409
+    return jsonify({"ok": True, "message": f"Rolled back to model version {version.version}.",
+                    "model_version": version.version})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Cost and recall of person-crop cascade landmarking against full-frame landmarking.
+Run: python benchmarks/bench_cascade.py --frames test_feed.mjpeg [--group-sizes 1 2 4]
+Person boxes come from YOLO, run once per frame and outside the timings, since both
+modes need them in distress_monitor.py. The full-frame mode is then timed: MediaPipe
+on the whole frame, hands assigned to boxes with associate_hands. The cascade is
+timed at each group size (persons per MediaPipe pass). Both modes see the same frames.
+The full-frame hands are the reference. Reported per mode: wall and CPU time per
+frame, hands found, recall (reference hands with a cascade wrist within --match-px
+pixels), extra hands the reference missed, and owner agreement (matched hands given
+the same person ID by both modes). Frames without persons count separately, since
+they are where the cascade saves the most.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import summarize, write_report
+from benchmarks.bench_pipeline import load_frames
+from detection.association import associate_hands
+from detection.cascade import PersonHandCascade
+from detection.landmarks import HandLandmarker
+
+
+def full_frame(landmarker, rgb, persons):
+    """(wrists px, owner person IDs) from full-frame landmarking plus box association."""
+    h, w = rgb.shape[:2]
+    wrists = landmarker.process_batch(rgb).landmarks[:, 0, :2] * (w, h)
+    boxes = np.array([p["box"] for p in persons], dtype=np.float32).reshape(-1, 4)
+    owners = associate_hands(wrists, boxes)
+    return wrists, np.array([persons[i]["id"] if i >= 0 else -1 for i in owners], dtype=np.int64)
+
+
+def cascade(landmarker, rgb, persons):
+    h, w = rgb.shape[:2]
+    batch, person_ids = landmarker.process(rgb, persons)
+    return batch.landmarks[:, 0, :2] * (w, h), person_ids
+
+
+def run(fn, landmarker, rgbs, persons):
+    cpu, wall, found = [], [], []
+    for rgb, frame_persons in zip(rgbs, persons):
+        c0, w0 = time.process_time(), time.perf_counter()
+        result = fn(landmarker, rgb, frame_persons)
+        cpu.append(time.process_time() - c0)
+        wall.append(time.perf_counter() - w0)
+        found.append((result[0].copy(), result[1].copy()))
+    return np.array(cpu), np.array(wall), found
+
+
+def compare(reference, found, match_px):
+    """(matched, reference hands, extra, owners agreeing) summed over frames."""
+    matched = total = extra = agree = 0
+    for (ref_wrists, ref_owners), (wrists, owners) in zip(reference, found):
+        total += len(ref_wrists)
+        pairs = []
+        if len(ref_wrists) and len(wrists):
+            dist = np.linalg.norm(ref_wrists[:, None] - wrists[None], axis=2)
+            rows, cols = linear_sum_assignment(dist)
+            pairs = [(r, c) for r, c in zip(rows, cols) if dist[r, c] <= match_px]
+        matched += len(pairs)
+        extra += len(wrists) - len(pairs)
+        agree += sum(ref_owners[r] == owners[c] for r, c in pairs)
+    return matched, total, extra, agree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", required=True, help="Video file, MJPEG dump or frame directory with people")
+    parser.add_argument("-n", type=int, default=300)
+    parser.add_argument("--group-sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--match-px", type=float, default=20.0, help="Max wrist distance of a matched hand")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--output", default="bench_cascade.json")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.n)
+    if not frames:
+        print(f"No frames could be read from {args.frames}")
+        sys.exit(2)
+    from detection.person_tracker import PersonTracker
+    tracker = PersonTracker(args.model, mode="detect")
+    persons = [tracker.track(frame)[1] for frame in frames]
+    rgbs = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
+    empty = sum(not p for p in persons)
+
+    full = HandLandmarker(max_num_hands=2)
+    ref_cpu, ref_wall, reference = run(full_frame, full, rgbs, persons)
+    full.close()
+    results = {"full_wall": summarize(ref_wall), "full_cpu": summarize(ref_cpu)}
+    ref_hands = sum(len(r[0]) for r in reference)
+    rows = [{"mode": "full", "group": None, "wall_ms": round(ref_wall.mean() * 1000, 3),
+             "cpu_ms": round(ref_cpu.mean() * 1000, 3), "hands": ref_hands, "recall": 1.0, "extra": 0,
+             "owner_agreement": 1.0}]
+    for group in args.group_sizes:
+        landmarker = PersonHandCascade(max_persons=group)
+        cpu, wall, found = run(cascade, landmarker, rgbs, persons)
+        stats = landmarker.stats()
+        landmarker.close()
+        matched, total, extra, agree = compare(reference, found, args.match_px)
+        results[f"cascade_{group}_wall"] = summarize(wall)
+        results[f"cascade_{group}_cpu"] = summarize(cpu)
+        rows.append({
+            "mode": "cascade", "group": group, "wall_ms": round(wall.mean() * 1000, 3),
+            "cpu_ms": round(cpu.mean() * 1000, 3), "hands": sum(len(f[0]) for f in found),
+            "recall": round(matched / total, 4) if total else None, "extra": extra,
+            "owner_agreement": round(agree / matched, 4) if matched else None,
+            "passes_per_frame": round(stats["passes"] / len(frames), 2),
+        })
+
+    print(f"{len(frames)} frames, {empty} without persons, {sum(len(p) for p in persons)} person boxes, "
+          f"{ref_hands} full-frame hands")
+    print(f"{'mode':<8} {'group':>5} {'wall ms':>8} {'cpu ms':>8} {'hands':>6} {'recall':>7} {'extra':>6} "
+          f"{'owner':>6}")
+    for row in rows:
+        recall = f"{row['recall']:.3f}" if row["recall"] is not None else "-"
+        owner = f"{row['owner_agreement']:.3f}" if row["owner_agreement"] is not None else "-"
+        group = row["group"] if row["group"] is not None else "-"
+        print(f"{row['mode']:<8} {group:>5} {row['wall_ms']:>8.2f} {row['cpu_ms']:>8.2f} {row['hands']:>6} "
+              f"{recall:>7} {row['extra']:>6} {owner:>6}")
+    write_report(results, args.output, comparison=rows, frames_without_persons=empty)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
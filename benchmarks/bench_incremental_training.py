@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Retrain wall time against dataset size: full rebuilds vs incremental updates.
+Run: python benchmarks/bench_incremental_training.py --initial 2000 --session 400 --sessions 8
+Synthetic collection sessions (one .npz shard each) are added one at a time. After each,
+one dataset is retrained from scratch and an identical one is updated incrementally;
+both are timed end to end through model.train.train() and scored on a held-out set.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import write_report
+from model.bundle import load_bundle
+from model.train import TrainPaths, load_manifest, train
+
+LABELS = ["fist", "ok", "open_palm", "peace", "rock", "thumbs_down", "thumbs_up", "wave"]
+
+
+def synthetic_session(n, seed, spread=2.5):
+    """n labelled 63-feature samples around fixed per-label centres."""
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(0).normal(size=(len(LABELS), 63))
+    idx = rng.integers(0, len(LABELS), n)
+    X = centers[idx] + rng.normal(scale=spread, size=(n, 63))
+    return X.astype(np.float32), np.array(LABELS)[idx]
+
+
+def make_paths(root):
+    root.mkdir(parents=True)
+    (root / "dataset").mkdir()
+    return TrainPaths(root / "dataset", root / "store", root / "m.pkl", root / "e.pkl", root / "m.gmb",
+                      root / "manifest.json")
+
+
+def accuracy(paths, X, y):
+    forest, _ = load_bundle(paths.bundle)
+    return float(np.mean(forest.labels[forest.predict(X)] == y))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--initial", type=int, default=2000, help="Samples in the first session")
+    parser.add_argument("--session", type=int, default=400, help="Samples per later session")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--output", default="bench_incremental_training.json")
+    args = parser.parse_args()
+
+    X_test, y_test = synthetic_session(2000, seed=10_000)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        full = make_paths(Path(tmp) / "full")
+        incremental = make_paths(Path(tmp) / "incremental")
+        print(f"{'samples':>8} {'new':>6} {'full s':>8} {'incr s':>8} {'speedup':>8} {'full acc':>9} {'incr acc':>9}")
+        for session in range(args.sessions + 1):
+            n = args.initial if session == 0 else args.session
+            X, y = synthetic_session(n, seed=session)
+            for paths in (full, incremental):
+                np.savez(paths.dataset / f"session_{session:03d}.npz", X=X, y=y)
+
+            ok_full, msg_full = train(paths=full, mode="full")
+            ok_incr, msg_incr = train(paths=incremental, mode="incremental")
+            if not (ok_full and ok_incr):
+                print(msg_full if not ok_full else msg_incr)
+                sys.exit(1)
+            run_full = load_manifest(full.manifest)["history"][-1]
+            run_incr = load_manifest(incremental.manifest)["history"][-1]
+            row = {
+                "samples": run_full["samples"],
+                "new_samples": n,
+                "full_s": run_full["seconds"],
+                "incremental_s": run_incr["seconds"],
+                "incremental_mode": run_incr["mode"],
+                "speedup": round(run_full["seconds"] / run_incr["seconds"], 2) if run_incr["seconds"] else None,
+                "full_accuracy": round(accuracy(full, X_test, y_test), 4),
+                "incremental_accuracy": round(accuracy(incremental, X_test, y_test), 4),
+                "incremental_trees": run_incr["trees"],
+            }
+            rows.append(row)
+            print(f"{row['samples']:>8} {n:>6} {row['full_s']:>8.2f} {row['incremental_s']:>8.2f} "
+                  f"{row['speedup'] or 0:>7.1f}x {row['full_accuracy']:>9.2%} {row['incremental_accuracy']:>9.2%}")
+
+    write_report(rows, args.output, initial=args.initial, session=args.session, sessions=args.sessions)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Throughput scaling of the multi-camera engine.
+Run: python benchmarks/bench_multi_source.py --sources clip.mp4 --copies 8 --workers 1 2 4 8
+Each source is processed by a GesturePipeline worker; the same set of sources is run
+with each worker count and the aggregate frames per second are reported.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from detection.multi_source import MultiSourceEngine, parse_sources
+
+
+def run(sources, workers, duration):
+    engine = MultiSourceEngine(sources, workers=workers).start()
+    deadline = time.time() + duration
+    while time.time() < deadline and not engine.all_finished():
+        time.sleep(0.2)
+    stats = engine.stats()
+    engine.stop()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", required=True, help="Comma-separated camera indices, files or URLs")
+    parser.add_argument("--copies", type=int, default=1, help="Repeat the source list this many times")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per run")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    sources = parse_sources(args.sources) * args.copies
+    rows = []
+    print(f"{len(sources)} sources, {args.duration:.0f}s per run")
+    print(f"{'workers':>8} {'frames':>8} {'fps':>8} {'speedup':>8} {'per-worker':>11}")
+    base_fps = None
+    for workers in args.workers:
+        stats = run(sources, workers, args.duration)
+        base_fps = base_fps or stats["fps"] or 1.0
+        row = {
+            "workers": stats["workers"],
+            "frames": stats["frames"],
+            "fps": stats["fps"],
+            "speedup": round(stats["fps"] / base_fps, 2),
+            "fps_per_worker": round(stats["fps"] / stats["workers"], 2),
+        }
+        rows.append(row)
+        print(f"{row['workers']:>8} {row['frames']:>8} {row['fps']:>8.1f} {row['speedup']:>7.2f}x {row['fps_per_worker']:>11.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"sources": [str(s) for s in sources], "runs": rows}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Accuracy versus frame rate of detect-then-propagate person tracking.
+Run: python benchmarks/bench_person_tracking.py --frames recording.mp4 [--intervals 1 3 5 10]
+Every frame is first run through YOLO ("detect" mode) as the reference. Then the same
+frames go through "propagate" mode at each detect interval. Boxes are paired with the
+reference by optimal IoU matching, so differing track IDs do not matter. Reported per
+interval: wall and CPU time per frame, fraction of frames that ran YOLO, mean IoU of
+matched boxes and recall (reference boxes matched with IoU >= 0.5).
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import summarize, write_report
+from benchmarks.bench_pipeline import load_frames
+from detection.person_tracker import PersonTracker
+
+
+def iou_matrix(a, b):
+    """(len(a), len(b)) IoU of x0, y0, x1, y1 boxes."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(1, -1, 4)
+    lo = np.maximum(a[..., :2], b[..., :2])
+    hi = np.minimum(a[..., 2:], b[..., 2:])
+    inter = np.prod(np.clip(hi - lo, 0, None), axis=-1)
+    area_a = np.prod(a[..., 2:] - a[..., :2], axis=-1)
+    area_b = np.prod(b[..., 2:] - b[..., :2], axis=-1)
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+def match_quality(reference, tracked, min_iou=0.5):
+    """(sum of matched IoUs, matched count, reference box count) over all frames."""
+    iou_sum, matched, total = 0.0, 0, 0
+    for ref, trk in zip(reference, tracked):
+        total += len(ref)
+        if not len(ref) or not len(trk):
+            continue
+        iou = iou_matrix(ref, trk)
+        rows, cols = linear_sum_assignment(-iou)
+        good = iou[rows, cols] >= min_iou
+        iou_sum += float(iou[rows, cols][good].sum())
+        matched += int(good.sum())
+    return iou_sum, matched, total
+
+
+def run(tracker, frames):
+    cpu, wall, boxes = [], [], []
+    for frame in frames:
+        c0, w0 = time.process_time(), time.perf_counter()
+        _, persons = tracker.track(frame)
+        cpu.append(time.process_time() - c0)
+        wall.append(time.perf_counter() - w0)
+        boxes.append(np.array([p["box"] for p in persons], dtype=np.float64).reshape(-1, 4))
+    return np.array(cpu), np.array(wall), boxes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", required=True, help="Video file, MJPEG dump or frame directory with people")
+    parser.add_argument("-n", type=int, default=300)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[2, 3, 5, 10])
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--output", default="bench_person_tracking.json")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.n)
+    if not frames:
+        print(f"No frames could be read from {args.frames}")
+        sys.exit(2)
+
+    ref_cpu, ref_wall, reference = run(PersonTracker(args.model, mode="detect"), frames)
+    results = {"detect_wall": summarize(ref_wall), "detect_cpu": summarize(ref_cpu)}
+    tradeoff = [{"mode": "detect", "interval": 1, "fps": round(1.0 / ref_wall.mean(), 2),
+                 "cpu_ms": round(ref_cpu.mean() * 1000, 3), "detect_ratio": 1.0, "mean_iou": 1.0, "recall": 1.0}]
+    for interval in args.intervals:
+        tracker = PersonTracker(args.model, mode="propagate", detect_interval=interval)
+        cpu, wall, boxes = run(tracker, frames)
+        iou_sum, matched, total = match_quality(reference, boxes)
+        stats = tracker.stats()
+        results[f"propagate_{interval}_wall"] = summarize(wall)
+        results[f"propagate_{interval}_cpu"] = summarize(cpu)
+        tradeoff.append({
+            "mode": "propagate", "interval": interval, "fps": round(1.0 / wall.mean(), 2),
+            "cpu_ms": round(cpu.mean() * 1000, 3), "detect_ratio": stats["detect_ratio"],
+            "redetect_reasons": stats["redetect_reasons"],
+            "mean_iou": round(iou_sum / matched, 4) if matched else None,
+            "recall": round(matched / total, 4) if total else None,
+        })
+
+    print(f"{len(frames)} frames, {int(sum(len(r) for r in reference))} reference boxes")
+    print(f"{'mode':<10} {'interval':>8} {'fps':>8} {'cpu ms':>8} {'yolo':>6} {'iou':>6} {'recall':>7}")
+    for row in tradeoff:
+        iou = f"{row['mean_iou']:.3f}" if row["mean_iou"] is not None else "-"
+        recall = f"{row['recall']:.3f}" if row["recall"] is not None else "-"
+        print(f"{row['mode']:<10} {row['interval']:>8} {row['fps']:>8.1f} {row['cpu_ms']:>8.2f} "
+              f"{row['detect_ratio']:>6.0%} {iou:>6} {recall:>7}")
+    write_report(results, args.output, tradeoff=tradeoff)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency benchmark for the detection pipeline. No camera needed.
+Run: python benchmarks/bench_pipeline.py [--frames recording.mp4] [--baseline benchmarks/baseline.json]
+Frames come from a recording (video, MJPEG dump or frame directory) or are synthetic;
+landmark-level stages use synthetic hand arrays. Each stage is timed on its own and
+p50/p95/p99 and throughput are written to a JSON report. With --baseline the run is
+compared against a saved report and the exit code is 1 if any stage regressed.
+Stages whose dependencies are missing (MediaPipe, ultralytics, a trained model) are skipped.
+"""
+import argparse
+import itertools
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import (
+    time_calls, summarize, write_report, load_report, compare, print_table,
+    synthetic_hands, synthetic_frames,
+)
+
+
+def load_frames(path, n):
+    from detection.offline import plan_shards, iter_shard_frames
+    frames = []
+    for shard in plan_shards(path, shard_size=n):
+        for _, frame, _ in iter_shard_frames(shard):
+            frames.append(frame)
+            if len(frames) == n:
+                return frames
+    return frames
+
+
+def bench_decode(ctx):
+    jpegs = [cv2.imencode(".jpg", f)[1] for f in ctx["frames"]]
+    return time_calls(lambda buf: cv2.imdecode(buf, cv2.IMREAD_COLOR), jpegs)
+
+
+def bench_frame_to_rgb(ctx):
+    from detection.camera import frame_to_rgb
+    return time_calls(frame_to_rgb, ctx["frames"])
+
+
+def bench_hand_landmarks(ctx):
+    landmarker = ctx["landmarker"]()
+    rgbs = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in ctx["frames"]]
+    return time_calls(landmarker.process, rgbs)
+
+
+def bench_landmarks_to_features(ctx):
+    from data.preprocess import landmarks_to_features
+    return time_calls(landmarks_to_features, ctx["hands"])
+
+
+def bench_predict_gesture(ctx, compiled=True):
+    from data.preprocess import landmarks_to_features
+    from model.predict import load_model, predict_gesture
+    model, encoder = load_model(compiled=compiled)
+    if model is None:
+        raise RuntimeError("no trained model")
+    features = [landmarks_to_features(h) for h in ctx["hands"]]
+    return time_calls(lambda x: predict_gesture(model, encoder, x), features)
+
+
+def bench_predict_gesture_sklearn(ctx):
+    return bench_predict_gesture(ctx, compiled=False)
+
+
+def bench_draw_landmarks(ctx):
+    landmarker = ctx["landmarker"]()
+    pairs = [(f.copy(), [ctx["hands"][i % len(ctx["hands"])]]) for i, f in enumerate(ctx["frames"])]
+    return time_calls(lambda p: landmarker.draw_landmarks(p[0], p[1]), pairs)
+
+
+def bench_imencode(ctx):
+    return time_calls(lambda f: cv2.imencode(".jpg", f), ctx["frames"])
+
+
+def bench_person_tracker(ctx):
+    from detection.person_tracker import PersonTracker
+    tracker = PersonTracker(mode="detect")
+    return time_calls(tracker.track, ctx["frames"])
+
+
+def bench_person_tracker_propagate(ctx):
+    from detection.person_tracker import PersonTracker
+    tracker = PersonTracker(mode="propagate")
+    return time_calls(tracker.track, ctx["frames"])
+
+
+def bench_verification_update(ctx):
+    from detection.verification import VerificationEngine
+    verifier = VerificationEngine()
+    rng = np.random.default_rng(0)
+    calls = [(int(pid), bool(d), 0.9) for pid, d in zip(rng.integers(0, 20, ctx["n"] * 10),
+                                                         rng.random(ctx["n"] * 10) < 0.2)]
+    return time_calls(lambda c: verifier.update(*c), calls)
+
+
+STAGES = {
+    "decode": bench_decode,
+    "frame_to_rgb": bench_frame_to_rgb,
+    "hand_landmarks": bench_hand_landmarks,
+    "landmarks_to_features": bench_landmarks_to_features,
+    "predict_gesture": bench_predict_gesture,
+    "predict_gesture_sklearn": bench_predict_gesture_sklearn,
+    "draw_landmarks": bench_draw_landmarks,
+    "imencode": bench_imencode,
+    "person_tracker": bench_person_tracker,
+    "person_tracker_propagate": bench_person_tracker_propagate,
+    "verification_update": bench_verification_update,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", help="Video file, MJPEG dump or frame directory (default: synthetic)")
+    parser.add_argument("-n", type=int, default=200, help="Frames / hands per stage")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Compare against this saved report")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown vs baseline (fraction)")
+    parser.add_argument("--save-baseline", help="Also save this run as the new baseline at this path")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.n) if args.frames else synthetic_frames(args.n)
+    if not frames:
+        print(f"No frames could be read from {args.frames}")
+        sys.exit(2)
+    if len(frames) < args.n:
+        frames = list(itertools.islice(itertools.cycle(frames), args.n))
+
+    def make_landmarker():
+        from detection.landmarks import HandLandmarker
+        return HandLandmarker(max_num_hands=2)
+
+    ctx = {"n": args.n, "frames": frames, "hands": list(synthetic_hands(args.n)), "landmarker": make_landmarker}
+
+    results = {}
+    for name in args.stages:
+        try:
+            results[name] = summarize(STAGES[name](ctx))
+        except Exception as e:  # missing optional dependency or model
+            results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+    print_table(results)
+    write_report(results, args.output, source=args.frames or "synthetic", n=args.n)
+    print(f"\nReport written to {args.output}")
+    if args.save_baseline:
+        write_report(results, args.save_baseline, source=args.frames or "synthetic", n=args.n)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(results, load_report(args.baseline), args.tolerance)
+        if regressions:
+            print("\nRegressions vs baseline:")
+            for stage, metric, old, new, change in regressions:
+                print(f"  {stage} {metric}: {old:.3f} -> {new:.3f} ms (+{change:.0%})")
+            sys.exit(1)
+        print("\nNo regressions vs baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+CPU cost and landmark drift of ROI tracking against full-frame hand landmarking.
+Run: python benchmarks/bench_roi_tracking.py --frames recording.mp4 [--keyframe-interval 10]
+Both modes see the same recorded frames. CPU time per frame is process CPU time (all
+MediaPipe threads included); drift is the mean pixel distance between ROI-mode and
+full-frame landmarks on frames where both found the same hands.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import summarize, write_report
+from benchmarks.bench_pipeline import load_frames
+from detection.landmarks import HandLandmarker
+from detection.roi_tracking import RoiHandTracker
+
+
+def run(landmarker, rgbs):
+    cpu, wall, results = [], [], []
+    for rgb in rgbs:
+        c0, w0 = time.process_time(), time.perf_counter()
+        batch = landmarker.process_batch(rgb)
+        cpu.append(time.process_time() - c0)
+        wall.append(time.perf_counter() - w0)
+        results.append(batch.landmarks.copy())
+    return np.array(cpu), np.array(wall), results
+
+
+def drift_pixels(reference, tracked, width, height):
+    """Mean landmark distance (px) per frame where both modes found the same number of hands."""
+    scale = np.array([width, height], dtype=np.float32)
+    drifts = []
+    for ref, trk in zip(reference, tracked):
+        if len(ref) == 0 or len(ref) != len(trk):
+            continue
+        # Pair hands by nearest wrist.
+        order = [int(np.argmin(np.linalg.norm(trk[:, 0, :2] - r[0, :2], axis=1))) for r in ref]
+        d = np.linalg.norm((ref[..., :2] - trk[order][..., :2]) * scale, axis=-1)
+        drifts.append(float(d.mean()))
+    return np.array(drifts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", required=True, help="Video file, MJPEG dump or frame directory with hands")
+    parser.add_argument("-n", type=int, default=300)
+    parser.add_argument("--max-hands", type=int, default=2)
+    parser.add_argument("--keyframe-interval", type=int, default=10)
+    parser.add_argument("--output", default="bench_roi_tracking.json")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.n)
+    if not frames:
+        print(f"No frames could be read from {args.frames}")
+        sys.exit(2)
+    rgbs = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
+    h, w = frames[0].shape[:2]
+
+    full = HandLandmarker(max_num_hands=args.max_hands)
+    full_cpu, full_wall, full_hands = run(full, rgbs)
+    full.close()
+
+    tracker = RoiHandTracker(max_num_hands=args.max_hands, keyframe_interval=args.keyframe_interval)
+    roi_cpu, roi_wall, roi_hands = run(tracker, rgbs)
+    tracker_stats = tracker.stats()
+    tracker.close()
+
+    drift = drift_pixels(full_hands, roi_hands, w, h)
+    results = {
+        "full_cpu": summarize(full_cpu),
+        "roi_cpu": summarize(roi_cpu),
+        "full_wall": summarize(full_wall),
+        "roi_wall": summarize(roi_wall),
+    }
+    saved = 1.0 - roi_cpu.mean() / full_cpu.mean() if full_cpu.mean() > 0 else 0.0
+    found = sum(len(x) > 0 for x in full_hands), sum(len(x) > 0 for x in roi_hands)
+    print(f"{len(frames)} frames, {w}x{h}, keyframe interval {args.keyframe_interval}")
+    print(f"CPU per frame: full {full_cpu.mean() * 1000:.2f} ms, roi {roi_cpu.mean() * 1000:.2f} ms "
+          f"({saved:.0%} saved)")
+    print(f"Wall per frame: full {full_wall.mean() * 1000:.2f} ms, roi {roi_wall.mean() * 1000:.2f} ms")
+    print(f"Frames with hands: full {found[0]}, roi {found[1]}; tracker {tracker_stats}")
+    if drift.size:
+        print(f"Drift vs full frame: mean {drift.mean():.2f} px, p95 {np.percentile(drift, 95):.2f} px "
+              f"over {drift.size} frames")
+    write_report(results, args.output, tracker=tracker_stats, cpu_saved=round(float(saved), 4),
+                 drift_px={"mean": float(drift.mean()) if drift.size else None,
+                           "p95": float(np.percentile(drift, 95)) if drift.size else None,
+                           "frames": int(drift.size)})
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
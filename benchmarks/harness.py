@@ -0,0 +1,129 @@
+"""Timing, reporting and baseline comparison shared by the benchmark scripts."""
+import json
+import platform
+import time
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def time_calls(fn, inputs, warmup=5):
+    """Call fn(x) for every x in inputs (after a few warm-up calls); return seconds per call."""
+    inputs = list(inputs)
+    for x in inputs[:warmup]:
+        fn(x)
+    samples = np.empty(len(inputs), dtype=np.float64)
+    perf = time.perf_counter
+    for i, x in enumerate(inputs):
+        t0 = perf()
+        fn(x)
+        samples[i] = perf() - t0
+    return samples
+
+
+def summarize(samples, items_per_call=1):
+    """p50/p95/p99/mean in milliseconds plus throughput (items per second)."""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.size == 0:
+        return {"n": 0}
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000.0
+    total = float(samples.sum())
+    return {
+        "n": int(samples.size),
+        "mean_ms": round(float(samples.mean()) * 1000.0, 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "throughput_per_s": round(samples.size * items_per_call / total, 2) if total > 0 else None,
+    }
+
+
+def environment():
+    import cv2
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_report(results, path, **extra):
+    """Write {"environment", "results", ...extra} as JSON."""
+    report = {"environment": environment(), "results": results, **extra}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=0.15, metrics=("p50_ms", "p95_ms")):
+    """Return (stage, metric, baseline, current, change) for every metric that got slower
+    than baseline by more than tolerance (fraction). Stages missing on either side are ignored.
+    """
+    regressions = []
+    base_results = baseline.get("results", baseline)
+    for stage, current in results.items():
+        base = base_results.get(stage)
+        if not base or "skipped" in current or "skipped" in base:
+            continue
+        for metric in metrics:
+            old, new = base.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > tolerance:
+                regressions.append((stage, metric, old, new, change))
+    return regressions
+
+
+def print_table(results):
+    print(f"{'stage':<22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'per sec':>10}")
+    for stage, r in results.items():
+        if "skipped" in r:
+            print(f"{stage:<22} skipped: {r['skipped']}")
+            continue
+        print(f"{stage:<22} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+              f"{r['throughput_per_s'] or 0:>10.1f}")
+
+
+def synthetic_hands(n, seed=0):
+    """Plausible (n, 21, 3) normalized hand landmarks: a template hand with jitter and offsets."""
+    rng = np.random.default_rng(seed)
+    template = np.zeros((21, 3), dtype=np.float32)
+    template[0] = [0.5, 0.75, 0.0]
+    # Thumb along a diagonal, then four fingers fanning upwards from the palm.
+    for j in range(1, 5):
+        template[j] = [0.5 - 0.04 * j, 0.72 - 0.03 * j, -0.01 * j]
+    for f, x in enumerate([0.47, 0.5, 0.53, 0.56]):
+        base = 5 + 4 * f
+        for j in range(4):
+            template[base + j] = [x, 0.62 - 0.05 * j, -0.01 * j]
+    offsets = rng.uniform(-0.2, 0.2, size=(n, 1, 3)).astype(np.float32)
+    offsets[:, :, 2] = 0.0
+    jitter = rng.normal(0, 0.01, size=(n, 21, 3)).astype(np.float32)
+    return template[None] + offsets + jitter
+
+
+def synthetic_frames(n, width=640, height=480, seed=0):
+    """Frames with a moving bright blob over noise, so codecs and motion have work to do."""
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 60, size=(height, width, 3), dtype=np.uint8)
+    frames = []
+    import cv2
+    for i in range(n):
+        frame = base.copy()
+        cx = int(width * (0.2 + 0.6 * (i % 30) / 30))
+        cv2.circle(frame, (cx, height // 2), 60, (200, 180, 160), -1)
+        frames.append(frame)
+    return frames
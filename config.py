@@ -12,6 +12,8 @@ DATASET_DIR.mkdir(parents=True, exist_ok=True)
 # Default model path (landmark-based classifier)
 DEFAULT_MODEL_PATH = MODEL_DIR / "gesture_classifier.pkl"
 LABEL_ENCODER_PATH = MODEL_DIR / "label_encoder.pkl"
+# Memory-mapped model bundle (model/bundle.py); preferred over the pickles when present
+MODEL_BUNDLE_PATH = MODEL_DIR / "gesture_classifier.gmb"
 
 # MediaPipe / camera
 CAMERA_INDEX = 0
@@ -19,11 +21,96 @@ FRAME_WIDTH = 640
 FRAME_HEIGHT = 480
 TARGET_FPS = 30
 
+# Threaded capture: frames kept in the latest-frame buffer and how long
+# read_frame waits for a fresh one before giving up.
+CAPTURE_BUFFER_SIZE = 2
+CAPTURE_READ_TIMEOUT = 1.0
+
+# Hand landmarking: "full" runs MediaPipe on every full frame, "roi" only on
+# keyframes and otherwise on a padded crop around the last hands.
+HAND_TRACKING_MODE = os.environ.get("HAND_TRACKING_MODE", "full")
+ROI_KEYFRAME_INTERVAL = 10
+ROI_PADDING = 0.25  # extra margin on each side, as a fraction of the hand box size
+
+# Motion-gated inference (opt-in, MOTION_GATING=1): when the scene is static and nothing was
+# detected for ACTIVE_HOLD_SECONDS, run detection only IDLE_INFERENCE_FPS times per second.
+# Skipped frames reuse the last result, and distress_monitor.py does not verify them.
+MOTION_GATING = os.environ.get("MOTION_GATING", "0") == "1"
+MOTION_THRESHOLD = 0.01  # mean abs difference of a 64x48 grayscale thumbnail, 0..1
+IDLE_INFERENCE_FPS = 2.0
+ACTIVE_HOLD_SECONDS = 2.0
+
+# Temporal stage (detection/temporal.py, opt-in with TEMPORAL_SMOOTHING=1): per-hand window
+# of recent frames for dynamic gestures (wave) and label smoothing.
+TEMPORAL_SMOOTHING = os.environ.get("TEMPORAL_SMOOTHING", "0") == "1"
+TEMPORAL_WINDOW = 24  # frames of motion history per hand (~0.8 s at TARGET_FPS)
+TEMPORAL_VOTE_FRAMES = 8  # frames in the label confidence vote
+TEMPORAL_MIN_HOLD = 3  # frames a new label must lead the vote before the output switches
+TEMPORAL_MAX_MISSING = 10  # inferred frames without a hand before its history is dropped
+WAVE_MIN_REVERSALS = 3  # horizontal direction changes within the window
+WAVE_MIN_SPEED = 0.08  # mean horizontal palm speed, hand lengths per frame
+
+# Person tracking (detection/person_tracker.py): "detect" runs YOLO on every frame,
+# "propagate" every PERSON_DETECT_INTERVAL frames and moves boxes with a Kalman filter in between.
+PERSON_TRACKING_MODE = os.environ.get("PERSON_TRACKING_MODE", "detect")
+PERSON_DETECT_INTERVAL = 5
+PERSON_REDETECT_MOTION = 0.03  # motion score since the last detection that forces a new one
+PERSON_MAX_UNCERTAINTY = 0.3  # box centre std / box height that forces a new detection
+
+# Person-crop cascade (detection/cascade.py): hand landmarking only inside padded person boxes,
+# packed into one mosaic per MediaPipe pass. Opt-in with HAND_CASCADE=1: hands outside every
+# person box are then never landmarked. By default the full frame is landmarked.
+HAND_CASCADE = os.environ.get("HAND_CASCADE", "0") == "1"
+CASCADE_TILE_SIZE = 256  # mosaic cell size, pixels
+CASCADE_PADDING = 0.1  # added to each side of a person box, as a fraction of its size
+CASCADE_MAX_PERSONS = 1  # persons per MediaPipe pass; more shrinks every hand (see benchmarks/bench_cascade.py)
+CASCADE_MAX_UPSCALE = 2.0  # small (distant) persons are enlarged at most this much
+CASCADE_DUPLICATE_DISTANCE = 0.02  # wrists closer than this (fraction of frame) are the same hand
+
+# Hand-to-person association (detection/association.py)
+ASSOCIATION_MAX_GAP = 0.3  # how far a wrist may lie outside a person box, in box half-sizes
+HAND_TRACK_MAX_DISTANCE = 0.1  # wrist movement between inferred frames, fraction of the frame
+HAND_TRACK_MAX_MISSING = 15  # inferred frames a hand track survives without its hand
+
+# Alert verification (detection/verification.py): a track must show the distress signal
+# VERIFY_THRESHOLD_COUNT times within VERIFY_TIME_WINDOW seconds before an alert.
+VERIFY_THRESHOLD_COUNT = 3
+VERIFY_TIME_WINDOW = 20.0
+# Detected distress signals score 0.5 .. 1 (detection/gesture_logic.py), so 0.5 lets every
+# detection count, as the former fixed 0.9 confidence did. Raise it to require tighter fists.
+VERIFY_MIN_CONFIDENCE = 0.5
+ALERT_COOLDOWN = float(os.environ.get("ALERT_COOLDOWN", "60"))  # seconds between alerts for one track
+VERIFY_TRACK_TTL = 120.0  # seconds a track unseen by the verifier is kept before it is forgotten
+
+# Stream quality ladder for /video_feed, best first: (max width px, JPEG quality).
+# Viewers that fall behind step down the ladder; variants are encoded once per frame.
+STREAM_QUALITY_LADDER = [(640, 80), (480, 70), (320, 60), (240, 45)]
+STREAM_MAX_FPS = TARGET_FPS
+
+# Multi-camera engine: comma-separated camera indices, files or stream URLs,
+# e.g. CAMERA_SOURCES=0,1,rtsp://10.0.0.5/stream. Empty disables /video_feed/<id>.
+CAMERA_SOURCES = os.environ.get("CAMERA_SOURCES", "")
+SOURCE_WORKERS = int(os.environ.get("SOURCE_WORKERS", "0")) or None  # None = one per source, up to CPU count
+
 # Training
 MIN_SAMPLES_PER_CLASS = 200
 MAX_SAMPLES_PER_CLASS = 500
 TEST_SIZE = 0.2
 RANDOM_STATE = 42
+# Feature store (model/feature_store.py): append-only chunks of float32 feature rows
+FEATURE_STORE_DIR = DATASET_DIR / "store"
+FEATURE_COUNT = 63  # 21 landmarks x (x, y, z)
+STORE_CHUNK_ROWS = 4096  # compaction target
+# Incremental retraining: which dataset shards the current model has consumed
+TRAIN_MANIFEST_PATH = MODEL_DIR / "train_manifest.json"
+INCREMENTAL_TREES = 20  # trees grown per incremental update
+REPLAY_SAMPLES = 1000  # earlier samples mixed into each update, spread over labels
+FULL_REBUILD_EVERY = 5  # incremental updates before the next full rebuild
+# Model selection (train mode "select"): cross-validated search over model/selection.py CANDIDATES
+SELECTION_FOLDS = 5
+SELECTION_ACCURACY_FLOOR = 0.95  # publish the fastest candidate whose CV accuracy reaches this
+SELECTION_WORKERS = int(os.environ.get("SELECTION_WORKERS", "0")) or None  # None = CPU count
+SELECTION_CACHE_DIR = MODEL_DIR / "selection_cache"  # memory-mapped features and fold splits
 
 # Gesture → Emoji mapping (including happy, sad, crying)
 GESTURE_EMOJI_MAP = {
@@ -61,6 +148,29 @@ GESTURE_DISPLAY_NAMES = {
 ALERT_EMAIL_SENDER = os.environ.get("ALERT_EMAIL_SENDER", "")
 ALERT_EMAIL_RECEIVER = os.environ.get("ALERT_EMAIL_RECEIVER", "")
 ALERT_EMAIL_PASSWORD = os.environ.get("ALERT_EMAIL_PASSWORD", "") # Use App Password for Gmail
+ALERT_SMTP_SERVER = os.environ.get("ALERT_SMTP_SERVER", "smtp.gmail.com")
+ALERT_SMTP_PORT = int(os.environ.get("ALERT_SMTP_PORT", "465"))
+ALERT_SMTP_SSL = os.environ.get("ALERT_SMTP_SSL", "1") == "1"  # 0: plain SMTP + STARTTLS if offered
+ALERT_WEBHOOK_URL = os.environ.get("ALERT_WEBHOOK_URL", "")  # JSON POST per alert; empty disables
+
+# Alert dispatch (alerts/dispatch.py): alerts are delivered by a background worker.
+ALERT_QUEUE_SIZE = 32  # alerts waiting for the worker; further alerts are dropped and counted
+ALERT_COALESCE_SECONDS = 2.0  # alerts within this long after a delivery are merged into the next one
+ALERT_MAX_RETRIES = 3  # extra attempts per channel after a failed send
+ALERT_RETRY_BACKOFF = 1.0  # seconds before the first retry, doubled per attempt
+ALERT_RETRY_BACKOFF_MAX = 30.0
+
+# Alert evidence (alerts/evidence.py): recent frames kept JPEG-compressed in memory, capped
+# in bytes; each alert saves the EVIDENCE_PRE_SECONDS before it and EVIDENCE_POST_SECONDS after.
+# Opt-in with EVIDENCE_RECORDING=1, since clips of the scene are written to disk.
+EVIDENCE_RECORDING = os.environ.get("EVIDENCE_RECORDING", "0") == "1"
+EVIDENCE_DIR = Path(os.environ.get("EVIDENCE_DIR", BASE_DIR / "evidence"))
+EVIDENCE_BUFFER_BYTES = int(float(os.environ.get("EVIDENCE_BUFFER_MB", "64")) * 1024 * 1024)
+EVIDENCE_PRE_SECONDS = 10.0
+EVIDENCE_POST_SECONDS = 5.0
+EVIDENCE_MAX_WIDTH = 960  # frames are downscaled to at most this width before encoding
+EVIDENCE_JPEG_QUALITY = 75
+EVIDENCE_ENCODE_BACKLOG = 30  # frames waiting for the writer thread to encode; more are dropped
 
 # Auth (simple file-based for demo)
 SECRET_KEY = os.environ.get("SECRET_KEY", "change-me-in-production-hand-gesture")
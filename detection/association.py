@@ -0,0 +1,132 @@
+"""Hand-to-person association and persistent hand tracks.
+
+associate_hands() assigns every hand in a frame to a person box in one step.
+It builds an (hands x persons) cost matrix from containment and distance, then
+solves it optimally with the Hungarian algorithm. Each person box is offered
+max_hands times, so a person can own both of their hands, and a hand inside two
+overlapping boxes goes to the person it fits best rather than the first one
+listed. HandTracker gives hands IDs that persist across frames by matching
+wrist positions the same way, so per-hand state does not depend on the person
+detector keeping its IDs stable.
+"""
+from pathlib import Path
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import ASSOCIATION_MAX_GAP, HAND_TRACK_MAX_DISTANCE, HAND_TRACK_MAX_MISSING
+
+# Weight of the distance outside a box relative to the distance from its centre.
+OUTSIDE_PENALTY = 4.0
+# Stand-in for "not allowed": linear_sum_assignment rejects matrices whose rows cannot all be matched.
+INFEASIBLE = 1e9
+
+
+def association_costs(wrists, boxes, max_gap=ASSOCIATION_MAX_GAP):
+    """(H, P) cost of giving each hand to each person.
+
+    wrists: (H, 2) wrist pixel positions. boxes: (P, 4) person boxes x0, y0, x1, y1.
+    The cost is the wrist's distance from the box centre in units of the box's half
+    width/height, plus OUTSIDE_PENALTY times its distance outside the box in the
+    same units. Hands more than max_gap outside a box cost INFEASIBLE for it.
+    """
+    wrists = np.asarray(wrists, dtype=np.float64).reshape(-1, 1, 2)
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(1, -1, 4)
+    lo, hi = boxes[..., :2], boxes[..., 2:]
+    half = np.maximum((hi - lo) / 2.0, 1.0)
+    from_centre = np.linalg.norm((wrists - (lo + hi) / 2.0) / half, axis=2)
+    outside = np.linalg.norm(np.maximum(np.maximum(lo - wrists, wrists - hi), 0.0) / half, axis=2)
+    cost = from_centre + OUTSIDE_PENALTY * outside
+    cost[outside > max_gap] = INFEASIBLE
+    return cost
+
+
+def associate_hands(wrists, boxes, max_hands=2, max_gap=ASSOCIATION_MAX_GAP):
+    """(H,) index into boxes of the person owning each hand, -1 for unassigned hands.
+    Optimal over the whole frame; at most max_hands hands per person."""
+    n_hands, n_persons = len(wrists), len(boxes)
+    owner = np.full(n_hands, -1, dtype=np.intp)
+    if not n_hands or not n_persons:
+        return owner
+    cost = np.repeat(association_costs(wrists, boxes, max_gap), max_hands, axis=1)
+    rows, cols = linear_sum_assignment(cost)
+    ok = cost[rows, cols] < INFEASIBLE
+    owner[rows[ok]] = cols[ok] // max_hands
+    return owner
+
+
+class HandTrack:
+    """One hand's identity: last wrist position and owning person ID (-1 if none)."""
+
+    __slots__ = ("id", "wrist", "person_id", "hits", "missing", "unowned")
+
+    def __init__(self, track_id, wrist, person_id):
+        self.id = track_id
+        self.wrist = wrist
+        self.person_id = person_id
+        self.hits = 1
+        self.missing = 0
+        self.unowned = 0
+
+
+class HandTracker:
+    """Frame-to-frame hand identities from wrist positions.
+
+    update() matches this frame's wrists (normalized coordinates) to live tracks
+    by optimal assignment on distance, gated at max_distance. Unmatched hands start
+    new tracks; tracks unmatched for more than max_missing updates are dropped.
+    A track remembers the last person it was associated with for up to
+    max_missing updates in which its hand is in no person box, so brief
+    association gaps do not lose the owner.
+    """
+
+    def __init__(self, max_distance=HAND_TRACK_MAX_DISTANCE, max_missing=HAND_TRACK_MAX_MISSING):
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.tracks = []
+        self._next_id = 1
+
+    def update(self, wrists, person_ids=None):
+        """List of the HandTrack for each wrist, in order. person_ids: (H,) person
+        ID per hand (-1 when unassigned), e.g. from associate_hands."""
+        wrists = np.asarray(wrists, dtype=np.float64).reshape(-1, 2)
+        if person_ids is None:
+            person_ids = np.full(len(wrists), -1)
+        matched = [None] * len(wrists)
+        if len(wrists) and self.tracks:
+            previous = np.array([track.wrist for track in self.tracks])
+            dist = np.linalg.norm(wrists[:, None, :] - previous[None], axis=2)
+            dist[dist > self.max_distance] = INFEASIBLE
+            rows, cols = linear_sum_assignment(dist)
+            for row, col in zip(rows, cols):
+                if dist[row, col] < INFEASIBLE:
+                    matched[row] = self.tracks[col]
+
+        for i, track in enumerate(matched):
+            person_id = int(person_ids[i])
+            if track is None:
+                track = matched[i] = HandTrack(self._next_id, wrists[i], person_id)
+                self._next_id += 1
+                self.tracks.append(track)
+                continue
+            track.wrist = wrists[i]
+            track.hits += 1
+            track.missing = 0
+            if person_id != -1:
+                track.person_id, track.unowned = person_id, 0
+            else:
+                track.unowned += 1
+                if track.unowned > self.max_missing:
+                    track.person_id = -1
+
+        seen = {id(track) for track in matched}
+        for track in self.tracks:
+            if id(track) not in seen:
+                track.missing += 1
+        self.tracks = [track for track in self.tracks if track.missing <= self.max_missing]
+        return matched
+
+    def stats(self):
+        return {"tracks": len(self.tracks), "next_id": self._next_id}
@@ -0,0 +1,95 @@
+"""Constant-velocity Kalman filter that moves person boxes between detections.
+
+All tracks are filtered together: the state is an (n, 8) array of box centre,
+width, height and their per-frame velocities, and predict/update are a few
+batched matrix products. Process and measurement noise scale with box height,
+so a far-away person and a close one drift by the same relative amount.
+"""
+import numpy as np
+
+_F = np.eye(8)
+_F[:4, 4:] = np.eye(4)  # position += velocity each frame
+_H = np.eye(4, 8)
+
+
+def _xyxy_to_state(boxes):
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    centre = (boxes[:, :2] + boxes[:, 2:]) / 2.0
+    size = np.maximum(boxes[:, 2:] - boxes[:, :2], 1.0)
+    return np.hstack([centre, size])
+
+
+def _diag(values):
+    """(n, k) -> (n, k, k) diagonal matrices."""
+    out = np.zeros(values.shape + (values.shape[-1],))
+    idx = np.arange(values.shape[-1])
+    out[:, idx, idx] = values
+    return out
+
+
+class BoxKalman:
+    """Tracks keyed by detector ID; boxes are x0, y0, x1, y1 pixels.
+
+    std_position / std_velocity: noise standard deviations per frame as a fraction
+    of box height (the values DeepSORT uses).
+    """
+
+    def __init__(self, std_position=1 / 20, std_velocity=1 / 160):
+        self.std_position = std_position
+        self.std_velocity = std_velocity
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.x = np.zeros((0, 8))
+        self.P = np.zeros((0, 8, 8))
+        self.steps = np.zeros(0, dtype=np.int64)  # frames predicted since the last measurement
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _std(self, h, position_scale, velocity_scale):
+        h = h[:, None]
+        return np.hstack([np.repeat(position_scale * self.std_position * h, 4, axis=1),
+                          np.repeat(velocity_scale * self.std_velocity * h, 4, axis=1)])
+
+    def predict(self):
+        """Advance every track by one frame."""
+        if not len(self):
+            return
+        q = self._std(self.x[:, 3], 1.0, 1.0) ** 2
+        self.x = self.x @ _F.T
+        self.P = _F @ self.P @ _F.T + _diag(q)
+        self.steps += 1
+
+    def update(self, ids, boxes):
+        """Correct with a detection of all persons in the frame. Tracks whose ID is not
+        among ids are dropped; new IDs start tracks at rest."""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        z = _xyxy_to_state(boxes)
+        known = {int(i): k for k, i in enumerate(self.ids)}
+        rows = np.array([known.get(int(i), -1) for i in ids], dtype=np.int64)
+        x = np.zeros((len(ids), 8))
+        P = np.zeros((len(ids), 8, 8))
+
+        old, new = rows >= 0, rows < 0
+        if old.any():
+            xo, Po, zo = self.x[rows[old]], self.P[rows[old]], z[old]
+            R = _diag((self.std_position * xo[:, 3:4].repeat(4, axis=1)) ** 2)
+            S = _H @ Po @ _H.T + R
+            K = np.linalg.solve(S, _H @ Po).transpose(0, 2, 1)  # P H^T S^-1 (S symmetric)
+            innovation = zo - xo[:, :4]
+            x[old] = xo + np.einsum("nij,nj->ni", K, innovation)
+            P[old] = Po - K @ _H @ Po
+        if new.any():
+            x[new, :4] = z[new]
+            P[new] = _diag(self._std(z[new, 3], 2.0, 10.0) ** 2)
+
+        self.ids, self.x, self.P = ids, x, P
+        self.steps = np.zeros(len(ids), dtype=np.int64)
+
+    def boxes(self):
+        """(n, 4) current x0, y0, x1, y1."""
+        centre, half = self.x[:, :2], self.x[:, 2:4] / 2.0
+        return np.hstack([centre - half, centre + half])
+
+    def uncertainty(self):
+        """(n,) standard deviation of each box centre, as a fraction of box height."""
+        return np.sqrt(self.P[:, 0, 0] + self.P[:, 1, 1]) / np.maximum(self.x[:, 3], 1.0)
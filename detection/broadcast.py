@@ -0,0 +1,312 @@
+"""Single-producer broadcast: one capture/inference/encode loop shared by all stream viewers."""
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import STREAM_QUALITY_LADDER, TARGET_FPS
+from monitoring.metrics import STAGE_SECONDS, STREAM_CLIENTS
+
+_ENCODE_SECONDS = STAGE_SECONDS.labels(stage="encode")
+
+# One published frame. seq increases by one per frame; jpeg is quality level 0,
+# frame is the annotated BGR image other levels are encoded from (None for error
+# frames) and variants caches {level: jpeg bytes} shared by every viewer.
+FramePacket = namedtuple(
+    "FramePacket", ["seq", "timestamp", "jpeg", "label", "confidence", "emoji", "frame", "variants"]
+)
+
+
+def encode_level(frame, level, ladder=STREAM_QUALITY_LADDER):
+    """JPEG-encode frame at a quality-ladder level: (max width, JPEG quality)."""
+    width, quality = ladder[level]
+    h, w = frame.shape[:2]
+    if w > width:
+        frame = cv2.resize(frame, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buf.tobytes() if ok else None
+
+
+def render_error_frame(width=640, height=480):
+    """Black frame with the camera error text shown when no frame can be read."""
+    error_frame = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.putText(error_frame, "Camera Error: Not found or no permission", (50, 240),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+    cv2.putText(error_frame, "Check System Settings > Privacy > Camera", (50, 280),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    return error_frame
+
+
+class FrameBroadcaster:
+    """Runs source.read_frame() on one producer thread and fans the result out.
+
+    Each annotated frame is read, classified and JPEG-encoded exactly once no matter
+    how many clients are watching. Subscribers only ever see the latest packet; a
+    slow subscriber simply skips sequence numbers. The producer starts with the first
+    subscriber and stops after idle_timeout seconds without any.
+    """
+
+    def __init__(self, source, idle_timeout=5.0, error_retry=1.0, ladder=STREAM_QUALITY_LADDER):
+        """
+        source: object with read_frame() -> (frame, label, conf, emoji), e.g. GesturePipeline.
+        ladder: [(max_width, jpeg_quality), ...] from best to cheapest.
+        """
+        self.source = source
+        self.ladder = ladder
+        self.idle_timeout = idle_timeout
+        self.error_retry = error_retry
+        self._cond = threading.Condition()
+        self._packet = None
+        self._seq = 0
+        self._subscribers = 0
+        self._last_unsubscribe = time.time()
+        self._thread = None
+        self._stop = threading.Event()
+        self._error_jpeg = None
+        self._variant_lock = threading.Lock()
+        self.frames_encoded = 0
+        self.frame_interval = 1.0 / TARGET_FPS
+
+    @property
+    def subscriber_count(self):
+        return self._subscribers
+
+    @property
+    def running(self):
+        """False once stop() was called or the producer thread has exited."""
+        thread = self._thread
+        return not self._stop.is_set() and thread is not None and thread.is_alive()
+
+    def latest(self):
+        """Most recent FramePacket, or None before the first frame."""
+        return self._packet
+
+    def wait_for(self, after_seq, timeout=None):
+        """Block until a packet newer than after_seq exists; return it (or None on timeout,
+        or as soon as the broadcaster is no longer running)."""
+        def newer():
+            return self._packet is not None and self._packet.seq > after_seq
+
+        with self._cond:
+            self._cond.wait_for(lambda: newer() or not self.running, timeout)
+            return self._packet if newer() else None
+
+    def encoded(self, packet, level):
+        """JPEG bytes of packet at a ladder level, encoded once and cached for all viewers."""
+        if level == 0 or packet.frame is None:
+            return packet.jpeg
+        jpeg = packet.variants.get(level)
+        if jpeg is None:
+            with self._variant_lock:
+                jpeg = packet.variants.get(level)
+                if jpeg is None:
+                    with _ENCODE_SECONDS.time():
+                        jpeg = encode_level(packet.frame, level, self.ladder) or packet.jpeg
+                    packet.variants[level] = jpeg
+        return jpeg
+
+    @contextmanager
+    def subscribe(self, max_fps=None, level=None):
+        """Register a viewer for the duration of the with-block and yield a Subscription.
+
+        max_fps caps the viewer's frame rate; level pins a quality-ladder level,
+        None adapts it to how fast the viewer drains frames.
+        """
+        with self._cond:
+            self._subscribers += 1
+            self._ensure_running()
+        STREAM_CLIENTS.inc()
+        try:
+            yield Subscription(self, max_fps=max_fps, level=level)
+        finally:
+            STREAM_CLIENTS.dec()
+            with self._cond:
+                self._subscribers -= 1
+                self._last_unsubscribe = time.time()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _ensure_running(self):
+        # Called with self._cond held.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="frame-broadcaster", daemon=True)
+        self._thread.start()
+
+    def _idle(self):
+        with self._cond:
+            if self._subscribers == 0 and time.time() - self._last_unsubscribe > self.idle_timeout:
+                self._thread = None
+                return True
+            return False
+
+    def _publish(self, jpeg, label="—", conf=0.0, emoji="👋", frame=None):
+        now = time.time()
+        with self._cond:
+            if self._packet is not None and frame is not None:
+                # Smoothed producer frame period, used as the default viewer frame budget.
+                self.frame_interval += 0.1 * ((now - self._packet.timestamp) - self.frame_interval)
+            self._seq += 1
+            self._packet = FramePacket(self._seq, now, jpeg, label, conf, emoji, frame, {0: jpeg})
+            self._cond.notify_all()
+
+    def _run(self):
+        try:
+            self._produce()
+        finally:
+            with self._cond:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                self._cond.notify_all()  # wake subscribers so they see the producer is gone
+
+    def _produce(self):
+        while not self._stop.is_set():
+            if self._idle():
+                return
+            watched = self._subscribers > 0
+            if hasattr(self.source, "annotate"):
+                # Nobody watching (idle grace period): keep predictions fresh, skip drawing.
+                self.source.annotate = watched
+            try:
+                frame, label, conf, emoji = self.source.read_frame()
+            except Exception as e:
+                print(f"ERROR: Frame read failed: {e}")
+                self._stop.wait(self.error_retry)
+                continue
+
+            if frame is None:
+                if self._error_jpeg is None:
+                    _, buf = cv2.imencode(".jpg", render_error_frame())
+                    self._error_jpeg = buf.tobytes()
+                self._publish(self._error_jpeg)
+                self._stop.wait(self.error_retry)
+                continue
+
+            if not watched:
+                continue
+            with _ENCODE_SECONDS.time():
+                jpeg = encode_level(frame, 0, self.ladder)
+            if jpeg is None:
+                continue
+            self.frames_encoded += 1
+            self._publish(jpeg, label, conf, emoji, frame)
+
+
+class AdaptiveQuality:
+    """Picks a quality-ladder level from how long a viewer takes to accept each frame.
+
+    The time a streaming generator spends suspended in yield is the time the server
+    needed to push the previous frame into the client's socket. When that send time
+    eats most of the frame budget the viewer is falling behind, so we step down the
+    ladder; after a run of fast sends we step back up.
+    """
+
+    def __init__(self, n_levels, level=None, downgrade_ratio=0.8, upgrade_ratio=0.3,
+                 upgrade_after=30, smoothing=0.2):
+        self.n_levels = n_levels
+        self.auto = level is None
+        self.level = 0 if level is None else max(0, min(int(level), n_levels - 1))
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.upgrade_after = upgrade_after
+        self.smoothing = smoothing
+        self.send_time = 0.0
+        self._fast_streak = 0
+
+    def record(self, send_time, budget):
+        """Feed one measured send time (seconds) against the frame budget; return the level."""
+        self.send_time += self.smoothing * (send_time - self.send_time)
+        if not self.auto:
+            return self.level
+        if self.send_time > budget * self.downgrade_ratio:
+            self._fast_streak = 0
+            if self.level < self.n_levels - 1:
+                self.level += 1
+                # Give the cheaper level a fresh estimate instead of the slow history.
+                self.send_time = budget * self.upgrade_ratio
+        elif self.send_time < budget * self.upgrade_ratio:
+            self._fast_streak += 1
+            if self._fast_streak >= self.upgrade_after and self.level > 0:
+                self.level -= 1
+                self._fast_streak = 0
+        else:
+            self._fast_streak = 0
+        return self.level
+
+
+class Subscription:
+    """Paced iterator of (packet, jpeg) for one viewer; never yields the same frame twice.
+
+    A viewer that cannot keep up skips straight to the newest frame, and the skipped
+    count is kept in self.skipped. Iteration ends once the broadcaster is stopped or
+    its producer thread dies.
+    """
+
+    def __init__(self, broadcaster, max_fps=None, level=None, poll_timeout=1.0):
+        self.broadcaster = broadcaster
+        self.max_fps = max_fps
+        self.quality = AdaptiveQuality(len(broadcaster.ladder), level=level)
+        self.poll_timeout = poll_timeout
+        self.last_seq = 0
+        self.skipped = 0
+        self.sent = 0
+        self._yielded_at = None
+        self._next_due = 0.0
+
+    def _budget(self):
+        interval = self.broadcaster.frame_interval
+        if self.max_fps:
+            interval = max(interval, 1.0 / self.max_fps)
+        return interval
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        now = time.time()
+        if self._yielded_at is not None:
+            self.quality.record(now - self._yielded_at, self._budget())
+        if self.max_fps and now < self._next_due:
+            time.sleep(self._next_due - now)
+        while True:
+            packet = self.broadcaster.wait_for(self.last_seq, timeout=self.poll_timeout)
+            if packet is not None:
+                break
+            if not self.broadcaster.running:
+                raise StopIteration
+        if self.last_seq:
+            self.skipped += packet.seq - self.last_seq - 1
+        self.last_seq = packet.seq
+        jpeg = self.broadcaster.encoded(packet, self.quality.level)
+        self.sent += 1
+        self._yielded_at = time.time()
+        if self.max_fps:
+            self._next_due = self._yielded_at + 1.0 / self.max_fps
+        return packet, jpeg
+
+
+# Global broadcaster for the Flask video feed
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster():
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            from detection.pipeline import get_pipeline
+            _broadcaster = FrameBroadcaster(get_pipeline())
+        return _broadcaster
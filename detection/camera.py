@@ -47,3 +47,27 @@ def frame_to_rgb(frame_bgr):
     if frame_bgr is None:
         return None
     return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+
+def parse_source(source):
+    """Camera index for digit strings like "1", otherwise the value itself (file path or URL)."""
+    if isinstance(source, str) and source.strip().isdigit():
+        return int(source.strip())
+    return source
+
+
+def is_live_source(source):
+    """True for camera indices and network streams, False for recorded files."""
+    source = parse_source(source)
+    return isinstance(source, int) or "://" in str(source)
+
+
+def open_source(source):
+    """Open a camera index, video file or stream URL without the index fallback of get_camera."""
+    source = parse_source(source)
+    cap = cv2.VideoCapture(source if isinstance(source, int) else str(source))
+    if isinstance(source, int) and cap.isOpened():
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+    if not cap.isOpened():
+        logger.error(f"Could not open video source {source!r}")
+    return cap
@@ -0,0 +1,140 @@
+"""Threaded camera capture feeding a bounded latest-frame buffer."""
+import threading
+import time
+import logging
+from collections import deque
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from monitoring.metrics import FRAMES_CAPTURED, FRAMES_DROPPED, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRingBuffer:
+    """Bounded buffer of captured frames that always hands out the freshest one.
+
+    When the buffer is full the oldest frame is dropped. Taking a frame returns the
+    newest entry and discards everything older, so a slow consumer never works
+    through a backlog of stale frames.
+    """
+
+    def __init__(self, capacity=2):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._frames = deque()
+        self._capacity = capacity
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame, timestamp=None):
+        """Store a frame and return its sequence number."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._cond:
+            if len(self._frames) >= self._capacity:
+                self._frames.popleft()
+                self.dropped += 1
+                FRAMES_DROPPED.inc()
+            self._seq += 1
+            self._frames.append((self._seq, timestamp, frame))
+            self._cond.notify_all()
+            return self._seq
+
+    def get_latest(self, timeout=None):
+        """Return (seq, timestamp, frame) for the newest frame, or None on timeout/close."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._frames or self._closed, timeout):
+                return None
+            if not self._frames:
+                return None
+            item = self._frames.pop()
+            if self._frames:
+                self.dropped += len(self._frames)
+                FRAMES_DROPPED.inc(len(self._frames))
+                self._frames.clear()
+            return item
+
+    def close(self):
+        """Wake up any waiting consumer; later get_latest calls return None once empty."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._frames)
+
+
+class CaptureThread:
+    """Reads frames from an OpenCV capture on a background thread into a FrameRingBuffer."""
+
+    def __init__(self, cap, buffer, reopen=None, max_failures=30):
+        """
+        cap: object with read()/isOpened()/release() (cv2.VideoCapture).
+        buffer: FrameRingBuffer receiving frames.
+        reopen: optional callable returning a new capture when the current one fails.
+        max_failures: consecutive failed reads before trying to reopen the camera.
+        """
+        self.cap = cap
+        self.buffer = buffer
+        self.reopen = reopen
+        self.max_failures = max_failures
+        self.captured = 0
+        self.failed_reads = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        failures = 0
+        capture_seconds = STAGE_SECONDS.labels(stage="capture")
+        while not self._stop.is_set():
+            if self.cap is None or not self.cap.isOpened():
+                if not self._try_reopen():
+                    self._stop.wait(1.0)
+                continue
+            t0 = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                failures += 1
+                self.failed_reads += 1
+                if failures >= self.max_failures:
+                    failures = 0
+                    self._try_reopen()
+                else:
+                    self._stop.wait(0.01)
+                continue
+            failures = 0
+            capture_seconds.observe(time.perf_counter() - t0)
+            self.captured += 1
+            FRAMES_CAPTURED.inc()
+            self.buffer.put(frame)
+
+    def _try_reopen(self):
+        if self.reopen is None:
+            return False
+        logger.warning("Capture failed; reopening camera")
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = self.reopen()
+        return self.cap is not None and self.cap.isOpened()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        self.buffer.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,175 @@
+"""Person-crop cascade: hand landmarking only where the person detector found people.
+
+PersonHandCascade.process() takes the frame and the person boxes from
+PersonTracker. With no persons it returns immediately, without running
+MediaPipe. Otherwise each box is padded, cropped and scaled to fit a tile
+of tile x tile pixels. Persons are taken in ID order, max_persons at a time,
+and each group's tiles are packed into one mosaic image for a single MediaPipe
+pass. Every group position has its own landmarker, because MediaPipe tracks
+hands from one call to the next and the same person should land in the same
+place each frame. MediaPipe shrinks its input to a 192 px palm-detector image,
+so each extra tile makes every hand smaller. The default is therefore one
+person per pass; compare recall with benchmarks/bench_cascade.py before
+raising it. Landmarks found in a tile are mapped back to
+full-frame normalized coordinates and tagged with that tile's person ID, so
+ownership comes from the crop rather than from guessing which box a wrist
+falls in. When crops overlap, a hand seen in several of them is kept once, for
+the person whose box it fits best (see association_costs).
+"""
+import math
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    CASCADE_TILE_SIZE, CASCADE_PADDING, CASCADE_MAX_PERSONS, CASCADE_MAX_UPSCALE, CASCADE_DUPLICATE_DISTANCE,
+)
+from detection.association import association_costs
+from detection.landmarks import HandLandmarker, HandBatch
+
+
+def crop_box(box, width, height, padding=CASCADE_PADDING):
+    """Person box x0, y0, x1, y1 padded by a fraction of its size on each side and clamped to the frame."""
+    x0, y0, x1, y1 = (float(v) for v in box)
+    pad_x, pad_y = (x1 - x0) * padding, (y1 - y0) * padding
+    x0, y0 = max(int(x0 - pad_x), 0), max(int(y0 - pad_y), 0)
+    x1, y1 = min(int(math.ceil(x1 + pad_x)), width), min(int(math.ceil(y1 + pad_y)), height)
+    return x0, y0, x1, y1
+
+
+class PersonHandCascade:
+    """Hand landmarks per person from one mosaic of person crops per pass.
+
+    landmarker: HandLandmarker-like object (process_batch) used for every group;
+    by default each group gets a HandLandmarker that finds up to two hands per tile.
+    """
+
+    def __init__(self, tile=CASCADE_TILE_SIZE, padding=CASCADE_PADDING, max_persons=CASCADE_MAX_PERSONS,
+                 max_upscale=CASCADE_MAX_UPSCALE, duplicate_distance=CASCADE_DUPLICATE_DISTANCE, landmarker=None,
+                 **landmarker_kwargs):
+        self.tile = tile
+        self.padding = padding
+        self.max_persons = max_persons
+        self.max_upscale = max_upscale
+        self.duplicate_distance = duplicate_distance
+        self.landmarker = landmarker
+        self._landmarker_kwargs = landmarker_kwargs
+        self._landmarkers = []
+        self._mosaic = None
+        self.frames = 0
+        self.skipped = 0
+        self.passes = 0
+        self.duplicates = 0
+
+    def _group_landmarker(self, group):
+        if self.landmarker is not None:
+            return self.landmarker
+        while len(self._landmarkers) <= group:
+            self._landmarkers.append(HandLandmarker(max_num_hands=2 * self.max_persons, **self._landmarker_kwargs))
+        return self._landmarkers[group]
+
+    def _layout(self, n):
+        cols = math.ceil(math.sqrt(n))
+        return math.ceil(n / cols), cols
+
+    def _run_group(self, frame_rgb, persons, landmarker):
+        """(landmarks, handedness, scores, person ids) for hands found in one mosaic pass."""
+        h, w = frame_rgb.shape[:2]
+        rows, cols = self._layout(len(persons))
+        shape = (rows * self.tile, cols * self.tile, 3)
+        if self._mosaic is None or self._mosaic.shape != shape:
+            self._mosaic = np.zeros(shape, dtype=np.uint8)
+        else:
+            self._mosaic[:] = 0
+
+        # Per tile: crop origin (frame px), scale (tile px per frame px), placed size (tile px).
+        origin = np.zeros((len(persons), 2))
+        scale = np.zeros(len(persons))
+        placed = np.zeros((len(persons), 2))
+        for k, person in enumerate(persons):
+            x0, y0, x1, y1 = crop_box(person["box"], w, h, self.padding)
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+            s = min(self.tile / (x1 - x0), self.tile / (y1 - y0), self.max_upscale)
+            tw, th = max(int((x1 - x0) * s), 1), max(int((y1 - y0) * s), 1)
+            ty, tx = (k // cols) * self.tile, (k % cols) * self.tile
+            self._mosaic[ty:ty + th, tx:tx + tw] = cv2.resize(frame_rgb[y0:y1, x0:x1], (tw, th),
+                                                              interpolation=cv2.INTER_AREA)
+            origin[k], scale[k], placed[k] = (x0, y0), s, (tw, th)
+
+        found = landmarker.process_batch(self._mosaic)
+        self.passes += 1
+        if not found:
+            return None
+        mh, mw = shape[:2]
+        px = found.landmarks[..., :2] * (mw, mh)  # (n, 21, 2) mosaic pixels
+        centre = px.mean(axis=1)
+        col = np.clip((centre[:, 0] // self.tile).astype(int), 0, cols - 1)
+        row = np.clip((centre[:, 1] // self.tile).astype(int), 0, rows - 1)
+        tile_index = row * cols + col
+        local = centre - np.stack([col, row], axis=1) * self.tile
+        # Hands whose centre is in an empty tile or the black margin beside a crop belong to nobody.
+        valid = tile_index < len(persons)
+        valid[valid] &= (local[valid] < placed[tile_index[valid]]).all(axis=1) & (scale[tile_index[valid]] > 0)
+        if not valid.any():
+            return None
+        k = tile_index[valid]
+        tile_origin = np.stack([col[valid], row[valid]], axis=1)[:, None, :] * self.tile
+        mapped = found.landmarks[valid].copy()
+        frame_px = (px[valid] - tile_origin) / scale[k][:, None, None] + origin[k][:, None, :]
+        mapped[..., :2] = frame_px / (w, h)
+        # MediaPipe z uses roughly the same scale as x.
+        mapped[..., 2] *= mw / (scale[k][:, None] * w)
+        person_ids = np.array([persons[i]["id"] for i in k], dtype=np.int64)
+        boxes = np.array([persons[i]["box"] for i in k], dtype=np.float64).reshape(-1, 4)
+        return mapped, found.handedness[valid].copy(), found.scores[valid].copy(), person_ids, boxes
+
+    def _deduplicate(self, landmarks, boxes, width, height):
+        """Indices of hands to keep: of hands whose wrists are within duplicate_distance
+        of each other, only the one that fits its own person box best."""
+        wrists = landmarks[:, 0, :2].astype(np.float64)
+        cost = association_costs(wrists * (width, height), boxes, max_gap=np.inf).diagonal()
+        close = np.linalg.norm(wrists[:, None] - wrists[None], axis=2) < self.duplicate_distance
+        keep = []
+        for i in np.argsort(cost, kind="stable"):
+            if not close[i, keep].any():
+                keep.append(i)
+        return np.sort(keep)
+
+    def process(self, frame_rgb, persons):
+        """(HandBatch in full-frame normalized coordinates, (n,) owning person ID per hand)."""
+        self.frames += 1
+        parts = []
+        if persons:
+            persons = sorted(persons, key=lambda p: p["id"])
+            for group, start in enumerate(range(0, len(persons), self.max_persons)):
+                part = self._run_group(frame_rgb, persons[start:start + self.max_persons],
+                                       self._group_landmarker(group))
+                if part is not None:
+                    parts.append(part)
+        else:
+            self.skipped += 1
+        if not parts:
+            return HandBatch(np.zeros((0, 21, 3), dtype=np.float32), np.zeros(0, dtype=np.int8),
+                             np.zeros(0, dtype=np.float32)), np.zeros(0, dtype=np.int64)
+        landmarks, handedness, scores, person_ids, boxes = (np.concatenate(column) for column in zip(*parts))
+        keep = self._deduplicate(landmarks, boxes, frame_rgb.shape[1], frame_rgb.shape[0])
+        self.duplicates += len(landmarks) - len(keep)
+        return HandBatch(landmarks[keep].astype(np.float32), handedness[keep], scores[keep]), person_ids[keep]
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "passes": self.passes,
+            "duplicates": self.duplicates,
+            "skip_ratio": round(self.skipped / self.frames, 3) if self.frames else 0.0,
+        }
+
+    def close(self):
+        for landmarker in self._landmarkers or [self.landmarker]:
+            if landmarker is not None:
+                landmarker.close()
@@ -1,69 +1,61 @@
 import numpy as np
 
-def is_distress_signal(landmarks):
+# Landmark mapping:
+# 0: Wrist
+# 4: Thumb Tip, 3: Thumb IP, 2: Thumb MCP, 1: Thumb CMC
+# 8: Index Tip, 7: Index DIP, 6: Index PIP, 5: Index MCP
+# 12: Middle Tip, 11: Middle DIP, 10: Middle PIP, 9: Middle MCP
+# 16: Ring Tip, 15: Ring DIP, 14: Ring PIP, 13: Ring MCP
+# 20: Pinky Tip, 19: Pinky DIP, 18: Pinky PIP, 17: Pinky MCP
+FINGER_TIPS = [8, 12, 16, 20]
+FINGER_PIPS = [6, 10, 14, 18]
+
+# Margins (in hand lengths, wrist to middle MCP) at which a criterion counts as fully met.
+# They only grade confidence above 0.5 and are not calibrated against recorded hands;
+# whether a signal is detected does not depend on them.
+FINGER_CURL_MARGIN = 0.15  # finger tip below its PIP joint
+THUMB_TUCK_MARGIN = 0.1  # thumb tip below the index MCP
+
+
+def is_distress_signal_batch(landmarks):
     """
-    Heuristic for the 'Signal for Help' (Distress Signal).
+    Heuristic for the 'Signal for Help' (Distress Signal), vectorized over hands.
     1. Palm open, thumb out.
     2. Thumb tucked under fingers.
     3. Fingers closed over thumb.
-    
-    This function detects the 'final' state (fist with thumb tucked inside).
+
+    Detects the 'final' state (fist with thumb tucked inside): every finger tip is
+    below its PIP joint and the thumb tip is below the index MCP (in MediaPipe image
+    coords, Y increases downwards).
+
+    landmarks: shape (N, 21, 3) - [x, y, z] normalized. Rows containing NaN (e.g.
+    frames without a hand in recorded results) score False.
+    Returns (is_distress (N,) bool, confidence (N,) float32). Confidence is 0 when the
+    signal is not detected, otherwise 0.5 .. 1 depending on how clearly the fingers
+    are curled and the thumb is tucked, relative to the hand's size.
+    """
+    lms = np.asarray(landmarks, dtype=np.float32).reshape(-1, 21, 3)
+    y = lms[:, :, 1]
+    # Hand length makes the margins independent of the distance to the camera.
+    scale = np.maximum(np.hypot(lms[:, 9, 0] - lms[:, 0, 0], lms[:, 9, 1] - lms[:, 0, 1]), 1e-6)
+
+    curl = (y[:, FINGER_TIPS] - y[:, FINGER_PIPS]) / scale[:, None]  # (N, 4), >= 0 when closed
+    tuck = (y[:, 4] - y[:, 5]) / scale  # > 0 when the thumb tip is below the index MCP
+    detected = (curl >= 0).all(axis=1) & (tuck > 0)
+
+    curl_score = np.clip(curl / FINGER_CURL_MARGIN, 0.0, 1.0).mean(axis=1)
+    tuck_score = np.clip(tuck / THUMB_TUCK_MARGIN, 0.0, 1.0)
+    confidence = np.where(detected, 0.5 + 0.5 * np.minimum(curl_score, tuck_score), 0.0)
+    return detected, confidence.astype(np.float32)
+
+
+def is_distress_signal(landmarks):
+    """
+    Single-hand wrapper around is_distress_signal_batch.
     landmarks: shape (21, 3) - [x, y, z] normalized.
+    Returns (is_distress, confidence).
     """
     if landmarks is None or len(landmarks) < 21:
         return False, 0.0
-
-    # Landmark mapping:
-    # 0: Wrist
-    # 4: Thumb Tip, 3: Thumb IP, 2: Thumb MCP, 1: Thumb CMC
-    # 8: Index Tip, 7: Index DIP, 6: Index PIP, 5: Index MCP
-    # 12: Middle Tip, 11: Middle DIP, 10: Middle PIP, 9: Middle MCP
-    # 16: Ring Tip, 15: Ring DIP, 14: Ring PIP, 13: Ring MCP
-    # 20: Pinky Tip, 19: Pinky DIP, 18: Pinky PIP, 17: Pinky MCP
-
-    # 1. Check if thumb is tucked (Landmark 4 is closer to palm center than other fingers)
-    # Palm center approximation: midpoint of MCPs (5, 9, 13, 17)
-    mcp_indices = [5, 9, 13, 17]
-    palm_center_x = np.mean([landmarks[i][0] for i in mcp_indices])
-    palm_center_y = np.mean([landmarks[i][1] for i in mcp_indices])
-    
-    thumb_tip = landmarks[4]
-    
-    # Simple check: thumb tip is between pinky and index MCP in X, and close in Y
-    # More robust: thumb tip is 'inside' the region formed by fingers
-    
-    # 2. Check if fingers are closed (Tips 8, 12, 16, 20 are below PIP joints 6, 10, 14, 18)
-    # In MediaPipe image coords, Y increases downwards.
-    fingers_closed = True
-    for tip, pip in [(8, 6), (12, 10), (16, 14), (20, 18)]:
-        if landmarks[tip][1] < landmarks[pip][1]: # Tip is above PIP (Extended)
-            fingers_closed = False
-            break
-    
-    # 3. Check if thumb is 'covered' (Thumb tip Y is greater than finger MCPs but less than finger Tips)
-    # Actually, thumb tucked usually means it's pushed towards the pinky side.
-    thumb_tucked = landmarks[4][0] > palm_center_x # For right hand (assuming x increases right)
-    # This varies by hand side. Let's use distance to palm center.
-    
-    thumb_dist = np.sqrt((landmarks[4][0] - palm_center_x)**2 + (landmarks[4][1] - palm_center_y)**2)
-    
-    # Heuristic: Distant from palm is open, close is tucked.
-    # But thumb tip distance is hard to normalize without a reference.
-    
-    # Better Heuristic for "Signal for Help" (Fist with thumb in):
-    # - Fingers (8, 12, 16, 20) are CLOSED (Tips below PIP joints).
-    # - Thumb (4) is TUCKED (4 is between Landmark 13 and 17 in X).
-    
-    is_fist = fingers_closed
-    
-    # Check if thumb is inside the fist
-    # Thumb tip (4) should be closer to middle/ring MCPs (9, 13) than its own MCP (2)
-    dist_thumb_to_palm = np.linalg.norm(landmarks[4] - landmarks[9])
-    dist_thumb_to_origin = np.linalg.norm(landmarks[4] - landmarks[2])
-    
-    # If fingers are closed and thumb is tucked
-    if is_fist and (landmarks[4][1] > landmarks[5][1]): # Thumb tip below Index MCP
-        # Confidence score could be based on how tightly closed it is
-        return True, 0.9
-        
-    return False, 0.0
+    detected, confidence = is_distress_signal_batch(np.asarray(landmarks)[:21][None])
+    return bool(detected[0]), float(confidence[0])
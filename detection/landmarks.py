@@ -1,59 +1,91 @@
 """Extract hand landmarks using MediaPipe."""
-import cv2
 import mediapipe as mp
 import numpy as np
 
+from detection.overlay import draw_hands
+
+
+# Handedness codes used in HandBatch.handedness
+LEFT, RIGHT, UNKNOWN_HAND = 0, 1, -1
+_HANDEDNESS_CODES = {"Left": LEFT, "Right": RIGHT}
+HANDEDNESS_NAMES = {LEFT: "Left", RIGHT: "Right", UNKNOWN_HAND: "Unknown"}
+
+
+class HandBatch:
+    """All hands found in one frame as arrays.
+
+    landmarks: (n, 21, 3) float32 normalized [x, y, z]
+    handedness: (n,) int8, LEFT / RIGHT / UNKNOWN_HAND
+    scores: (n,) float32 handedness classification score
+
+    The arrays returned by HandLandmarker.process_batch are views into buffers that
+    are reused on the next call; use copy() to keep them longer.
+    """
+    __slots__ = ("landmarks", "handedness", "scores")
+
+    def __init__(self, landmarks, handedness, scores):
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def __bool__(self):
+        return len(self.landmarks) > 0
+
+    def copy(self):
+        return HandBatch(self.landmarks.copy(), self.handedness.copy(), self.scores.copy())
+
+    def handedness_names(self):
+        return [HANDEDNESS_NAMES[int(h)] for h in self.handedness]
+
 
 class HandLandmarker:
     def __init__(self, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5):
         self.mp_hands = mp.solutions.hands
+        self.max_num_hands = max_num_hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=max_num_hands,
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence,
         )
+        # Reused every frame; process_batch returns views of the first n rows.
+        self._landmarks = np.zeros((max_num_hands, 21, 3), dtype=np.float32)
+        self._handedness = np.full(max_num_hands, UNKNOWN_HAND, dtype=np.int8)
+        self._scores = np.zeros(max_num_hands, dtype=np.float32)
+
+    def process_batch(self, frame_rgb):
+        """Detect hands and return a HandBatch (views into reused buffers)."""
+        results = self.hands.process(frame_rgb)
+        hand_list = results.multi_hand_landmarks or ()
+        handedness = results.multi_handedness or ()
+        n = min(len(hand_list), self.max_num_hands)
+        for i in range(n):
+            self._landmarks[i] = [(lm.x, lm.y, lm.z) for lm in hand_list[i].landmark]
+            if i < len(handedness):
+                cls = handedness[i].classification[0]
+                self._handedness[i] = _HANDEDNESS_CODES.get(cls.label, UNKNOWN_HAND)
+                self._scores[i] = cls.score
+            else:
+                self._handedness[i] = UNKNOWN_HAND
+                self._scores[i] = 0.0
+        return HandBatch(self._landmarks[:n], self._handedness[:n], self._scores[:n])
 
     def process(self, frame_rgb):
         """Return list of hand landmark arrays (21 x 3) per hand, or [] if none."""
-        results = self.hands.process(frame_rgb)
-        out = []
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                arr = []
-                for lm in hand_landmarks.landmark:
-                    arr.append([lm.x, lm.y, lm.z])
-                out.append(np.array(arr, dtype=np.float32))
-        return out
+        batch = self.process_batch(frame_rgb)
+        if not batch:
+            return []
+        # One copy for all hands; the list items are independent of the reused buffer.
+        return list(batch.landmarks.copy())
 
     def draw_landmarks(self, frame, hand_landmarks_list):
         """Draw landmarks on BGR frame. hand_landmarks_list from process (raw coords 0-1)."""
-        if not hand_landmarks_list:
+        if hand_landmarks_list is None or len(hand_landmarks_list) == 0:
             return frame
-        h, w = frame.shape[:2]
-        mp_draw = mp.solutions.drawing_utils
-        mp_hand = self.mp_hands.HandLandmark
-        for hand_landmarks in hand_landmarks_list:
-            # Convert to pixel coords for drawing
-            pts = []
-            for lm in hand_landmarks:
-                x, y = int(lm[0] * w), int(lm[1] * h)
-                pts.append((x, y))
-            for i, pt in enumerate(pts):
-                cv2.circle(frame, pt, 4, (0, 255, 0), -1)
-            # Draw connections (simplified: thumb, index, etc.)
-            connections = [
-                (0, 1), (1, 2), (2, 3), (3, 4),  # thumb
-                (0, 5), (5, 6), (6, 7), (7, 8),  # index
-                (0, 9), (9, 10), (10, 11), (11, 12),  # middle
-                (0, 13), (13, 14), (14, 15), (15, 16),  # ring
-                (0, 17), (17, 18), (18, 19), (19, 20),  # pinky
-                (5, 9), (9, 13), (13, 17),
-            ]
-            for i, j in connections:
-                if i < len(pts) and j < len(pts):
-                    cv2.line(frame, pts[i], pts[j], (0, 255, 0), 2)
-        return frame
+        return draw_hands(frame, np.asarray(hand_landmarks_list, dtype=np.float32))
 
     def close(self):
         self.hands.close()
@@ -0,0 +1,285 @@
+"""Multi-camera engine: GesturePipeline workers for many sources across a process pool."""
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from detection.camera import parse_source, is_live_source
+
+
+def parse_sources(spec):
+    """Split a comma-separated source list ("0,1,rtsp://cam/stream") into sources."""
+    if not spec:
+        return []
+    if isinstance(spec, (list, tuple)):
+        return [parse_source(s) for s in spec]
+    return [parse_source(s) for s in str(spec).split(",") if s.strip()]
+
+
+def make_source_pipeline(source):
+    """Default per-source worker: a GesturePipeline reading from source.
+
+    Live sources get the threaded capture stage; recorded files are read
+    frame by frame so nothing is dropped.
+    """
+    from detection.camera import open_source
+    from detection.pipeline import GesturePipeline
+    return GesturePipeline(cap=open_source(source), threaded=is_live_source(source))
+
+
+def _worker_main(worker_id, assigned, results, stop_event, pipeline_factory, jpeg_quality):
+    """Process entry point: run one pipeline per assigned (source_id, source) round-robin."""
+    import cv2
+
+    factory = pipeline_factory or make_source_pipeline
+    pipelines = {}
+    for source_id, source in assigned:
+        try:
+            pipelines[source_id] = (source, factory(source))
+        except Exception as e:
+            print(f"ERROR: worker {worker_id} could not open source {source!r}: {e}")
+            results.put({"source_id": source_id, "worker": worker_id, "finished": True, "error": str(e)})
+
+    seqs = {source_id: 0 for source_id in pipelines}
+    queue_drops = 0
+    encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+    while pipelines and not stop_event.is_set():
+        for source_id in list(pipelines):
+            source, pipeline = pipelines[source_id]
+            started = time.perf_counter()
+            try:
+                frame, label, conf, emoji = pipeline.read_frame()
+            except Exception as e:
+                # One broken source must not take the worker's other sources down with it.
+                print(f"ERROR: worker {worker_id} dropped source {source!r} after a read failure: {e}")
+                del pipelines[source_id]
+                results.put({"source_id": source_id, "worker": worker_id, "finished": True, "error": str(e)})
+                try:
+                    pipeline.release()
+                except Exception:
+                    pass
+                continue
+            if frame is None:
+                if not is_live_source(source):
+                    # Recorded file exhausted.
+                    pipeline.release()
+                    del pipelines[source_id]
+                    results.put({"source_id": source_id, "worker": worker_id, "finished": True})
+                continue
+            ok, buf = cv2.imencode(".jpg", frame, encode_params)
+            seqs[source_id] += 1
+            result = {
+                "source_id": source_id,
+                "worker": worker_id,
+                "seq": seqs[source_id],
+                "timestamp": time.time(),
+                "label": label,
+                "confidence": conf,
+                "emoji": emoji,
+                "landmarks": getattr(pipeline, "_last_landmarks", None),
+                "jpeg": buf.tobytes() if ok else None,
+                "process_time": time.perf_counter() - started,
+                "queue_drops": queue_drops,
+            }
+            try:
+                results.put_nowait(result)
+            except queue.Full:
+                # The aggregator only keeps the latest result per source anyway.
+                queue_drops += 1
+
+    for _, pipeline in pipelines.values():
+        pipeline.release()
+
+
+class SourceState:
+    """Latest result and counters for one source, kept by the aggregator."""
+
+    def __init__(self, source_id, source, worker):
+        self.source_id = source_id
+        self.source = source
+        self.worker = worker
+        self.latest = None
+        self.frames = 0
+        self.queue_drops = 0
+        self.process_time = 0.0
+        self.finished = False
+        self.error = None
+
+    def to_dict(self, elapsed):
+        latest = self.latest or {}
+        return {
+            "source_id": self.source_id,
+            "source": str(self.source),
+            "worker": self.worker,
+            "frames": self.frames,
+            "fps": round(self.frames / elapsed, 2) if elapsed > 0 else 0.0,
+            "avg_process_ms": round(1000.0 * self.process_time / self.frames, 2) if self.frames else 0.0,
+            "queue_drops": self.queue_drops,
+            "finished": self.finished,
+            "error": self.error,
+            "label": latest.get("label", "—"),
+            "confidence": latest.get("confidence", 0.0),
+            "emoji": latest.get("emoji", "👋"),
+        }
+
+
+class MultiSourceEngine:
+    """Runs GesturePipeline workers for many sources in separate processes.
+
+    Sources are spread round-robin over `workers` processes (default: one per source,
+    capped at the CPU count). A single aggregator thread in this process drains the
+    shared result queue and keeps the latest prediction and JPEG per source.
+    """
+
+    def __init__(self, sources, workers=None, pipeline_factory=None, jpeg_quality=80, queue_size=None):
+        """
+        sources: list of camera indices, file paths or stream URLs.
+        pipeline_factory: picklable callable source -> object with read_frame()/release();
+            defaults to make_source_pipeline.
+        """
+        self.sources = list(sources)
+        if not self.sources:
+            raise ValueError("MultiSourceEngine needs at least one source")
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.sources)))
+        self.pipeline_factory = pipeline_factory
+        self.jpeg_quality = jpeg_quality
+        self.queue_size = queue_size or 4 * len(self.sources)
+        self._ctx = mp.get_context("spawn")
+        self._results = None
+        self._stop_event = None
+        self._processes = []
+        self._aggregator = None
+        self._cond = threading.Condition()
+        self._running = False
+        self._aggregating = False
+        self.started_at = None
+        self.states = {
+            i: SourceState(i, source, i % self.workers) for i, source in enumerate(self.sources)
+        }
+
+    def start(self):
+        if self._running:
+            return self
+        self._results = self._ctx.Queue(self.queue_size)
+        self._stop_event = self._ctx.Event()
+        for worker_id in range(self.workers):
+            assigned = [(i, s) for i, s in enumerate(self.sources) if i % self.workers == worker_id]
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(worker_id, assigned, self._results, self._stop_event,
+                      self.pipeline_factory, self.jpeg_quality),
+                name=f"gesture-source-worker-{worker_id}",
+                daemon=True,
+            )
+            proc.start()
+            self._processes.append(proc)
+        self._running = True
+        self._aggregating = True
+        self.started_at = time.time()
+        self._aggregator = threading.Thread(target=self._aggregate, name="source-aggregator", daemon=True)
+        self._aggregator.start()
+        return self
+
+    @property
+    def running(self):
+        """False once stop() was called or every worker has exited and the results are drained."""
+        return self._running and self._aggregating
+
+    def _aggregate(self):
+        try:
+            self._drain()
+        finally:
+            with self._cond:
+                self._aggregating = False
+                self._cond.notify_all()  # wake wait_for() callers so they see the engine is done
+
+    def _drain(self):
+        while self._running:
+            try:
+                result = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self._processes):
+                    break
+                continue
+            with self._cond:
+                state = self.states[result["source_id"]]
+                if result.get("finished"):
+                    state.finished = True
+                    state.error = result.get("error")
+                else:
+                    state.latest = result
+                    state.frames += 1
+                    state.process_time += result["process_time"]
+                    state.queue_drops = result["queue_drops"]
+                self._cond.notify_all()
+
+    def latest(self, source_id):
+        """Latest result dict for a source (label, confidence, emoji, landmarks, jpeg), or None."""
+        state = self.states.get(source_id)
+        return state.latest if state else None
+
+    def wait_for(self, source_id, after_seq, timeout=None):
+        """Block until source_id has a result newer than after_seq; return it, or None on
+        timeout or as soon as the source has finished or the engine is no longer running."""
+        state = self.states.get(source_id)
+        if state is None:
+            return None
+
+        def newer():
+            return state.latest is not None and state.latest["seq"] > after_seq
+
+        with self._cond:
+            self._cond.wait_for(lambda: newer() or state.finished or not self.running, timeout)
+            return state.latest if newer() else None
+
+    def all_finished(self):
+        return all(state.finished for state in self.states.values())
+
+    def stats(self):
+        """Per-source counters plus aggregate throughput since start()."""
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        with self._cond:
+            per_source = [state.to_dict(elapsed) for state in self.states.values()]
+        total = sum(s["frames"] for s in per_source)
+        return {
+            "workers": self.workers,
+            "sources": len(self.sources),
+            "elapsed": round(elapsed, 2),
+            "frames": total,
+            "fps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            "per_source": per_source,
+        }
+
+    def stop(self, timeout=5.0):
+        if not self._running:
+            return
+        self._stop_event.set()
+        for proc in self._processes:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._aggregator is not None:
+            self._aggregator.join(timeout)
+        self._processes = []
+
+
+# Global engine for the Flask per-source feeds (CAMERA_SOURCES in config)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Engine over config.CAMERA_SOURCES, started on first use; None if not configured."""
+    global _engine
+    from config import CAMERA_SOURCES, SOURCE_WORKERS
+    with _engine_lock:
+        if _engine is None and CAMERA_SOURCES:
+            _engine = MultiSourceEngine(parse_sources(CAMERA_SOURCES), workers=SOURCE_WORKERS).start()
+        return _engine
@@ -0,0 +1,278 @@
+"""Offline processing of recorded footage: frame readers, sharding and per-shard inference."""
+import mmap
+import os
+import queue
+import re
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+MJPEG_EXTENSIONS = {".mjpeg", ".mjpg"}
+
+# A contiguous run of frames from one input. For MJPEG files `offsets` holds the
+# (start, end) byte ranges of the shard's JPEGs; for frame directories `files`
+# holds the image paths; videos are addressed by frame index only.
+Shard = namedtuple("Shard", ["kind", "path", "start", "stop", "fps", "offsets", "files"])
+
+STAGES = ("decode", "to_rgb", "landmarks", "features", "predict", "distress")
+
+
+# After the scan header, entropy-coded data runs until a marker: 0xFF followed by
+# anything but a stuffed zero, a restart marker (RST0-7) or another fill byte.
+_SCAN_END = re.compile(rb"\xff[^\x00\xd0-\xd7\xff]")
+_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+
+
+def _jpeg_end(data, start):
+    """Offset just past the EOI of the JPEG whose SOI is at start, or None if it is cut off.
+
+    Walks the marker segments by their lengths, so the SOI/EOI pair of a thumbnail
+    embedded in an APPn segment (EXIF) is skipped over instead of ending the frame.
+    """
+    n = len(data)
+    i = start + 2
+    while i + 1 < n:
+        if data[i] != 0xFF:
+            # Not on a marker: the file is damaged, fall back to the next EOI.
+            end = data.find(b"\xff\xd9", i)
+            return end + 2 if end != -1 else None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+        elif marker == 0xD9:
+            return i + 2
+        elif marker in _STANDALONE_MARKERS:
+            i += 2
+        elif i + 3 >= n:
+            return None
+        else:
+            i += 2 + (data[i + 2] << 8 | data[i + 3])
+            if marker == 0xDA:
+                found = _SCAN_END.search(data, i)
+                if found is None:
+                    return None
+                i = found.start()
+    return None
+
+
+def mjpeg_frame_offsets(path):
+    """Byte ranges (start, end) of every JPEG in an MJPEG dump. The file is memory-mapped
+    rather than read, and each JPEG is followed marker by marker to its real EOI."""
+    offsets = []
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return offsets
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = 0
+            while True:
+                start = data.find(b"\xff\xd8", pos)
+                if start == -1:
+                    break
+                end = _jpeg_end(data, start)
+                if end is None:
+                    break
+                offsets.append((start, end))
+                pos = end
+    return offsets
+
+
+def input_kind(path):
+    path = Path(path)
+    if path.is_dir():
+        return "frames"
+    if path.suffix.lower() in MJPEG_EXTENSIONS:
+        return "mjpeg"
+    return "video"
+
+
+def plan_shards(path, shard_size=500, fps=None):
+    """Split one input (video file, MJPEG dump or frame directory) into shards."""
+    kind = input_kind(path)
+    path = str(path)
+    if kind == "frames":
+        files = sorted(str(p) for p in Path(path).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        n = len(files)
+        fps = fps or 30.0
+    elif kind == "mjpeg":
+        offsets = mjpeg_frame_offsets(path)
+        n = len(offsets)
+        fps = fps or 30.0
+    else:
+        cap = cv2.VideoCapture(path)
+        n = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+
+    shards = []
+    for start in range(0, n, shard_size):
+        stop = min(start + shard_size, n)
+        shards.append(Shard(
+            kind, path, start, stop, fps,
+            offsets[start:stop] if kind == "mjpeg" else None,
+            files[start:stop] if kind == "frames" else None,
+        ))
+    return shards
+
+
+def iter_shard_frames(shard):
+    """Yield (frame_index, BGR frame, decode_seconds) for every frame in a shard."""
+    if shard.kind == "video":
+        cap = cv2.VideoCapture(shard.path)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, shard.start)
+        try:
+            for index in range(shard.start, shard.stop):
+                t0 = time.perf_counter()
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield index, frame, time.perf_counter() - t0
+        finally:
+            cap.release()
+    elif shard.kind == "mjpeg":
+        with open(shard.path, "rb") as f:
+            for index, (start, end) in enumerate(shard.offsets, shard.start):
+                t0 = time.perf_counter()
+                f.seek(start)
+                buf = np.frombuffer(f.read(end - start), dtype=np.uint8)
+                frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+                if frame is not None:
+                    yield index, frame, time.perf_counter() - t0
+    else:
+        for index, file in enumerate(shard.files, shard.start):
+            t0 = time.perf_counter()
+            frame = cv2.imread(file)
+            if frame is not None:
+                yield index, frame, time.perf_counter() - t0
+
+
+def prefetch(iterable, depth=8):
+    """Run an iterator on a background thread so decoding overlaps with inference.
+
+    OpenCV releases the GIL while decoding, so this gives real parallelism.
+    """
+    q = queue.Queue(maxsize=depth)
+    done = object()
+
+    def produce():
+        try:
+            for item in iterable:
+                q.put(item)
+        finally:
+            q.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = q.get()
+        if item is done:
+            return
+        yield item
+
+
+# Per-process state for process_shard, built once by init_worker.
+_worker = {}
+
+
+def init_worker(max_hands=2):
+    """ProcessPoolExecutor initializer: load the landmarker and model once per process."""
+    from detection.landmarks import HandLandmarker
+    from model.predict import load_model
+    _worker["landmarker"] = HandLandmarker(max_num_hands=max_hands)
+    _worker["model"], _worker["encoder"] = load_model()
+
+
+def process_shard(shard):
+    """Run landmarks -> features -> predict_gesture over one shard, then score every
+    hand row with is_distress_signal_batch in one vectorized pass.
+
+    Returns column lists (one row per detected hand, or one row with hand=-1 for
+    frames without hands) plus total seconds spent per stage.
+    """
+    from data.preprocess import landmarks_to_features
+    from model.predict import predict_gesture
+    from detection.gesture_logic import is_distress_signal_batch
+
+    if not _worker:
+        init_worker()
+    landmarker = _worker["landmarker"]
+    model, encoder = _worker["model"], _worker["encoder"]
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    cols = {"frame": [], "hand": [], "label": [], "confidence": [],
+            "distress": [], "distress_confidence": [], "landmarks": []}
+    no_hand = np.full((21, 3), np.nan, dtype=np.float32)
+    frames = 0
+    for index, frame, decode_time in prefetch(iter_shard_frames(shard)):
+        frames += 1
+        timings["decode"] += decode_time
+        t0 = time.perf_counter()
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        t1 = time.perf_counter()
+        hands = landmarker.process(rgb)
+        t2 = time.perf_counter()
+        timings["to_rgb"] += t1 - t0
+        timings["landmarks"] += t2 - t1
+        if not hands:
+            cols["frame"].append(index)
+            cols["hand"].append(-1)
+            cols["label"].append(None)
+            cols["confidence"].append(0.0)
+            cols["landmarks"].append(no_hand)
+            continue
+        for hand_index, lms in enumerate(hands):
+            t0 = time.perf_counter()
+            features = landmarks_to_features(lms)
+            t1 = time.perf_counter()
+            label, conf, _ = predict_gesture(model, encoder, features)
+            t2 = time.perf_counter()
+            timings["features"] += t1 - t0
+            timings["predict"] += t2 - t1
+            cols["frame"].append(index)
+            cols["hand"].append(hand_index)
+            cols["label"].append(label)
+            cols["confidence"].append(conf)
+            cols["landmarks"].append(lms)
+    t0 = time.perf_counter()
+    # No-hand rows are NaN and score False / 0.0.
+    distress, distress_conf = is_distress_signal_batch(np.asarray(cols["landmarks"]).reshape(-1, 21, 3))
+    cols["distress"] = distress.tolist()
+    cols["distress_confidence"] = distress_conf.tolist()
+    timings["distress"] += time.perf_counter() - t0
+    return {"path": shard.path, "fps": shard.fps, "frames": frames, "columns": cols, "timings": timings}
+
+
+def merge_results(results):
+    """Concatenate shard results into compact columnar arrays for np.savez_compressed."""
+    sources = sorted({r["path"] for r in results})
+    labels = sorted({lbl for r in results for lbl in r["columns"]["label"] if lbl is not None})
+    label_index = {lbl: i for i, lbl in enumerate(labels)}
+    out = {k: [] for k in ("source", "frame", "timestamp", "hand", "label", "confidence",
+                           "distress", "distress_confidence", "landmarks")}
+    for r in results:
+        cols = r["columns"]
+        n = len(cols["frame"])
+        if n == 0:
+            continue
+        frame = np.asarray(cols["frame"], dtype=np.int32)
+        out["source"].append(np.full(n, sources.index(r["path"]), dtype=np.int16))
+        out["frame"].append(frame)
+        out["timestamp"].append((frame / r["fps"]).astype(np.float32))
+        out["hand"].append(np.asarray(cols["hand"], dtype=np.int8))
+        out["label"].append(np.asarray([label_index.get(lbl, -1) for lbl in cols["label"]], dtype=np.int16))
+        out["confidence"].append(np.asarray(cols["confidence"], dtype=np.float32))
+        out["distress"].append(np.asarray(cols["distress"], dtype=bool))
+        out["distress_confidence"].append(np.asarray(cols["distress_confidence"], dtype=np.float32))
+        out["landmarks"].append(np.asarray(cols["landmarks"], dtype=np.float32).reshape(n, 21, 3))
+    merged = {}
+    for key, parts in out.items():
+        if parts:
+            merged[key] = np.concatenate(parts)
+        else:
+            merged[key] = np.zeros((0, 21, 3) if key == "landmarks" else 0, dtype=np.float32)
+    merged["sources"] = np.asarray(sources)
+    merged["labels"] = np.asarray(labels)
+    return merged
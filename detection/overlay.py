@@ -0,0 +1,73 @@
+"""Batched overlay rendering: hand skeletons, person boxes and labels in a few OpenCV calls."""
+import cv2
+import numpy as np
+
+# Hand skeleton as polylines: thumb and four fingers from the wrist, then the knuckle line.
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],
+    [0, 5, 6, 7, 8],
+    [0, 9, 10, 11, 12],
+    [0, 13, 14, 15, 16],
+    [0, 17, 18, 19, 20],
+], dtype=np.intp)
+PALM_CHAIN = np.array([5, 9, 13, 17], dtype=np.intp)
+
+HAND_COLOR = (0, 255, 0)
+PERSON_COLOR = (255, 0, 0)
+ALERT_COLOR = (0, 0, 255)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+def landmarks_to_pixels(landmarks, width, height):
+    """(n, 21, 3) normalized landmarks -> (n, 21, 2) int32 pixel coordinates in one step."""
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    if landmarks.ndim == 2:
+        landmarks = landmarks[None]
+    return (landmarks[..., :2] * np.array([width, height], dtype=np.float32)).astype(np.int32)
+
+
+def draw_hands(frame, landmarks, color=HAND_COLOR, point_radius=4, line_thickness=2):
+    """Draw every hand in (n, 21, 3) landmarks with one polylines call for the joints
+    and two for the skeleton. Returns frame (drawn in place)."""
+    if landmarks is None or len(landmarks) == 0:
+        return frame
+    h, w = frame.shape[:2]
+    px = landmarks_to_pixels(landmarks, w, h)
+    n = len(px)
+    # A degenerate two-point polyline with thickness 2r renders as a filled circle of radius r.
+    dots = np.repeat(px.reshape(-1, 1, 2), 2, axis=1)
+    cv2.polylines(frame, dots, False, color, 2 * point_radius)
+    # Fancy indexing can return non C-ordered arrays, which OpenCV rejects as point lists.
+    fingers = np.ascontiguousarray(px[:, FINGER_CHAINS].reshape(n * len(FINGER_CHAINS), -1, 2))
+    cv2.polylines(frame, fingers, False, color, line_thickness)
+    cv2.polylines(frame, np.ascontiguousarray(px[:, PALM_CHAIN]), False, color, line_thickness)
+    return frame
+
+
+def draw_persons(frame, persons, color=PERSON_COLOR):
+    """Draw all person boxes with one polylines call, then their ID labels."""
+    if not persons:
+        return frame
+    boxes = np.array([p["box"] for p in persons], dtype=np.int32).reshape(-1, 4)
+    x1, y1, x2, y2 = boxes.T
+    corners = np.stack([
+        np.stack([x1, y1], axis=1), np.stack([x2, y1], axis=1),
+        np.stack([x2, y2], axis=1), np.stack([x1, y2], axis=1),
+    ], axis=1)
+    cv2.polylines(frame, corners, True, color, 2)
+    for person, x, y in zip(persons, x1, y1):
+        cv2.putText(frame, f"Person {person['id']}", (int(x), int(y) - 10), FONT, 0.5, color, 2)
+    return frame
+
+
+def draw_prediction(frame, label, conf):
+    """Gesture label and confidence in the bottom-left corner."""
+    h = frame.shape[0]
+    cv2.putText(frame, label, (20, h - 40), FONT, 0.8, (0, 255, 255), 2)
+    cv2.putText(frame, f"{conf:.0%}", (20, h - 10), FONT, 0.6, (0, 255, 0), 2)
+    return frame
+
+
+def draw_alert(frame, text="!!! DISTRESS ALERT !!!"):
+    cv2.putText(frame, text, (50, 50), FONT, 1, ALERT_COLOR, 3)
+    return frame
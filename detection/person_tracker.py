@@ -1,33 +1,108 @@
-from ultralytics import YOLO
-import cv2
+from pathlib import Path
 
-class PersonTracker:
-    def __init__(self, model_variant="yolov8n.pt"):
-        # Load pre-trained YOLOv8 model for detection + tracking
-        self.model = YOLO(model_variant)
-        self.track_history = {}
+import numpy as np
 
-    def track(self, frame):
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import PERSON_TRACKING_MODE, PERSON_DETECT_INTERVAL, PERSON_REDETECT_MOTION, PERSON_MAX_UNCERTAINTY
+from detection.box_tracking import BoxKalman
+from detection.scheduler import motion_sample, motion_score
+
+
+class PersonTracker:
+    def __init__(self, model_variant="yolov8n.pt", mode=PERSON_TRACKING_MODE, detect_interval=PERSON_DETECT_INTERVAL,
+                 motion_threshold=PERSON_REDETECT_MOTION, max_uncertainty=PERSON_MAX_UNCERTAINTY, model=None):
         """
-        Track people in the frame.
-        Returns:
-            - results: YOLO prediction results
-            - person_boxes: List of (id, box) where box is [x1, y1, x2, y2]
+        mode: "detect" runs YOLO tracking on every frame. "propagate" runs it every
+        detect_interval frames, or sooner when the scene changed by more than
+        motion_threshold since the last detection or a box's position uncertainty
+        exceeds max_uncertainty (fraction of its height); in between, a
+        constant-velocity Kalman filter moves the boxes and keeps their IDs.
+        model: already loaded YOLO model to use instead of model_variant.
         """
+        if model is None:
+            from ultralytics import YOLO
+            # Load pre-trained YOLOv8 model for detection + tracking
+            model = YOLO(model_variant)
+        self.model = model
+        self.track_history = {}
+        self.mode = mode
+        self.detect_interval = detect_interval
+        self.motion_threshold = motion_threshold
+        self.max_uncertainty = max_uncertainty
+        self.kalman = BoxKalman() if mode == "propagate" else None
+        self._since_detect = None
+        self._detect_sample = None
+        self.frames = 0
+        self.detections = 0
+        self.redetect_reasons = {"interval": 0, "motion": 0, "uncertainty": 0}
+
+    def _detect(self, frame):
         # Run YOLOv8 tracking
         # persist=True ensures tracking IDs are maintained across frames
         results = self.model.track(frame, persist=True, classes=[0], verbose=False) # class 0 is person
-        
+
         person_info = []
-        
+
         if results and results[0].boxes.id is not None:
             boxes = results[0].boxes.xyxy.cpu().numpy()
             track_ids = results[0].boxes.id.int().cpu().tolist()
-            
+
             for box, track_id in zip(boxes, track_ids):
                 person_info.append({
                     "id": track_id,
                     "box": box.astype(int)
                 })
-        
+
         return results[0], person_info
+
+    def _redetect_reason(self, frame):
+        """Why this frame needs YOLO, or None to propagate the boxes."""
+        sample = motion_sample(frame)
+        if self._since_detect is None or self._since_detect + 1 >= self.detect_interval:
+            reason = "interval"
+        elif motion_score(self._detect_sample, sample) >= self.motion_threshold:
+            reason = "motion"
+        elif len(self.kalman) and self.kalman.uncertainty().max() >= self.max_uncertainty:
+            reason = "uncertainty"
+        else:
+            return None
+        self._detect_sample = sample
+        return reason
+
+    def track(self, frame):
+        """
+        Track people in the frame.
+        Returns:
+            - results: YOLO prediction results (None on frames where boxes were propagated)
+            - person_boxes: List of {"id", "box"} where box is [x1, y1, x2, y2]
+        """
+        self.frames += 1
+        if self.kalman is None:
+            self.detections += 1
+            return self._detect(frame)
+
+        self.kalman.predict()
+        reason = self._redetect_reason(frame)
+        if reason is None:
+            self._since_detect += 1
+            boxes = self.kalman.boxes().astype(int)
+            return None, [{"id": int(i), "box": box} for i, box in zip(self.kalman.ids, boxes)]
+
+        results, person_info = self._detect(frame)
+        self.detections += 1
+        self.redetect_reasons[reason] += 1
+        self._since_detect = 0
+        self.kalman.update([p["id"] for p in person_info],
+                           np.array([p["box"] for p in person_info], dtype=np.float64).reshape(-1, 4))
+        return results, person_info
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "frames": self.frames,
+            "detections": self.detections,
+            "detect_ratio": round(self.detections / self.frames, 3) if self.frames else 1.0,
+            "redetect_reasons": dict(self.redetect_reasons),
+            "tracks": len(self.kalman) if self.kalman is not None else None,
+        }
@@ -1,67 +1,179 @@
 """Real-time pipeline: webcam → MediaPipe → model → emoji overlay."""
-import cv2
+import time
 import numpy as np
 from pathlib import Path
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from config import GESTURE_EMOJI_MAP
+from config import GESTURE_EMOJI_MAP, CAPTURE_BUFFER_SIZE, CAPTURE_READ_TIMEOUT, MOTION_GATING, TEMPORAL_SMOOTHING
 from detection.camera import get_camera, frame_to_rgb
-from detection.landmarks import HandLandmarker
+from detection.capture import CaptureThread, FrameRingBuffer
+from detection.roi_tracking import create_landmarker
+from detection.overlay import draw_hands, draw_prediction
+from detection.scheduler import MotionGatedScheduler
+from detection.temporal import TemporalEngine
 from data.preprocess import landmarks_to_features
 from model.predict import load_model, predict_gesture
+from model.registry import get_registry
+from monitoring.metrics import (
+    STAGE_SECONDS, FRAMES_PROCESSED, HANDS_PER_FRAME, INFERENCE_FPS, RateMeter,
+)
+
+_STAGE = {name: STAGE_SECONDS.labels(stage=name) for name in
+          ("wait", "to_rgb", "landmarks", "features", "predict", "draw", "frame")}
 
 
 class GesturePipeline:
-    def __init__(self, camera_index=0):
-        self.cap = get_camera(camera_index)
-        self.landmarker = HandLandmarker()
-        self.model, self.encoder = load_model()
+    def __init__(self, camera_index=0, threaded=True, cap=None):
+        """
+        threaded: read the camera on a background thread so inference always
+        works on the freshest frame instead of draining OpenCV's buffer.
+        cap: already opened capture (e.g. from open_source) to use instead of camera_index.
+        """
+        self._owns_camera = cap is None
+        self.cap = cap if cap is not None else get_camera(camera_index)
+        self.landmarker = create_landmarker()
+        # Current ModelVersion lives in the registry; training jobs publish new ones.
+        self.models = get_registry()
         self._current_emoji = "👋"
         self._current_label = "—"
         self._current_conf = 0.0
         self._last_landmarks = None
+        self._last_hands = np.zeros((0, 21, 3), dtype=np.float32)
+        # Skips detection on static scenes; skipped frames reuse the last result.
+        self.scheduler = MotionGatedScheduler() if MOTION_GATING else None
+        # Recognises waving and smooths labels over recent frames of each hand.
+        self.temporal = TemporalEngine() if TEMPORAL_SMOOTHING else None
+        # Set to False when nobody is watching annotated frames to skip all drawing.
+        self.annotate = True
+        self.frames_processed = 0
+        self._last_frame_age = 0.0
+        self._fps = RateMeter()
+        self.capture = None
+        if threaded:
+            self.capture = CaptureThread(
+                self.cap, FrameRingBuffer(CAPTURE_BUFFER_SIZE),
+                reopen=(lambda: get_camera(camera_index)) if self._owns_camera else None,
+            ).start()
+
+    @property
+    def model(self):
+        return self.models.current.model
+
+    @property
+    def encoder(self):
+        return self.models.current.encoder
 
     def reload_model(self):
-        """Reload the model and encoder from disk."""
-        self.model, self.encoder = load_model()
+        """Reload the model and encoder from disk and publish them as a new version."""
+        return self.models.publish(*load_model(), source="reload")
 
-    def read_frame(self):
-        """Read one frame, run detection, return BGR frame with overlay and (label, conf, emoji)."""
-        if not self.cap or not self.cap.isOpened():
+    def _grab_frame(self):
+        """Return the freshest camera frame, or None if the camera is unavailable."""
+        if self.capture is not None:
+            item = self.capture.buffer.get_latest(timeout=CAPTURE_READ_TIMEOUT)
+            if item is None:
+                return None
+            _, timestamp, frame = item
+            self._last_frame_age = time.time() - timestamp
+            return frame
+
+        if self._owns_camera and (not self.cap or not self.cap.isOpened()):
             self.cap = get_camera() # Try to re-initialize
-            
+
         if not self.cap.isOpened():
-            return None, "—", 0.0, "👋"
+            return None
 
         ret, frame = self.cap.read()
         if not ret:
+            return None
+        self._last_frame_age = 0.0
+        return frame
+
+    def read_frame(self):
+        """Read one frame, run detection, return BGR frame with overlay and (label, conf, emoji)."""
+        perf = time.perf_counter
+        t0 = perf()
+        frame = self._grab_frame()
+        t_start = perf()
+        _STAGE["wait"].observe(t_start - t0)
+        if frame is None:
             return None, "—", 0.0, "👋"
+        self.frames_processed += 1
+        FRAMES_PROCESSED.inc()
+        if self.scheduler is None or self.scheduler.should_infer(frame):
+            self._infer(frame, t_start)
+
+        if self.annotate:
+            t_draw = perf()
+            draw_hands(frame, self._last_hands)
+            draw_prediction(frame, self._current_label, self._current_conf)
+            _STAGE["draw"].observe(perf() - t_draw)
+        _STAGE["frame"].observe(perf() - t_start)
+        return frame, self._current_label, self._current_conf, self._current_emoji
+
+    def _infer(self, frame, t_start):
+        """Hand detection and gesture prediction; updates the current result."""
+        perf = time.perf_counter
         rgb = frame_to_rgb(frame)
-        hands = self.landmarker.process(rgb)
+        t1 = perf()
+        hands = self.landmarker.process_batch(rgb)
+        t2 = perf()
+        _STAGE["to_rgb"].observe(t1 - t_start)
+        _STAGE["landmarks"].observe(t2 - t1)
+        HANDS_PER_FRAME.observe(len(hands))
         if hands:
             # Use first hand
-            features = landmarks_to_features(hands[0])
-            label, conf, emoji = predict_gesture(self.model, self.encoder, features)
+            features = landmarks_to_features(hands.landmarks[0])
+            t3 = perf()
+            # One snapshot per frame: model and encoder always come from the same version.
+            version = self.models.current
+            label, conf, emoji = predict_gesture(version.model, version.encoder, features)
+            if self.temporal is not None:
+                hand_id = int(hands.handedness[0])
+                label, conf, emoji = self.temporal.update(hand_id, hands.landmarks[0], label, conf, emoji)
+                self.temporal.end_frame((hand_id,))
+            t4 = perf()
+            _STAGE["features"].observe(t3 - t2)
+            _STAGE["predict"].observe(t4 - t3)
             self._current_label = label or "—"
             self._current_conf = conf
             self._current_emoji = emoji
-            self._last_landmarks = hands[0].tolist() # Store as list for JSON
-            frame = self.landmarker.draw_landmarks(frame, hands)
+            self._last_landmarks = hands.landmarks[0].tolist() # Store as list for JSON
         else:
             self._current_label = "—"
             self._current_conf = 0.0
             self._current_emoji = "👋"
             self._last_landmarks = None
+            if self.temporal is not None:
+                self.temporal.end_frame()
+        self._last_hands = hands.landmarks.copy()
+        t_end = perf()
+        if self.scheduler is not None:
+            self.scheduler.report(bool(hands), t_end - t_start)
+        INFERENCE_FPS.set(round(self._fps.tick(t_end), 2))
 
-        # Overlay text
-        h, w = frame.shape[:2]
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        cv2.putText(frame, self._current_label, (20, h - 40), font, 0.8, (0, 255, 255), 2)
-        cv2.putText(frame, f"{self._current_conf:.0%}", (20, h - 10), font, 0.6, (0, 255, 0), 2)
-        return frame, self._current_label, self._current_conf, self._current_emoji
+    def stats(self):
+        """Frame counters for the capture stage and the age of the last processed frame."""
+        if self.capture is not None:
+            captured = self.capture.captured
+            dropped = self.capture.buffer.dropped
+        else:
+            captured, dropped = self.frames_processed, 0
+        return {
+            "captured": captured,
+            "processed": self.frames_processed,
+            "dropped": dropped,
+            "frame_age_ms": round(self._last_frame_age * 1000.0, 1),
+            "scheduler": self.scheduler.stats() if self.scheduler is not None else None,
+            "temporal": self.temporal.stats() if self.temporal is not None else None,
+            "model_version": self.models.current.version,
+        }
 
     def release(self):
+        if self.capture is not None:
+            self.capture.stop()
+            self.cap = self.capture.cap
         self.cap.release()
         self.landmarker.close()
 
@@ -0,0 +1,126 @@
+"""ROI-tracking hand landmarker: full-frame detection on keyframes, padded crops in between."""
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import HAND_TRACKING_MODE, ROI_KEYFRAME_INTERVAL, ROI_PADDING
+from detection.landmarks import HandLandmarker, HandBatch, UNKNOWN_HAND
+from detection.overlay import draw_hands
+
+
+def roi_from_landmarks(landmarks, width, height, padding=ROI_PADDING, min_size=96):
+    """Padded square pixel box (x0, y0, x1, y1) around all hands, clamped to the frame."""
+    xs = landmarks[..., 0] * width
+    ys = landmarks[..., 1] * height
+    x_min, x_max = float(xs.min()), float(xs.max())
+    y_min, y_max = float(ys.min()), float(ys.max())
+    size = max(x_max - x_min, y_max - y_min) * (1.0 + 2.0 * padding)
+    size = min(max(size, min_size), width, height)
+    cx, cy = (x_min + x_max) / 2.0, (y_min + y_max) / 2.0
+    x0 = int(round(min(max(cx - size / 2.0, 0), width - size)))
+    y0 = int(round(min(max(cy - size / 2.0, 0), height - size)))
+    return x0, y0, x0 + int(size), y0 + int(size)
+
+
+class RoiHandTracker:
+    """Drop-in replacement for HandLandmarker that avoids full-frame processing.
+
+    Full-frame detection runs on keyframes (every keyframe_interval frames), when
+    there is no previous result, and whenever tracking looks unreliable: fewer hands
+    found in the crop, a handedness score below min_score, or a hand touching the
+    crop border. Other frames run a second MediaPipe instance on a padded crop around
+    the last landmarks and map the result back to full-frame normalized coordinates.
+    """
+
+    def __init__(self, max_num_hands=1, keyframe_interval=ROI_KEYFRAME_INTERVAL, padding=ROI_PADDING,
+                 min_score=0.5, border_margin=0.02, **landmarker_kwargs):
+        self.max_num_hands = max_num_hands
+        self.keyframe_interval = keyframe_interval
+        self.padding = padding
+        self.min_score = min_score
+        self.border_margin = border_margin
+        self.full = HandLandmarker(max_num_hands=max_num_hands, **landmarker_kwargs)
+        self.roi = HandLandmarker(max_num_hands=max_num_hands, **landmarker_kwargs)
+        self._landmarks = np.zeros((max_num_hands, 21, 3), dtype=np.float32)
+        self._handedness = np.full(max_num_hands, UNKNOWN_HAND, dtype=np.int8)
+        self._scores = np.zeros(max_num_hands, dtype=np.float32)
+        self._last = None
+        self._since_keyframe = 0
+        self._retrack = False
+        self.keyframes = 0
+        self.roi_frames = 0
+        self.fallbacks = 0
+        self.last_roi = None
+
+    def _store(self, batch):
+        n = len(batch)
+        self._landmarks[:n] = batch.landmarks
+        self._handedness[:n] = batch.handedness
+        self._scores[:n] = batch.scores
+        self._last = HandBatch(self._landmarks[:n], self._handedness[:n], self._scores[:n]) if n else None
+        return HandBatch(self._landmarks[:n], self._handedness[:n], self._scores[:n])
+
+    def _full_frame(self, frame_rgb):
+        self.keyframes += 1
+        self._since_keyframe = 0
+        self._retrack = False
+        self.last_roi = None
+        return self._store(self.full.process_batch(frame_rgb))
+
+    def process_batch(self, frame_rgb):
+        """Hands in full-frame normalized coordinates, as HandLandmarker.process_batch."""
+        self._since_keyframe += 1
+        if self._last is None or self._retrack or self._since_keyframe >= self.keyframe_interval:
+            return self._full_frame(frame_rgb)
+
+        h, w = frame_rgb.shape[:2]
+        x0, y0, x1, y1 = roi_from_landmarks(self._last.landmarks, w, h, self.padding)
+        crop = np.ascontiguousarray(frame_rgb[y0:y1, x0:x1])
+        found = self.roi.process_batch(crop)
+        if len(found) < len(self._last) or (len(found) and found.scores.min() < self.min_score):
+            self.fallbacks += 1
+            return self._full_frame(frame_rgb)
+
+        self.roi_frames += 1
+        self.last_roi = (x0, y0, x1, y1)
+        cw, ch = x1 - x0, y1 - y0
+        mapped = found.landmarks.copy()
+        # A hand at the crop edge may be leaving the ROI: detect on the full frame next time.
+        m = self.border_margin
+        self._retrack = bool(((mapped[..., :2] < m) | (mapped[..., :2] > 1 - m)).any())
+        mapped[..., 0] = (mapped[..., 0] * cw + x0) / w
+        mapped[..., 1] = (mapped[..., 1] * ch + y0) / h
+        # MediaPipe z uses roughly the same scale as x.
+        mapped[..., 2] *= cw / w
+        return self._store(HandBatch(mapped, found.handedness, found.scores))
+
+    def process(self, frame_rgb):
+        batch = self.process_batch(frame_rgb)
+        return list(batch.landmarks.copy()) if batch else []
+
+    def draw_landmarks(self, frame, hand_landmarks_list):
+        if hand_landmarks_list is None or len(hand_landmarks_list) == 0:
+            return frame
+        return draw_hands(frame, np.asarray(hand_landmarks_list, dtype=np.float32))
+
+    def stats(self):
+        total = self.keyframes + self.roi_frames
+        return {
+            "keyframes": self.keyframes,
+            "roi_frames": self.roi_frames,
+            "fallbacks": self.fallbacks,
+            "roi_ratio": round(self.roi_frames / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        self.full.close()
+        self.roi.close()
+
+
+def create_landmarker(mode=HAND_TRACKING_MODE, **kwargs):
+    """HandLandmarker for mode "full", RoiHandTracker for mode "roi"."""
+    if mode == "roi":
+        return RoiHandTracker(**kwargs)
+    return HandLandmarker(**kwargs)
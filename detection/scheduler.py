@@ -0,0 +1,102 @@
+"""Motion-gated inference scheduler: full rate while something moves, a low duty cycle when idle."""
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import MOTION_THRESHOLD, IDLE_INFERENCE_FPS, ACTIVE_HOLD_SECONDS
+from monitoring.metrics import FRAMES_SKIPPED, INFERENCE_DUTY_CYCLE, RateMeter
+
+
+def motion_sample(frame_bgr, size=(64, 48)):
+    """Small grayscale thumbnail used for frame differencing."""
+    gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def motion_score(prev_sample, sample):
+    """Mean absolute difference between two thumbnails, 0 (static) .. 1."""
+    return float(cv2.absdiff(prev_sample, sample).mean()) / 255.0
+
+
+class MotionGatedScheduler:
+    """Decides per frame whether to run the expensive detection stages.
+
+    Inference runs on every frame while the scene moves (motion score above
+    motion_threshold) or a hand/person was seen in the last active_hold seconds.
+    Otherwise it drops to idle_fps inferences per second and callers reuse the
+    last result. Call report() after each inference with whether anything was found.
+    """
+
+    def __init__(self, motion_threshold=MOTION_THRESHOLD, idle_fps=IDLE_INFERENCE_FPS,
+                 active_hold=ACTIVE_HOLD_SECONDS, sample_size=(64, 48), clock=time.monotonic):
+        self.motion_threshold = motion_threshold
+        self.idle_interval = 1.0 / idle_fps if idle_fps > 0 else float("inf")
+        self.active_hold = active_hold
+        self.sample_size = sample_size
+        self.clock = clock
+        self._prev = None
+        self._active_until = 0.0
+        self._last_infer = None
+        self._infer_time = 0.0
+        self._rate = RateMeter()
+        self.last_score = 0.0
+        self.frames = 0
+        self.inferred = 0
+        self.skipped = 0
+
+    @property
+    def active(self):
+        return self.clock() < self._active_until
+
+    def should_infer(self, frame_bgr):
+        """True if this frame should go through detection; False to reuse the last result."""
+        now = self.clock()
+        self.frames += 1
+        sample = motion_sample(frame_bgr, self.sample_size)
+        if self._prev is not None:
+            self.last_score = motion_score(self._prev, sample)
+            if self.last_score >= self.motion_threshold:
+                self._active_until = now + self.active_hold
+        self._prev = sample
+
+        infer = (
+            self._last_infer is None
+            or now < self._active_until
+            or now - self._last_infer >= self.idle_interval
+        )
+        if infer:
+            self.inferred += 1
+            self._last_infer = now
+            self._rate.tick(now)
+        else:
+            self.skipped += 1
+            FRAMES_SKIPPED.inc()
+        INFERENCE_DUTY_CYCLE.set(round(self.inferred / self.frames, 3))
+        return infer
+
+    def report(self, found, infer_seconds=None):
+        """After an inference: found=True keeps full rate for active_hold seconds."""
+        if found:
+            self._active_until = max(self._active_until, self.clock() + self.active_hold)
+        if infer_seconds is not None:
+            if self._infer_time:
+                self._infer_time += 0.1 * (infer_seconds - self._infer_time)
+            else:
+                self._infer_time = infer_seconds
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "inferred": self.inferred,
+            "skipped": self.skipped,
+            "duty_cycle": round(self.inferred / self.frames, 3) if self.frames else 1.0,
+            "effective_inference_fps": round(self._rate.rate, 2),
+            "motion_score": round(self.last_score, 4),
+            "active": self.active,
+            # Estimated from the smoothed cost of the inferences that did run.
+            "cpu_saved_s": round(self.skipped * self._infer_time, 2),
+        }
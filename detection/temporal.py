@@ -0,0 +1,190 @@
+"""Streaming temporal stage: per-hand history, dynamic gestures and label smoothing.
+
+The static classifier sees one frame at a time, so motion gestures such as wave
+are invisible to it and its labels flicker between frames. TemporalEngine keeps
+a fixed-size ring buffer per hand. Each frame it updates running window
+statistics in O(1): it adds the newest value and subtracts the one it evicts.
+The statistics are horizontal palm velocity, mean speed and direction reversals.
+It then recognises waving and smooths the per-frame labels with a confidence
+vote plus hysteresis. Memory is bounded by window size x tracked hands; hands
+not seen for max_missing frames are dropped.
+"""
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    GESTURE_EMOJI_MAP, GESTURE_DISPLAY_NAMES, TEMPORAL_WINDOW, TEMPORAL_VOTE_FRAMES, TEMPORAL_MIN_HOLD,
+    TEMPORAL_MAX_MISSING, WAVE_MIN_REVERSALS, WAVE_MIN_SPEED,
+)
+
+PALM = [0, 5, 9, 13, 17]  # wrist and finger MCPs
+# Horizontal palm motion below this (hand lengths per frame) is jitter, not a direction.
+DIRECTION_NOISE = 0.015
+
+
+class HandHistory:
+    """Ring buffers and running window statistics for one hand."""
+
+    __slots__ = ("window", "landmarks", "frames", "missing", "_head", "_vx", "_flip", "speed_sum", "reversals",
+                 "_prev_x", "_direction", "_votes", "_vote_conf", "_vote_head", "scores", "label", "pending",
+                 "pending_frames")
+
+    def __init__(self, window, vote_frames):
+        self.window = window
+        self.landmarks = np.zeros((window, 21, 3), dtype=np.float32)
+        self.frames = 0
+        self.missing = 0
+        self._head = 0
+        self._vx = [0.0] * window
+        self._flip = [0] * window
+        self.speed_sum = 0.0
+        self.reversals = 0
+        self._prev_x = None
+        self._direction = 0
+        self._votes = [None] * vote_frames
+        self._vote_conf = [0.0] * vote_frames
+        self._vote_head = 0
+        self.scores = {}
+        self.label = None
+        self.pending = None
+        self.pending_frames = 0
+
+    @property
+    def filled(self):
+        return min(self.frames, self.window)
+
+    @property
+    def mean_speed(self):
+        """Mean absolute horizontal palm velocity over the window, hand lengths per frame."""
+        return self.speed_sum / self.filled if self.frames else 0.0
+
+    def recent(self):
+        """Landmarks of the frames in the window, oldest first (a copy)."""
+        if self.frames < self.window:
+            return self.landmarks[:self.frames].copy()
+        return np.roll(self.landmarks, -self._head, axis=0)
+
+    def push(self, landmarks):
+        """Add one frame of (21, 3) landmarks and update the motion statistics."""
+        i = self._head
+        self.landmarks[i] = landmarks
+        palm_x = float(landmarks[PALM, 0].mean())
+        # Hand length (wrist to middle MCP) makes speeds independent of distance to the camera.
+        scale = max(float(np.hypot(*(landmarks[9, :2] - landmarks[0, :2]))), 1e-3)
+        vx = 0.0 if self._prev_x is None else (palm_x - self._prev_x) / scale
+        self._prev_x = palm_x
+
+        direction = 0 if abs(vx) < DIRECTION_NOISE else (1 if vx > 0 else -1)
+        flip = int(direction != 0 and self._direction != 0 and direction != self._direction)
+        if direction:
+            self._direction = direction
+
+        self.speed_sum += abs(vx) - abs(self._vx[i])
+        self.reversals += flip - self._flip[i]
+        self._vx[i] = vx
+        self._flip[i] = flip
+        self._head = (i + 1) % self.window
+        self.frames += 1
+        self.missing = 0
+
+    def vote(self, label, conf):
+        """Add this frame's label to the vote window; returns {label: summed confidence}."""
+        i = self._vote_head
+        old = self._votes[i]
+        if old is not None:
+            self.scores[old] -= self._vote_conf[i]
+            if self.scores[old] <= 1e-9:
+                del self.scores[old]
+        if label is not None:
+            self.scores[label] = self.scores.get(label, 0.0) + conf
+        self._votes[i] = label
+        self._vote_conf[i] = conf
+        self._vote_head = (i + 1) % len(self._votes)
+        return self.scores
+
+
+class TemporalEngine:
+    """Sequence-aware classification and smoothing on top of per-frame predictions.
+
+    update() takes one hand's landmarks and the static classifier's (label, conf,
+    emoji) for the frame, and returns the smoothed (label, conf, emoji). The hand is
+    reported as waving when its palm reversed horizontal direction at least
+    wave_reversals times within the window at a mean speed of at least wave_speed.
+    The output label only changes once another label has led the confidence vote
+    for min_hold consecutive frames.
+    """
+
+    def __init__(self, window=TEMPORAL_WINDOW, vote_frames=TEMPORAL_VOTE_FRAMES, min_hold=TEMPORAL_MIN_HOLD,
+                 max_missing=TEMPORAL_MAX_MISSING, wave_reversals=WAVE_MIN_REVERSALS, wave_speed=WAVE_MIN_SPEED):
+        self.window = window
+        self.vote_frames = vote_frames
+        self.min_hold = min_hold
+        self.max_missing = max_missing
+        self.wave_reversals = wave_reversals
+        self.wave_speed = wave_speed
+        self.wave_label = GESTURE_DISPLAY_NAMES.get("wave", "wave")
+        self.hands = {}
+        self._emojis = {self.wave_label: GESTURE_EMOJI_MAP.get("wave", "👋")}
+        self.waves = 0
+
+    def history(self, hand_id):
+        return self.hands.get(hand_id)
+
+    def wave_confidence(self, hist):
+        """0 when the hand is not waving, otherwise 0.5 .. 1 growing with speed."""
+        if hist.reversals < self.wave_reversals or hist.mean_speed < self.wave_speed:
+            return 0.0
+        return min(1.0, hist.mean_speed / (2.0 * self.wave_speed))
+
+    def update(self, hand_id, landmarks, label, conf, emoji):
+        """Smoothed (label, conf, emoji) for this hand after adding one frame."""
+        hist = self.hands.get(hand_id)
+        if hist is None:
+            hist = self.hands[hand_id] = HandHistory(self.window, self.vote_frames)
+        hist.push(landmarks)
+
+        wave = self.wave_confidence(hist)
+        if wave:
+            label, conf = self.wave_label, wave
+        elif label is not None:
+            self._emojis[label] = emoji
+        scores = hist.vote(label, conf)
+        if not scores:
+            return None, 0.0, "👋"
+
+        leader = max(scores, key=scores.get)
+        if hist.label is None or hist.label not in scores:
+            hist.label, hist.pending, hist.pending_frames = leader, None, 0
+        elif leader != hist.label:
+            if leader == hist.pending:
+                hist.pending_frames += 1
+            else:
+                hist.pending, hist.pending_frames = leader, 1
+            if hist.pending_frames >= self.min_hold:
+                hist.label, hist.pending, hist.pending_frames = leader, None, 0
+        else:
+            hist.pending, hist.pending_frames = None, 0
+
+        if hist.label == self.wave_label and wave:
+            self.waves += 1
+        conf = scores[hist.label] / min(hist.frames, self.vote_frames)
+        return hist.label, conf, self._emojis.get(hist.label, "👋")
+
+    def end_frame(self, seen=()):
+        """Age hands not in seen and drop those missing for more than max_missing frames."""
+        for hand_id in list(self.hands):
+            if hand_id in seen:
+                continue
+            hist = self.hands[hand_id]
+            hist.missing += 1
+            if hist.missing > self.max_missing:
+                del self.hands[hand_id]
+
+    def reset(self):
+        self.hands.clear()
+
+    def stats(self):
+        return {"hands": len(self.hands), "wave_frames": self.waves}
@@ -1,45 +1,107 @@
+"""Repeated-detection verification before an alert is raised.
+
+Each track keeps a deque of its recent qualifying detection times. Old times
+are popped from the left, so an update costs amortised O(1) no matter how long
+the engine runs. Tracks are kept in an OrderedDict in least-recently-seen
+order. Every update evicts tracks that have not been seen for track_ttl
+seconds from the front, so track IDs that left the scene do not accumulate in a
+24/7 deployment.
+"""
 import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    VERIFY_THRESHOLD_COUNT, VERIFY_TIME_WINDOW, VERIFY_MIN_CONFIDENCE, ALERT_COOLDOWN, VERIFY_TRACK_TTL,
+)
+
+
+class _TrackState:
+    __slots__ = ("times", "last_seen", "last_alert")
+
+    def __init__(self, maxlen, now):
+        self.times = deque(maxlen=maxlen)
+        self.last_seen = now
+        self.last_alert = None
+
 
 class VerificationEngine:
-    def __init__(self, threshold_count=3, time_window=20, min_confidence=0.85):
+    def __init__(self, threshold_count=VERIFY_THRESHOLD_COUNT, time_window=VERIFY_TIME_WINDOW,
+                 min_confidence=VERIFY_MIN_CONFIDENCE, cooldown=ALERT_COOLDOWN, track_ttl=VERIFY_TRACK_TTL,
+                 clock=time.monotonic):
         """
         threshold_count: Number of times gesture must be detected.
         time_window: Window in seconds to look for repetitions.
         min_confidence: Minimum confidence for each detection.
+        cooldown: Seconds after an alert during which the same track cannot alert again.
+        track_ttl: Tracks not updated for this many seconds are forgotten. It is never
+            shorter than time_window or cooldown, so eviction cannot change a result.
+        clock: Function returning the current time in seconds.
         """
         self.threshold_count = threshold_count
         self.time_window = time_window
         self.min_confidence = min_confidence
-        
-        # Structure: { track_id: [timestamp1, timestamp2, ...] }
-        self.detections = {}
-        # Avoid double-triggering: { track_id: last_alert_time }
-        self.last_alert = {}
+        self.cooldown = cooldown
+        self.track_ttl = max(track_ttl, time_window, cooldown)
+        self.clock = clock
+
+        # { track_id: _TrackState }, least recently seen first
+        self.tracks = OrderedDict()
+        self.evicted = 0
+        self.alerts = 0
 
-    def update(self, person_id, is_distress, confidence):
+    def _evict(self, now):
+        tracks = self.tracks
+        while tracks:
+            state = next(iter(tracks.values()))
+            if now - state.last_seen <= self.track_ttl:
+                break
+            tracks.popitem(last=False)
+            self.evicted += 1
+
+    def update(self, person_id, is_distress, confidence, owner_id=None):
         """
-        Update detection history for a person.
+        Update detection history for a person (or a hand track, with owner_id the
+        person it belongs to, used in the alert message).
         Returns: (is_verified, message)
         """
-        current_time = time.time()
-        
-        # Clean up old detections for this person
-        if person_id in self.detections:
-            self.detections[person_id] = [t for t in self.detections[person_id] if current_time - t <= self.time_window]
+        now = self.clock()
+        self._evict(now)
+
+        state = self.tracks.get(person_id)
+        if state is None:
+            # threshold_count is enough: the deque is cleared whenever it reaches that length.
+            state = self.tracks[person_id] = _TrackState(self.threshold_count, now)
         else:
-            self.detections[person_id] = []
+            state.last_seen = now
+            self.tracks.move_to_end(person_id)
+
+        # Clean up old detections for this track
+        times = state.times
+        while times and now - times[0] > self.time_window:
+            times.popleft()
 
         if is_distress and confidence >= self.min_confidence:
-            # Check for cooldown (don't alert too frequently for the same person)
-            if person_id in self.last_alert and current_time - self.last_alert[person_id] < 60:
+            # Check for cooldown (don't alert too frequently for the same track)
+            if state.last_alert is not None and now - state.last_alert < self.cooldown:
                 return False, None
 
-            self.detections[person_id].append(current_time)
-            
-            count = len(self.detections[person_id])
+            times.append(now)
+
+            count = len(times)
             if count >= self.threshold_count:
-                self.last_alert[person_id] = current_time
-                self.detections[person_id] = [] # Reset after trigger
-                return True, f"ALERT: Person ID {person_id} detected performing distress signal {count} times!"
-        
+                state.last_alert = now
+                times.clear()  # Reset after trigger
+                self.alerts += 1
+                who = f"Person ID {person_id}" if owner_id is None else f"Person ID {owner_id} (hand {person_id})"
+                return True, f"ALERT: {who} detected performing distress signal {count} times!"
+
         return False, None
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def stats(self):
+        return {"tracks": len(self.tracks), "evicted": self.evicted, "alerts": self.alerts}
@@ -1,4 +1,6 @@
+import argparse
 import cv2
+import numpy as np
 import time
 import sys
 from pathlib import Path
@@ -7,87 +9,159 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent))
 
 from detection.person_tracker import PersonTracker
-from detection.landmarks import HandLandmarker
-from detection.gesture_logic import is_distress_signal
+from detection.association import HandTracker, associate_hands
+from detection.cascade import PersonHandCascade
+from detection.roi_tracking import create_landmarker
+from detection.gesture_logic import is_distress_signal_batch
 from detection.verification import VerificationEngine
 from alerts.notifier import AlertEngine
-from config import ALERT_EMAIL_SENDER, ALERT_EMAIL_RECEIVER, ALERT_EMAIL_PASSWORD
+from alerts.evidence import EvidenceRecorder
+from detection.camera import open_source
+from detection.overlay import draw_hands, draw_persons, draw_alert
+from detection.scheduler import MotionGatedScheduler
+from monitoring.metrics import (
+    STAGE_SECONDS, FRAMES_CAPTURED, FRAMES_PROCESSED, HANDS_PER_FRAME, INFERENCE_FPS,
+    RateMeter, start_metrics_server,
+)
+from config import (
+    ALERT_EMAIL_SENDER, ALERT_EMAIL_RECEIVER, ALERT_EMAIL_PASSWORD, CAMERA_INDEX, MOTION_GATING, HAND_CASCADE,
+    EVIDENCE_RECORDING,
+)
 
 def main():
+    parser = argparse.ArgumentParser(description="Distress signal monitor")
+    parser.add_argument("--source", default=str(CAMERA_INDEX),
+                        help="Camera index, video file or stream URL (default: config CAMERA_INDEX)")
+    parser.add_argument("--headless", action="store_true",
+                        help="No preview window and no overlay rendering")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve Prometheus metrics on this port at /metrics")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+        print(f"Metrics on http://0.0.0.0:{args.metrics_port}/metrics")
+    stage = {name: STAGE_SECONDS.labels(stage=name) for name in
+             ("capture", "evidence", "persons", "landmarks", "hands", "annotate", "frame")}
+    fps = RateMeter()
+    perf = time.perf_counter
+
     # Initialize components
     print("Initializing System...")
     tracker = PersonTracker()
-    landmarker = HandLandmarker(max_num_hands=2)
-    verifier = VerificationEngine(threshold_count=3, time_window=20, min_confidence=0.85)
+    # The cascade landmarks hands only inside person boxes; otherwise the full frame.
+    landmarker = PersonHandCascade() if HAND_CASCADE else create_landmarker(max_num_hands=2)
+    # Verification state is kept per hand track, so it survives person-ID swaps.
+    hand_tracks = HandTracker()
+    verifier = VerificationEngine()
     notifier = AlertEngine(
         sender_email=ALERT_EMAIL_SENDER,
         receiver_email=ALERT_EMAIL_RECEIVER,
         password=ALERT_EMAIL_PASSWORD
     )
+    # Recent frames kept compressed so each alert can save the seconds before and after it.
+    evidence = EvidenceRecorder() if EVIDENCE_RECORDING else None
     
     # Video Input
-    cap = cv2.VideoCapture(0)
+    cap = open_source(args.source)
     
     # Window setup
-    cv2.namedWindow("Distress Detection System", cv2.WINDOW_NORMAL)
+    if not args.headless:
+        cv2.namedWindow("Distress Detection System", cv2.WINDOW_NORMAL)
     
+    scheduler = MotionGatedScheduler() if MOTION_GATING else None
+    persons, hands = [], np.zeros((0, 21, 3), dtype=np.float32)
+
     print("System Ready. Monitoring...")
     
     while cap.isOpened():
+        t0 = perf()
         ret, frame = cap.read()
         if not ret:
             break
+        t_start = perf()
+        stage["capture"].observe(t_start - t0)
+        FRAMES_CAPTURED.inc()
+        FRAMES_PROCESSED.inc()
             
         h, w = frame.shape[:2]
-        
-        # 1. Track Persons
-        results, persons = tracker.track(frame)
-        
-        # 2. Extract Hand Landmarks
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        hands = landmarker.process(rgb_frame)
-        
-        # 3. Process each hand and associate with person
+
+        # Buffer the frame before anything is drawn on it
+        record, t_ready = None, t_start
+        if evidence is not None:
+            record = evidence.add(frame)
+            t_ready = perf()
+            stage["evidence"].observe(t_ready - t_start)
+
+        # Static scene: reuse the last persons/hands and skip detection and verification.
         distress_triggered = False
+        if scheduler is None or scheduler.should_infer(frame):
+            # 1. Track Persons
+            results, persons = tracker.track(frame)
+            t1 = perf()
+            stage["persons"].observe(t1 - t_ready)
         
-        if hands:
-            for hand_lms in hands:
-                # Get wrist landmark in pixel coords
-                wrist = hand_lms[0]
-                wrist_px = (int(wrist[0] * w), int(wrist[1] * h))
-                
-                # Find which person this hand belongs to
-                assigned_id = -1
-                for person in persons:
-                    bx = person["box"]
-                    # Check if wrist is inside the person's bounding box
-                    if bx[0] <= wrist_px[0] <= bx[2] and bx[1] <= wrist_px[1] <= bx[3]:
-                        assigned_id = person["id"]
-                        break
-                
-                # Draw hand landmarks
-                frame = landmarker.draw_landmarks(frame, [hand_lms])
-                
-                if assigned_id != -1:
-                    # 4. Classify Gesture
-                    is_distress, confidence = is_distress_signal(hand_lms)
-                    
-                    # 5. Verify & Alert
-                    alert_ready, msg = verifier.update(assigned_id, is_distress, confidence)
+            # 2. Extract Hand Landmarks (with the cascade: per person, none without persons)
+            if HAND_CASCADE:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if persons else None
+                batch, person_ids = landmarker.process(rgb_frame, persons)
+                hands = batch.landmarks
+            else:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                hands = landmarker.process_batch(rgb_frame).landmarks
+            t2 = perf()
+            stage["landmarks"].observe(t2 - t1)
+            HANDS_PER_FRAME.observe(len(hands))
+        
+            # Draw all hand landmarks at once (also what an alert frame shows)
+            if not args.headless:
+                draw_hands(frame, hands)
+
+            # 3. Associate hands with persons (one optimal assignment per frame) and hand tracks
+            wrists = hands[:, 0, :2]
+            if not HAND_CASCADE:
+                boxes = np.array([person["box"] for person in persons], dtype=np.float32).reshape(-1, 4)
+                owners = associate_hands(wrists * (w, h), boxes)
+                person_ids = np.array([persons[i]["id"] if i >= 0 else -1 for i in owners], dtype=int)
+            tracks = hand_tracks.update(wrists, person_ids)
+            if evidence is not None:
+                evidence.set_detections(record, persons, hands, tracks)
+            if len(hands):
+                # 4. Classify Gesture (all hands in one vectorized call)
+                distress_flags, distress_confs = is_distress_signal_batch(hands)
+                for track, is_distress, confidence in zip(tracks, distress_flags, distress_confs):
+                    if track.person_id != -1:
+                        # 5. Verify & Alert
+                        alert_ready, msg = verifier.update(track.id, bool(is_distress), float(confidence),
+                                                           owner_id=track.person_id)
                     
-                    if alert_ready:
-                        notifier.trigger(frame, msg)
-                        distress_triggered = True
-                        # Draw alert on frame
-                        cv2.putText(frame, "!!! DISTRESS ALERT !!!", (50, 50), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 3)
+                        if alert_ready:
+                            notifier.trigger(frame, msg)
+                            if evidence is not None:
+                                evidence.trigger(msg)
+                            distress_triggered = True
+
+            t3 = perf()
+            stage["hands"].observe(t3 - t2)
+            if scheduler is not None:
+                scheduler.report(len(persons) > 0 or len(hands) > 0, t3 - t_start)
+            INFERENCE_FPS.set(round(fps.tick(t3), 2))
+        else:
+            t3 = perf()
+            if not args.headless:
+                draw_hands(frame, hands)
 
         # 6. Annotate Frame with Person Tracking
-        for person in persons:
-            bx = person["box"]
-            cv2.rectangle(frame, (bx[0], bx[1]), (bx[2], bx[3]), (255, 0, 0), 2)
-            cv2.putText(frame, f"Person {person['id']}", (bx[0], bx[1]-10), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
+        if not args.headless:
+            draw_persons(frame, persons)
+            if distress_triggered:
+                draw_alert(frame)
+        t_end = perf()
+        stage["annotate"].observe(t_end - t3)
+        stage["frame"].observe(t_end - t_start)
+
+        if args.headless:
+            continue
 
         # Display output
         cv2.imshow("Distress Detection System", frame)
@@ -97,8 +171,12 @@ def main():
             break
             
     cap.release()
-    cv2.destroyAllWindows()
+    if not args.headless:
+        cv2.destroyAllWindows()
     landmarker.close()
+    notifier.close()
+    if evidence is not None:
+        evidence.close()
 
 if __name__ == "__main__":
     main()
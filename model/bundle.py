@@ -0,0 +1,170 @@
+"""Versioned single-file model bundle that is memory-mapped instead of unpickled.
+
+Layout (little endian):
+    magic    8 bytes   b"GESTMDL\\0"
+    version  uint32    FORMAT_VERSION
+    length   uint32    size of the JSON header in bytes
+    header   JSON      format version, model type and params, labels, display names,
+                       emojis, feature schema, array table (dtype, shape, offset) and
+                       the sha256 of the data section
+    data               raw arrays, each starting on an ALIGNMENT-byte boundary
+
+Loading reads the header and maps the file; the arrays are zero-copy views that the
+OS pages in on first use. Nothing here imports sklearn or unpickles anything.
+"""
+import hashlib
+import json
+import os
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from model.compiled import CompiledLinear, CompiledMLP
+from model.forest import CompiledForest
+
+MAGIC = b"GESTMDL\0"
+# 2: any compiled model type, constructor params under "params".
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sII")
+
+MODEL_TYPES = {cls.model_type: cls for cls in (CompiledForest, CompiledLinear, CompiledMLP)}
+FEATURE_SCHEMA = {"name": "hand_landmarks_xyz", "landmarks": 21, "coords": ["x", "y", "z"]}
+
+
+class BundleError(ValueError):
+    """The file is not a model bundle, has an unsupported version or fails its checksum."""
+
+
+class BundleLabels:
+    """Minimal stand-in for the pickled LabelEncoder (classes_ / transform / inverse_transform)."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def transform(self, labels):
+        index = {label: i for i, label in enumerate(self.classes_)}
+        return np.array([index[label] for label in labels])
+
+    def inverse_transform(self, indices):
+        return self.classes_[np.asarray(indices, dtype=int)]
+
+
+def file_fingerprint(path):
+    """{"size", "sha256"} of a file, or None if it does not exist. Bundles record the
+    fingerprint of the pickle they were built from as the "source_pickle" metadata."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": path.stat().st_size, "sha256": digest.hexdigest()}
+
+
+def _align(n):
+    return -n % ALIGNMENT
+
+
+def save_bundle(model, path, **metadata):
+    """Write a compiled model (CompiledForest, CompiledLinear, CompiledMLP) to path
+    atomically. Extra metadata (e.g. accuracy) is stored in the header. Returns the header dict."""
+    path = Path(path)
+    arrays = {name: np.ascontiguousarray(arr) for name, arr in model.arrays().items()}
+    table, offset = {}, 0
+    for name, arr in arrays.items():
+        offset += _align(offset)
+        table[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+
+    digest = hashlib.sha256()
+    data = bytearray()
+    for name, arr in arrays.items():
+        data += b"\0" * (table[name]["offset"] - len(data))
+        data += arr.tobytes()
+    digest.update(data)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "model_type": model.model_type,
+        "params": model.params(),
+        "labels": [str(label) for label in model.labels],
+        "display_names": list(model.display_names),
+        "emojis": list(model.emojis),
+        "feature_schema": dict(FEATURE_SCHEMA, n_features=model.n_features),
+        "arrays": table,
+        "sha256": digest.hexdigest(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "metadata": metadata,
+    }
+    raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    raw += b" " * _align(_PREFIX.size + len(raw))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(raw)))
+        f.write(raw)
+        f.write(data)
+    os.replace(tmp, path)
+    return header
+
+
+def read_header(path):
+    """(header dict, byte offset of the data section) without touching the arrays."""
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise BundleError(f"{path}: truncated bundle")
+        magic, version, length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise BundleError(f"{path}: not a model bundle")
+        if version > FORMAT_VERSION:
+            raise BundleError(f"{path}: bundle format {version} is newer than supported ({FORMAT_VERSION})")
+        try:
+            header = json.loads(f.read(length).decode("utf-8"))
+        except ValueError:
+            raise BundleError(f"{path}: corrupt bundle header") from None
+    return header, _PREFIX.size + length
+
+
+def load_bundle(path, verify=False):
+    """(compiled model, BundleLabels) backed by a read-only memory map of path.
+    The header is always checked, and every array must lie inside the file. verify=True
+    also hashes the whole data section against the stored sha256, which pages in
+    every array; scripts/convert_model.py does that once after writing a bundle."""
+    header, data_offset = read_header(path)
+    cls = MODEL_TYPES.get(header.get("model_type"))
+    if cls is None:
+        raise BundleError(f"{path}: unsupported model type {header.get('model_type')!r}")
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    data = mm[data_offset:]
+    if verify and hashlib.sha256(data).hexdigest() != header["sha256"]:
+        raise BundleError(f"{path}: checksum mismatch")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        start = spec["offset"]
+        if start + count * dtype.itemsize > len(data):
+            raise BundleError(f"{path}: truncated bundle")
+        arrays[name] = data[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    # Format 1 bundles were forests with max_depth at the top level.
+    params = header["params"] if "params" in header else {"max_depth": header["max_depth"]}
+    model = cls.from_arrays(
+        arrays,
+        labels=header["labels"],
+        n_features=header["feature_schema"]["n_features"],
+        display_names=header.get("display_names"),
+        emojis=header.get("emojis"),
+        **params,
+    )
+    model.bundle_header = header
+    return model, BundleLabels(header["labels"])
@@ -0,0 +1,209 @@
+"""Classifiers compiled to plain NumPy arrays for serving without sklearn.
+
+CompiledModel holds what every compiled classifier shares: the class index ->
+label / display name / emoji lookup tables, input validation and the predict
+helpers built on predict_proba. Tree ensembles live in model/forest.py; this module
+adds linear (logistic regression) and MLP classifiers, with any leading
+StandardScaler folded into the first layer's weights.
+"""
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import GESTURE_EMOJI_MAP, GESTURE_DISPLAY_NAMES
+
+
+def class_labels(model, encoder=None):
+    """Label strings for model.classes_, decoded through encoder when the model
+    was trained on encoded targets."""
+    if encoder is not None:
+        return encoder.inverse_transform(np.asarray(model.classes_, dtype=int))
+    return model.classes_
+
+
+class CompiledModel:
+    """Base class: subclasses set model_type and implement _proba, arrays and params."""
+
+    model_type = None
+
+    def set_labels(self, labels, display_names=None, emojis=None):
+        """Class index -> raw label, UI display name and emoji lookup tables.
+        Display names and emojis default to the config maps."""
+        self.labels = np.asarray([str(label) for label in labels])
+        self.display_names = list(display_names or [GESTURE_DISPLAY_NAMES.get(label, label) for label in self.labels])
+        self.emojis = list(emojis or [GESTURE_EMOJI_MAP.get(label, "👋") for label in self.labels])
+
+    def arrays(self):
+        """{name: ndarray} stored in a model bundle."""
+        raise NotImplementedError
+
+    def params(self):
+        """JSON-serialisable constructor arguments besides the arrays and labels."""
+        return {}
+
+    @classmethod
+    def from_arrays(cls, arrays, labels, n_features, display_names=None, emojis=None, **params):
+        return cls(labels=labels, n_features=n_features, display_names=display_names, emojis=emojis,
+                   **arrays, **params)
+
+    def _proba(self, X):
+        raise NotImplementedError
+
+    def predict_proba(self, X):
+        """(n_rows, n_classes) class probabilities."""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        return self._proba(X)
+
+    def predict(self, X):
+        """Class index with the highest probability per row."""
+        return np.argmax(self.predict_proba(X), axis=1)
+
+    def predict_one(self, feature_vector):
+        """(class index, confidence) for a single feature vector."""
+        probs = self.predict_proba(feature_vector)[0]
+        idx = int(np.argmax(probs))
+        return idx, float(probs[idx])
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    z /= z.sum(axis=1, keepdims=True)
+    return z
+
+
+def _unwrap(model):
+    """(mean, scale, final estimator) for an estimator or a StandardScaler pipeline."""
+    steps = getattr(model, "steps", None)
+    if not steps:
+        return None, None, model
+    mean = scale = None
+    for _, step in steps[:-1]:
+        if step == "passthrough" or step is None:
+            continue
+        if not hasattr(step, "scale_") and not hasattr(step, "mean_"):
+            raise TypeError(f"Cannot compile pipeline step {type(step).__name__}")
+        mean = getattr(step, "mean_", None)
+        scale = getattr(step, "scale_", None)
+    return mean, scale, steps[-1][1]
+
+
+def _fold_scaler(weights, bias, mean, scale):
+    """Weights/bias that apply (x - mean) / scale before the first layer."""
+    if scale is not None:
+        weights = weights / scale[:, None]
+    if mean is not None:
+        bias = bias - mean @ weights
+    return weights, bias
+
+
+def _binary_to_two_columns(weights, bias):
+    """A single logit column (binary sklearn models) as two softmax columns [0, z]."""
+    if weights.shape[1] == 1:
+        weights = np.hstack([np.zeros_like(weights), weights])
+        bias = np.concatenate([np.zeros(1), bias])
+    return weights, bias
+
+
+class CompiledLinear(CompiledModel):
+    """Multinomial logistic regression: softmax(x @ weights + bias)."""
+
+    model_type = "linear"
+
+    def __init__(self, weights, bias, labels, n_features, display_names=None, emojis=None):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = np.ascontiguousarray(bias, dtype=np.float64)
+        self.n_features = int(n_features)
+        self.set_labels(labels, display_names, emojis)
+
+    @classmethod
+    def from_sklearn(cls, model, encoder=None):
+        mean, scale, clf = _unwrap(model)
+        weights, bias = _binary_to_two_columns(clf.coef_.T.astype(np.float64), clf.intercept_.astype(np.float64))
+        weights, bias = _fold_scaler(weights, bias, mean, scale)
+        return cls(weights, bias, class_labels(clf, encoder), clf.n_features_in_)
+
+    def arrays(self):
+        return {"weights": self.weights, "bias": self.bias}
+
+    def _proba(self, X):
+        return _softmax(X.astype(np.float64) @ self.weights + self.bias)
+
+
+def _relu(h):
+    return np.maximum(h, 0, out=h)
+
+
+def _tanh(h):
+    return np.tanh(h, out=h)
+
+
+def _logistic(h):
+    return np.divide(1.0, 1.0 + np.exp(-h), out=h)
+
+
+def _identity(h):
+    return h
+
+
+# Module-level functions, not lambdas, so compiled models stay picklable.
+_ACTIVATIONS = {"relu": _relu, "tanh": _tanh, "logistic": _logistic, "identity": _identity}
+
+
+class CompiledMLP(CompiledModel):
+    """Multi-layer perceptron: hidden layers with one activation, softmax output."""
+
+    model_type = "mlp"
+
+    def __init__(self, labels, n_features, activation="relu", display_names=None, emojis=None, **layers):
+        n_layers = len(layers) // 2
+        self.weights = [np.ascontiguousarray(layers[f"W{i}"], dtype=np.float64) for i in range(n_layers)]
+        self.biases = [np.ascontiguousarray(layers[f"b{i}"], dtype=np.float64) for i in range(n_layers)]
+        self.activation = activation
+        self._act = _ACTIVATIONS[activation]
+        self.n_features = int(n_features)
+        self.set_labels(labels, display_names, emojis)
+
+    @classmethod
+    def from_sklearn(cls, model, encoder=None):
+        mean, scale, clf = _unwrap(model)
+        weights = [w.astype(np.float64) for w in clf.coefs_]
+        biases = [b.astype(np.float64) for b in clf.intercepts_]
+        weights[0], biases[0] = _fold_scaler(weights[0], biases[0], mean, scale)
+        weights[-1], biases[-1] = _binary_to_two_columns(weights[-1], biases[-1])
+        layers = {}
+        for i, (w, b) in enumerate(zip(weights, biases)):
+            layers[f"W{i}"], layers[f"b{i}"] = w, b
+        return cls(class_labels(clf, encoder), clf.n_features_in_, clf.activation, **layers)
+
+    def arrays(self):
+        layers = {}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            layers[f"W{i}"], layers[f"b{i}"] = w, b
+        return layers
+
+    def params(self):
+        return {"activation": self.activation}
+
+    def _proba(self, X):
+        h = X.astype(np.float64)
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            h = self._act(h @ w + b)
+        return _softmax(h @ self.weights[-1] + self.biases[-1])
+
+
+def compile_estimator(model, encoder=None):
+    """CompiledLinear / CompiledMLP for a fitted logistic regression or MLP (optionally
+    behind a StandardScaler pipeline); None for anything else."""
+    _, _, clf = _unwrap(model)
+    if hasattr(clf, "coefs_") and hasattr(clf, "intercepts_"):
+        return CompiledMLP.from_sklearn(model, encoder)
+    if hasattr(clf, "coef_") and hasattr(clf, "predict_proba"):
+        return CompiledLinear.from_sklearn(model, encoder)
+    return None
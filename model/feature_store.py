@@ -0,0 +1,402 @@
+"""Append-only, chunked, memory-mapped store for labelled gesture feature vectors.
+
+Layout under root:
+    manifest.json            schema, label table and the list of committed chunks
+    chunk_000001.X.npy       (rows, n_features) float32, rows grouped by label
+    chunk_000001.y.npy       (rows,) int16 label codes
+    chunk_000001.seq.npy     (rows,) int64 append sequence numbers
+
+Each append writes a new immutable chunk, fsyncs it and then atomically replaces
+the manifest, which is the only commit point: a crash before the rename leaves an
+orphan chunk that is ignored (and removed by the next writer), never a half-written
+dataset. Writers in different processes (the app, collect_data.py) serialise on a
+lock file. Rows inside a chunk are grouped by label and the manifest records each
+label's row range per chunk, so reading or sampling one label touches only those
+slices of the memory-mapped files. Every row keeps its append sequence number, so
+"rows added since N" still works after compaction.
+
+Compaction deletes the chunks it merged, which another process may still list in
+the manifest it has loaded. Readers open every chunk they need before reading
+any, and when one has disappeared they re-read the manifest and start over.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import FEATURE_STORE_DIR, FEATURE_COUNT, STORE_CHUNK_ROWS
+
+FORMAT_VERSION = 1
+READ_ATTEMPTS = 3  # manifest re-reads when a chunk was compacted away underneath a reader
+FEATURE_DTYPE = np.float32
+LABEL_DTYPE = np.int16
+
+
+def _fsync_save(path, array):
+    with open(path, "wb") as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on path shared by all processes: flock on POSIX, msvcrt on Windows."""
+    with open(path, "a+") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # gives up after ~10 s
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield  # released when the file is closed
+
+
+def _unlink(path):
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass  # still mapped by a reader on Windows; the next writer retries
+
+
+def _rows_digest(X, y):
+    digest = hashlib.sha1(np.ascontiguousarray(X, dtype=FEATURE_DTYPE).tobytes())
+    digest.update("\0".join(map(str, y)).encode())
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """Labelled float32 feature rows with a fixed width, appended in chunks.
+
+    Readers work on the manifest loaded when the store was opened (or last
+    refreshed / written through this instance), so they never see a partial append.
+    A reader whose chunks were compacted away by another process refreshes first.
+    """
+
+    def __init__(self, root=FEATURE_STORE_DIR, n_features=FEATURE_COUNT, chunk_rows=STORE_CHUNK_ROWS):
+        self.root = Path(root)
+        self.chunk_rows = chunk_rows
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._manifest = self._read_manifest()
+        if self._manifest is None:
+            with self._writing() as manifest:
+                if not manifest["chunks"] and "store_id" not in manifest:
+                    manifest.update(self._empty_manifest(n_features))
+        if self._manifest["format_version"] > FORMAT_VERSION:
+            raise ValueError(f"{self.root}: store format {self._manifest['format_version']} is not supported")
+        if self._manifest["n_features"] != n_features:
+            raise ValueError(f"{self.root}: store holds {self._manifest['n_features']} features, "
+                             f"expected {n_features}")
+
+    @staticmethod
+    def _empty_manifest(n_features):
+        return {
+            "format_version": FORMAT_VERSION,
+            "store_id": uuid.uuid4().hex,
+            "n_features": n_features,
+            "dtype": np.dtype(FEATURE_DTYPE).str,
+            "labels": [],
+            "next_seq": 0,
+            "next_chunk": 1,
+            "chunks": [],
+            "imported": {},
+        }
+
+    def _read_manifest(self):
+        path = self.root / "manifest.json"
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def refresh(self):
+        """Pick up rows committed by other processes since this store was opened."""
+        self._manifest = self._read_manifest() or self._manifest
+        return self
+
+    # -- metadata -----------------------------------------------------------
+
+    @property
+    def store_id(self):
+        """Random id of this store; changes if the store is deleted and recreated."""
+        return self._manifest["store_id"]
+
+    @property
+    def n_features(self):
+        return self._manifest["n_features"]
+
+    @property
+    def next_seq(self):
+        """Sequence number the next appended row will get (= rows ever appended)."""
+        return self._manifest["next_seq"]
+
+    @property
+    def chunks(self):
+        return list(self._manifest["chunks"])
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self._manifest["chunks"])
+
+    def label_counts(self, min_seq=None):
+        """{label: rows}, optionally only for chunks holding rows appended at or after min_seq."""
+        counts = {}
+        for chunk in self._manifest["chunks"]:
+            if min_seq is not None and chunk["last_seq"] < min_seq:
+                continue
+            for label, (start, stop) in chunk["ranges"].items():
+                counts[label] = counts.get(label, 0) + stop - start
+        return dict(sorted(counts.items()))
+
+    def labels(self):
+        return sorted(self.label_counts())
+
+    # -- writing ------------------------------------------------------------
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive write section across threads and processes. Yields a fresh copy
+        of the on-disk manifest; committing it is the caller's last step."""
+        with self._lock, _file_lock(self.root / ".lock"):
+            manifest = self._read_manifest() or {"chunks": []}
+            self._remove_orphans(manifest)
+            yield manifest
+            self._commit(manifest)
+            self._manifest = manifest
+
+    def _commit(self, manifest):
+        path = self.root / "manifest.json"
+        tmp = path.with_name("manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _chunk_files(self, chunk_id):
+        stem = f"chunk_{chunk_id:06d}"
+        return self.root / f"{stem}.X.npy", self.root / f"{stem}.y.npy", self.root / f"{stem}.seq.npy"
+
+    def _remove_orphans(self, manifest):
+        """Delete chunk files no committed manifest refers to (interrupted appends and
+        compacted chunks that could not be deleted yet)."""
+        live = {path.name for chunk in manifest["chunks"] for path in self._chunk_files(chunk["id"])}
+        for path in self.root.glob("chunk_*.npy"):
+            if path.name not in live:
+                _unlink(path)
+
+    def _write_chunk(self, manifest, X, codes, seq):
+        """Write one chunk (rows grouped by label) and return its manifest record."""
+        order = np.argsort(codes, kind="stable")
+        X, codes, seq = X[order], codes[order], seq[order]
+        chunk_id = manifest["next_chunk"]
+        manifest["next_chunk"] += 1
+        for path, array in zip(self._chunk_files(chunk_id), (X, codes, seq)):
+            _fsync_save(path, array)
+        present, starts = np.unique(codes, return_index=True)
+        stops = np.append(starts[1:], len(codes))
+        return {
+            "id": chunk_id,
+            "rows": int(len(X)),
+            "first_seq": int(seq.min()),
+            "last_seq": int(seq.max()),
+            "ranges": {manifest["labels"][code]: [int(a), int(b)] for code, a, b in zip(present, starts, stops)},
+        }
+
+    def _append_locked(self, manifest, X, labels):
+        table = {label: i for i, label in enumerate(manifest["labels"])}
+        for label in np.unique(labels):
+            if label not in table:
+                table[label] = len(manifest["labels"])
+                manifest["labels"].append(str(label))
+        codes = np.array([table[label] for label in labels], dtype=LABEL_DTYPE)
+        seq = np.arange(manifest["next_seq"], manifest["next_seq"] + len(X), dtype=np.int64)
+        manifest["next_seq"] += len(X)
+        manifest["chunks"].append(self._write_chunk(manifest, X, codes, seq))
+
+    def _validate(self, features, labels):
+        X = np.ascontiguousarray(features, dtype=FEATURE_DTYPE)
+        if X.ndim == 1:
+            X = X[None]
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected (rows, {self.n_features}) features, got {X.shape}")
+        return X, np.broadcast_to(np.asarray(labels, dtype=str), (len(X),))
+
+    def append(self, features, labels):
+        """Append rows; labels is one label for all rows or one per row. Returns the row count."""
+        X, labels = self._validate(features, labels)
+        if not len(X):
+            return 0
+        with self._writing() as manifest:
+            self._append_locked(manifest, X, labels)
+        return len(X)
+
+    def compact(self):
+        """Merge runs of small chunks into chunks of about chunk_rows rows.
+        Returns the number of chunks removed."""
+        with self._writing() as manifest:
+            groups, current = [], []
+            for chunk in manifest["chunks"]:
+                if chunk["rows"] >= self.chunk_rows:
+                    if len(current) > 1:
+                        groups.append(current)
+                    current = []
+                    continue
+                current.append(chunk)
+                if sum(c["rows"] for c in current) >= self.chunk_rows:
+                    groups.append(current)
+                    current = []
+            if len(current) > 1:
+                groups.append(current)
+            groups = [group for group in groups if len(group) > 1]
+            replaced = []
+            for group in groups:
+                parts = [self._read_chunk(chunk) for chunk in group]
+                record = self._write_chunk(manifest, *(np.concatenate([p[i] for p in parts]) for i in range(3)))
+                ids = {chunk["id"] for chunk in group}
+                position = next(i for i, c in enumerate(manifest["chunks"]) if c["id"] in ids)
+                manifest["chunks"] = [c for c in manifest["chunks"] if c["id"] not in ids]
+                manifest["chunks"].insert(position, record)
+                replaced.extend(ids)
+        # Readers that already mapped these chunks keep their maps; the others refresh.
+        for chunk_id in replaced:
+            for path in self._chunk_files(chunk_id):
+                _unlink(path)
+        return len(replaced) - len(groups)
+
+    # -- reading ------------------------------------------------------------
+
+    def _read_chunk(self, chunk):
+        """(X, codes, seq) memory-mapped views of one chunk."""
+        return tuple(np.load(path, mmap_mode="r") for path in self._chunk_files(chunk["id"]))
+
+    def _reading(self, read):
+        """read(), re-reading the manifest and retrying if a chunk it opens was compacted away."""
+        for attempt in range(READ_ATTEMPTS):
+            try:
+                return read()
+            except FileNotFoundError:
+                if attempt == READ_ATTEMPTS - 1:
+                    raise
+                self.refresh()
+
+    def iter_chunks(self, labels=None, min_seq=None):
+        """Yield (X, y) label runs chunk by chunk without loading the whole store.
+        X is a read-only memory map (a copy when min_seq splits a chunk); y holds label strings.
+        Every chunk is mapped before the first run is yielded."""
+        def open_chunks():
+            return [(chunk, self._read_chunk(chunk)) for chunk in self._manifest["chunks"]
+                    if min_seq is None or chunk["last_seq"] >= min_seq]
+
+        for chunk, (X, _, seq) in self._reading(open_chunks):
+            for label, (start, stop) in chunk["ranges"].items():
+                if labels is not None and label not in labels:
+                    continue
+                rows = X[start:stop]
+                if min_seq is not None and chunk["first_seq"] < min_seq:
+                    rows = rows[seq[start:stop] >= min_seq]
+                if len(rows):
+                    yield rows, np.full(len(rows), label)
+
+    def load(self, labels=None, min_seq=None):
+        """(X, y) in memory for the selected labels / rows appended at or after min_seq."""
+        parts = list(self.iter_chunks(labels, min_seq))
+        if not parts:
+            return np.zeros((0, self.n_features), dtype=FEATURE_DTYPE), np.zeros(0, dtype=str)
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def sample(self, per_label, rng=None, labels=None, max_seq=None):
+        """Up to per_label random rows for each label, optionally only rows appended
+        before max_seq. Only the sampled rows are read from the memory maps."""
+        rng = rng if rng is not None else np.random.default_rng()
+        state = rng.bit_generator.state  # a retry draws the same picks
+        def draw():
+            rng.bit_generator.state = state
+            return self._sample(per_label, rng, labels, max_seq)
+        return self._reading(draw)
+
+    def _sample(self, per_label, rng, labels, max_seq):
+        X_parts, y_parts = [], []
+        for label in (labels if labels is not None else self.labels()):
+            spans = [(chunk, *chunk["ranges"][label]) for chunk in self._manifest["chunks"]
+                     if label in chunk["ranges"] and (max_seq is None or chunk["first_seq"] < max_seq)]
+            total = sum(stop - start for _, start, stop in spans)
+            if not total:
+                continue
+            # Draw positions over the label's rows in all chunks, then read them chunk by chunk.
+            picks = np.sort(rng.choice(total, size=min(per_label, total), replace=False))
+            offset = 0
+            for chunk, start, stop in spans:
+                n = stop - start
+                local = picks[(picks >= offset) & (picks < offset + n)] - offset + start
+                offset += n
+                if not len(local):
+                    continue
+                X, _, seq = self._read_chunk(chunk)
+                if max_seq is not None and chunk["last_seq"] >= max_seq:
+                    local = local[seq[local] < max_seq]
+                X_parts.append(np.asarray(X[local]))
+                y_parts.append(np.full(len(local), label))
+        if not X_parts:
+            return np.zeros((0, self.n_features), dtype=FEATURE_DTYPE), np.zeros(0, dtype=str)
+        return np.concatenate(X_parts), np.concatenate(y_parts)
+
+    # -- legacy npz import --------------------------------------------------
+
+    def import_npz(self, dataset_dir):
+        """Append rows from dataset_dir/*.npz files (X, y) that were not imported yet.
+
+        A file that grew since its last import contributes only its new rows; a file
+        rewritten in place is skipped and reported. Returns (rows imported, skipped names).
+        """
+        imported, skipped = 0, []
+        for path in sorted(Path(dataset_dir).glob("*.npz")):
+            stat = path.stat()
+            record = self._manifest.get("imported", {}).get(path.name)
+            if record and record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            data = np.load(path, allow_pickle=True)
+            X, y = self._validate(data["X"], data["y"].astype(str))
+            start = record["rows"] if record else 0
+            if record and (len(X) < start or _rows_digest(X[:start], y[:start]) != record["digest"]):
+                skipped.append(path.name)
+                continue
+            with self._writing() as manifest:
+                if len(X) > start:
+                    self._append_locked(manifest, X[start:], y[start:])
+                manifest.setdefault("imported", {})[path.name] = {
+                    "rows": int(len(X)), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                    "digest": _rows_digest(X, y), "imported_at": time.time(),
+                }
+            imported += len(X) - start
+        return imported, skipped
+
+
+_store = None
+
+
+def get_feature_store():
+    """Process-wide store at FEATURE_STORE_DIR."""
+    global _store
+    if _store is None:
+        _store = FeatureStore()
+    return _store
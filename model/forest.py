@@ -0,0 +1,138 @@
+"""Tree-ensemble classifier compiled to flat NumPy node arrays.
+
+A fitted sklearn RandomForestClassifier / ExtraTreesClassifier / DecisionTreeClassifier
+is exported into one set of arrays for all trees (split feature, threshold, left and
+right child, per-leaf class probabilities). Evaluation walks every tree for every input
+row at once, one tree level per step, and reproduces sklearn's predict_proba exactly
+without sklearn's per-call validation and joblib overhead. sklearn itself is only
+needed to build the arrays, never to evaluate them.
+"""
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from model.compiled import CompiledModel, class_labels
+
+
+class CompiledForest(CompiledModel):
+    """Flat-array forest. Leaves point to themselves, so a fixed number of steps
+    (the deepest tree's depth) lands every row in its leaf."""
+
+    model_type = "forest"
+
+    def __init__(self, feature, threshold, left, right, leaf_proba, roots, max_depth, labels, n_features,
+                 display_names=None, emojis=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.leaf_proba = np.ascontiguousarray(leaf_proba, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.set_labels(labels, display_names, emojis)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_classes(self):
+        return self.leaf_proba.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, model, encoder=None):
+        """Compile a fitted tree classifier. Labels come from encoder.classes_ when the
+        model was trained on encoded targets, else from model.classes_."""
+        estimators = getattr(model, "estimators_", None) or [model]
+        n_classes = len(model.classes_)
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in estimators:
+            tree = est.tree_
+            n = tree.node_count
+            leaf = tree.children_left == -1
+            node_ids = np.arange(n)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            lefts.append(np.where(leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(leaf, node_ids, tree.children_right) + offset)
+            # Same normalisation as DecisionTreeClassifier.predict_proba.
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            probas.append(value / normalizer)
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+
+        return cls(
+            np.concatenate(features), np.concatenate(thresholds),
+            np.concatenate(lefts), np.concatenate(rights),
+            np.concatenate(probas), np.asarray(roots), max_depth,
+            class_labels(model, encoder), model.n_features_in_,
+        )
+
+    def arrays(self):
+        return {"feature": self.feature, "threshold": self.threshold, "left": self.left,
+                "right": self.right, "leaf_proba": self.leaf_proba, "roots": self.roots}
+
+    def params(self):
+        return {"max_depth": self.max_depth}
+
+    def leaves(self, X):
+        """(n_rows, n_trees) leaf node index per row and tree."""
+        # sklearn evaluates trees on float32 inputs compared against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        feature, threshold, left, right = self.feature, self.threshold, self.left, self.right
+        for _ in range(self.max_depth):
+            go_left = X[rows, feature[nodes]] <= threshold[nodes]
+            nodes = np.where(go_left, left[nodes], right[nodes])
+        return nodes
+
+    def _proba(self, X):
+        """Class probabilities, identical to sklearn's predict_proba."""
+        per_tree = self.leaf_proba[self.leaves(X)]  # (n_rows, n_trees, n_classes)
+        # Accumulate trees in order, as sklearn does, so sums match bit for bit.
+        total = np.cumsum(per_tree, axis=1)[:, -1]
+        return total / self.n_trees
+
+
+def merge_forests(forests):
+    """One CompiledForest voting with every tree of forests. Class columns are remapped
+    onto the sorted union of labels, so forests trained on different label subsets
+    can be combined; a tree gives zero probability to labels it never saw."""
+    labels = sorted({str(label) for forest in forests for label in forest.labels})
+    column = {label: i for i, label in enumerate(labels)}
+    names = {}
+    for forest in forests:
+        for label, display, emoji in zip(forest.labels, forest.display_names, forest.emojis):
+            names.setdefault(str(label), (display, emoji))
+
+    parts = {key: [] for key in ("feature", "threshold", "left", "right", "leaf_proba", "roots")}
+    offset = 0
+    for forest in forests:
+        if forest.n_features != forests[0].n_features:
+            raise ValueError("Cannot merge forests with different feature counts")
+        proba = np.zeros((len(forest.feature), len(labels)))
+        proba[:, [column[str(label)] for label in forest.labels]] = forest.leaf_proba
+        parts["feature"].append(forest.feature)
+        parts["threshold"].append(forest.threshold)
+        parts["left"].append(forest.left + offset)
+        parts["right"].append(forest.right + offset)
+        parts["leaf_proba"].append(proba)
+        parts["roots"].append(forest.roots + offset)
+        offset += len(forest.feature)
+    return CompiledForest(
+        **{key: np.concatenate(values) for key, values in parts.items()},
+        max_depth=max(forest.max_depth for forest in forests),
+        labels=labels,
+        n_features=forests[0].n_features,
+        display_names=[names[label][0] for label in labels],
+        emojis=[names[label][1] for label in labels],
+    )
@@ -0,0 +1,208 @@
+"""Background training jobs: a queue served by a worker process, with progress and cancellation.
+
+Jobs run one at a time. Each job trains in a fresh spawned process, so the Flask
+request returns immediately, the fit does not compete with the video loop for the
+GIL, and its memory is released when it exits. On success the new model is
+loaded and published to the ModelRegistry, which swaps it in atomically.
+"""
+import multiprocessing as mp
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from model.predict import load_model
+from model.registry import get_registry
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+def _default_trainer(progress, should_cancel, **options):
+    from model.train import train, UP_TO_DATE
+    ok, message = train(progress=progress, should_cancel=should_cancel, **options)
+    return ok, message, not message.startswith(UP_TO_DATE)
+
+
+def _run_job(trainer, events, cancel_event, options):
+    """Worker process entry point: run trainer, streaming progress back to the parent."""
+    try:
+        ok, message, *trained = trainer(
+            lambda fraction, stage: events.put(("progress", fraction, stage)),
+            cancel_event.is_set,
+            **options,
+        )
+        events.put(("done", ok, message, trained[0] if trained else ok))
+    except Exception as e:
+        events.put(("done", False, f"Training failed: {e}", False))
+
+
+class TrainingJob:
+    """Status of one training request, updated by the queue's dispatcher thread."""
+
+    def __init__(self, job_id, options=None):
+        self.id = job_id
+        self.options = options or {}
+        self.status = QUEUED
+        self.progress = 0.0
+        self.stage = ""
+        self.message = ""
+        self.model_version = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = None
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "options": self.options,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "stage": self.stage,
+            "message": self.message,
+            "model_version": self.model_version,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class TrainingJobQueue:
+    """Accepts training jobs and runs them sequentially in worker processes.
+
+    trainer(progress, should_cancel, **options) -> (ok, message) or (ok, message, trained) runs
+    in the worker and must be picklable (a module-level function); trained False means
+    it succeeded without producing a new model, so nothing is published. loader() -> (model, encoder) runs in this
+    process after a successful job; its result is published to registry.
+    """
+
+    def __init__(self, registry=None, trainer=_default_trainer, loader=load_model, keep=20, poll=0.2):
+        self.registry = registry
+        self.trainer = trainer
+        self.loader = loader
+        self.keep = keep
+        self.poll = poll
+        self._ctx = mp.get_context("spawn")
+        self._pending = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._dispatch, daemon=True, name="training-jobs")
+        self._thread.start()
+
+    def submit(self, **options):
+        """Queue a training run; options are passed to the trainer. Returns its TrainingJob."""
+        job = TrainingJob(uuid.uuid4().hex[:12], options)
+        job._cancel = self._ctx.Event()
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [j for j in self._jobs.values() if j.done]
+            for old in finished[:max(0, len(finished) - self.keep)]:
+                del self._jobs[old.id]
+        self._pending.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Request cancellation. Queued jobs never start; a running job stops at its
+        next checkpoint without publishing. Returns False for unknown or finished jobs."""
+        job = self.get(job_id)
+        if job is None or job.done:
+            return False
+        job._cancel.set()
+        if job.status == QUEUED:
+            job.status, job.message, job.finished = CANCELLED, "Cancelled before start.", time.time()
+        return True
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes (for scripts and tests). Returns the job."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        job = self.get(job_id)
+        while job is not None and not job.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll / 2)
+        return job
+
+    def _dispatch(self):
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            if job.done or job._cancel.is_set():
+                continue
+            try:
+                self._run(job)
+            except Exception as e:
+                job.status, job.message = FAILED, f"Training failed: {e}"
+            job.finished = job.finished or time.time()
+
+    def _run(self, job):
+        events = self._ctx.Queue()
+        worker = self._ctx.Process(target=_run_job, args=(self.trainer, events, job._cancel, job.options), daemon=True)
+        job.status, job.started = RUNNING, time.time()
+        worker.start()
+        result = None
+        while result is None:
+            try:
+                event = events.get(timeout=self.poll)
+            except queue.Empty:
+                if worker.is_alive():
+                    continue
+                # The worker may have posted its result and exited since the get timed out.
+                try:
+                    event = events.get(timeout=self.poll)
+                except queue.Empty:
+                    break
+            if event[0] == "progress":
+                job.progress, job.stage = event[1], event[2]
+            else:
+                result = event[1:]
+        worker.join()
+
+        if result is None:
+            job.status, job.message = FAILED, f"Training worker exited with code {worker.exitcode}"
+        elif result[0] and not result[2]:
+            registry = self.registry or get_registry()
+            job.model_version = registry.current.version if registry.current is not None else None
+            job.status, job.progress, job.stage, job.message = SUCCEEDED, 1.0, "done", result[1]
+        elif result[0]:
+            # A cancel that arrives after the model was saved is too late; publish it.
+            registry = self.registry or get_registry()
+            with registry.lock:
+                model, encoder = self.loader()
+                version = registry.publish(model, encoder, source="training", job_id=job.id, message=result[1])
+            job.model_version = version.version
+            job.status, job.progress, job.stage, job.message = SUCCEEDED, 1.0, "done", result[1]
+        elif job._cancel.is_set():
+            job.status, job.message = CANCELLED, "Training cancelled."
+        else:
+            job.status, job.message = FAILED, result[1]
+        job.finished = time.time()
+
+    def close(self):
+        self._pending.put(None)
+
+
+_job_queue = None
+
+
+def get_job_queue():
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = TrainingJobQueue()
+    return _job_queue
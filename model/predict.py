@@ -6,12 +6,59 @@ import numpy as np
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from config import DEFAULT_MODEL_PATH, LABEL_ENCODER_PATH, GESTURE_EMOJI_MAP, GESTURE_DISPLAY_NAMES
+from config import (
+    DEFAULT_MODEL_PATH, LABEL_ENCODER_PATH, MODEL_BUNDLE_PATH, GESTURE_EMOJI_MAP, GESTURE_DISPLAY_NAMES,
+)
+from model.bundle import BundleError, file_fingerprint, load_bundle, read_header
+from model.compiled import CompiledModel, compile_estimator
+from model.forest import CompiledForest
 
 
-def load_model(model_path=None, label_encoder_path=None):
-    model_path = model_path or DEFAULT_MODEL_PATH
-    label_encoder_path = label_encoder_path or LABEL_ENCODER_PATH
+def compile_model(model, encoder=None):
+    """CompiledForest for fitted tree classifiers, CompiledLinear / CompiledMLP for
+    logistic regression and MLP models; anything else is returned unchanged."""
+    if model is None or isinstance(model, CompiledModel) or not hasattr(model, "classes_"):
+        return model
+    estimators = getattr(model, "estimators_", None) or [model]
+    if all(hasattr(est, "tree_") for est in estimators):
+        return CompiledForest.from_sklearn(model, encoder)
+    return compile_estimator(model, encoder) or model
+
+
+def _bundle_is_current(bundle_path, model_path):
+    """The bundle exists and was built from the pickle it would shadow (same size and sha256).
+    File times are not used: a checkout sets them arbitrarily. Bundles that do not record
+    their pickle count as current."""
+    if not bundle_path.exists():
+        return False
+    recorded = read_header(bundle_path)[0].get("metadata", {}).get("source_pickle")
+    if recorded is None or not model_path.exists():
+        return True
+    if recorded["size"] != model_path.stat().st_size:
+        return False
+    return recorded == file_fingerprint(model_path)
+
+
+def load_model(model_path=None, label_encoder_path=None, compiled=True, bundle_path=None):
+    """(model, encoder). With compiled=True supported models come back compiled
+    (see compile_model), which predict_gesture evaluates without sklearn. The memory-mapped bundle is used
+    when it was built from the pickle on disk; otherwise, or if it cannot be loaded, the default pickles
+    are loaded and compiled."""
+    if compiled and model_path is None:
+        bundle_path = Path(bundle_path or MODEL_BUNDLE_PATH)
+        try:
+            if _bundle_is_current(bundle_path, DEFAULT_MODEL_PATH):
+                return load_bundle(bundle_path)
+        except BundleError as e:
+            print(f"ERROR: Failed to load model bundle, using the pickled model: {e}")
+    elif model_path is not None and Path(model_path).suffix == MODEL_BUNDLE_PATH.suffix:
+        try:
+            return load_bundle(model_path)
+        except BundleError as e:
+            print(f"ERROR: Failed to load model bundle, using the pickled model: {e}")
+            model_path = None
+    model_path = Path(model_path or DEFAULT_MODEL_PATH)
+    label_encoder_path = Path(label_encoder_path or LABEL_ENCODER_PATH)
     if not model_path.exists():
         return None, None
     with open(model_path, "rb") as f:
@@ -20,6 +67,8 @@ def load_model(model_path=None, label_encoder_path=None):
     if label_encoder_path.exists():
         with open(label_encoder_path, "rb") as f:
             encoder = pickle.load(f)
+    if compiled:
+        model = compile_model(model, encoder)
     return model, encoder
 
 
@@ -30,6 +79,9 @@ def predict_gesture(model, encoder, feature_vector: np.ndarray):
     """
     if model is None:
         return None, 0.0, "👋"
+    if isinstance(model, CompiledModel):
+        idx, conf = model.predict_one(feature_vector)
+        return model.display_names[idx], conf, model.emojis[idx]
     X = np.array([feature_vector])
     if hasattr(model, "predict_proba"):
         probs = model.predict_proba(X)[0]
@@ -46,3 +98,19 @@ def predict_gesture(model, encoder, feature_vector: np.ndarray):
     emoji = GESTURE_EMOJI_MAP.get(label, "👋")
     display = GESTURE_DISPLAY_NAMES.get(label, label)
     return display, conf, emoji
+
+
+def predict_gesture_batch(model, encoder, features: np.ndarray):
+    """
+    features: shape (n, 63). Returns a list of (label_str, confidence, emoji), one per row,
+    computed in a single vectorized pass when the model is compiled.
+    """
+    features = np.asarray(features)
+    if model is None:
+        return [(None, 0.0, "👋")] * len(features)
+    if not isinstance(model, CompiledModel) or len(features) == 0:
+        return [predict_gesture(model, encoder, x) for x in features]
+    probs = model.predict_proba(features)
+    idx = np.argmax(probs, axis=1)
+    conf = probs[np.arange(len(idx)), idx]
+    return [(model.display_names[i], float(c), model.emojis[i]) for i, c in zip(idx, conf)]
@@ -0,0 +1,121 @@
+"""Immutable model versions and the registry the live pipeline reads them from."""
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import DEFAULT_MODEL_PATH, MODEL_BUNDLE_PATH
+from model.bundle import file_fingerprint, save_bundle
+from model.compiled import CompiledModel
+from model.predict import load_model
+
+# One published model: classifier and encoder always travel together.
+ModelVersion = namedtuple("ModelVersion", "version model encoder created source info")
+
+# Bundle metadata that tells incremental training which samples a model has seen.
+TRAINING_STATE = ("store_id", "consumed_seq")
+
+
+def _training_state(model):
+    metadata = getattr(model, "bundle_header", {}).get("metadata", {})
+    return {key: metadata[key] for key in TRAINING_STATE if key in metadata}
+
+
+def _in_memory(model):
+    """Copy of a compiled model whose arrays no longer view a memory-mapped bundle file."""
+    arrays = {name: np.array(arr) for name, arr in model.arrays().items()}
+    return type(model).from_arrays(arrays, labels=model.labels, n_features=model.n_features,
+                                   display_names=model.display_names, emojis=model.emojis, **model.params())
+
+
+class ModelRegistry:
+    """Holds the current ModelVersion plus a short history for rollback.
+
+    Publishing replaces a single reference, so a reader that takes `current` once
+    per frame always sees a matching model and encoder, and never blocks.
+    persist_path: when set, a rolled-back forest is written there so a restart
+    serves the same model. Each version keeps the store_id and consumed_seq of the
+    bundle it was loaded from; a rollback writes them back, so the next incremental
+    training run starts from what the restored model has seen. pickle_path: the pickle
+    a persisted rollback is recorded against, so load_model still prefers it to that pickle.
+    lock: held while a version is published or a rollback is persisted; whoever loads a
+    model from disk to publish it holds it too, so a rollback cannot overwrite the bundle
+    between that load and the publish.
+    """
+
+    def __init__(self, keep=5, persist_path=None, pickle_path=None):
+        self.keep = keep
+        self.persist_path = persist_path
+        self.pickle_path = pickle_path
+        self.lock = threading.RLock()
+        self._history = []
+        self._current = None
+        self._next_version = 1
+
+    @property
+    def current(self):
+        return self._current
+
+    def publish(self, model, encoder, source="manual", **info):
+        """Make (model, encoder) the current model; returns the new ModelVersion."""
+        with self.lock:
+            version = ModelVersion(self._next_version, model, encoder, time.time(), source,
+                                   {**_training_state(model), **info})
+            self._next_version += 1
+            self._history.append(version)
+            del self._history[:-self.keep]
+            self._current = version
+        return version
+
+    def rollback(self):
+        """Switch back to the version published before the current one.
+        Returns it, or None when there is nothing to roll back to."""
+        with self.lock:
+            if self._current is None:
+                return None
+            index = self._history.index(self._current)
+            if index == 0:
+                return None
+            previous = self._history[index - 1]
+            # Drop the rolled-back version so a second rollback goes further back.
+            del self._history[index]
+            self._current = previous
+            if self.persist_path is not None and isinstance(previous.model, CompiledModel):
+                state = {key: previous.info[key] for key in TRAINING_STATE if key in previous.info}
+                if self.pickle_path is not None:
+                    state["source_pickle"] = file_fingerprint(self.pickle_path)
+                # The model may be mapped from persist_path itself, which save_bundle replaces.
+                save_bundle(_in_memory(previous.model), self.persist_path,
+                            source=f"rollback to version {previous.version}", **state)
+        return previous
+
+    def versions(self):
+        """Published versions still available, oldest first, as JSON-friendly dicts."""
+        current = self._current
+        return [{
+            "version": v.version,
+            "created": v.created,
+            "source": v.source,
+            "current": v is current,
+            **v.info,
+        } for v in list(self._history)]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Process-wide registry, seeded with the model on disk."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = ModelRegistry(persist_path=MODEL_BUNDLE_PATH, pickle_path=DEFAULT_MODEL_PATH)
+                registry.publish(*load_model(), source="disk")
+                _registry = registry
+    return _registry
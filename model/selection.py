@@ -0,0 +1,212 @@
+"""Cross-validated model selection over forest, extra-trees, linear and MLP candidates.
+
+select_model() scores every CANDIDATES entry with stratified k-fold cross-validation
+in a pool of worker processes. The store's rows and the fold assignment are written
+once to SELECTION_CACHE_DIR (keyed by store id and row count) and memory-mapped by
+every worker, so no task re-reads the store or pickles the dataset. Each candidate's
+fold-0 model comes back compiled; after the pool is done its single-frame
+predict_gesture latency is measured in this process, on this machine. Candidates are
+ranked by accuracy and latency, and the fastest one whose mean CV accuracy reaches
+SELECTION_ACCURACY_FLOOR is chosen (the most accurate one if none does).
+"""
+import json
+import multiprocessing as mp
+import os
+import shutil
+import time
+import warnings
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import (
+    RANDOM_STATE, SELECTION_FOLDS, SELECTION_ACCURACY_FLOOR, SELECTION_WORKERS, SELECTION_CACHE_DIR,
+)
+from model.predict import compile_model, predict_gesture
+
+# A model spec is JSON-friendly so train() can keep the chosen one in its manifest.
+CANDIDATES = [
+    {"name": "rf_100", "family": "rf", "params": {"n_estimators": 100}},
+    {"name": "rf_50_d12", "family": "rf", "params": {"n_estimators": 50, "max_depth": 12}},
+    {"name": "rf_25_d8", "family": "rf", "params": {"n_estimators": 25, "max_depth": 8}},
+    {"name": "et_100", "family": "et", "params": {"n_estimators": 100}},
+    {"name": "et_50_d12", "family": "et", "params": {"n_estimators": 50, "max_depth": 12}},
+    {"name": "logistic_c1", "family": "logistic", "params": {"C": 1.0}},
+    {"name": "logistic_c10", "family": "logistic", "params": {"C": 10.0}},
+    {"name": "mlp_64", "family": "mlp", "params": {"hidden_layer_sizes": [64]}},
+    {"name": "mlp_128_64", "family": "mlp", "params": {"hidden_layer_sizes": [128, 64]}},
+]
+DEFAULT_SPEC = CANDIDATES[0]
+# Families that can be grown with warm_start and extended by incremental updates.
+FOREST_FAMILIES = ("rf", "et")
+LATENCY_FRAMES = 200
+LATENCY_REPEATS = 5
+
+Selection = namedtuple("Selection", "name spec ranking floor_met")
+
+
+def build_estimator(spec, seed=RANDOM_STATE):
+    """Unfitted sklearn estimator for a model spec."""
+    family, params = spec["family"], dict(spec["params"])
+    if family == "rf":
+        return RandomForestClassifier(random_state=seed, **params)
+    if family == "et":
+        return ExtraTreesClassifier(random_state=seed, **params)
+    if family == "logistic":
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000, **params))
+    if family == "mlp":
+        params["hidden_layer_sizes"] = tuple(params["hidden_layer_sizes"])
+        return make_pipeline(StandardScaler(), MLPClassifier(max_iter=500, random_state=seed, **params))
+    raise ValueError(f"Unknown model family: {family}")
+
+
+def is_forest(spec):
+    return spec["family"] in FOREST_FAMILIES
+
+
+# -- cached folds ---------------------------------------------------------------
+
+def prepare_folds(store, n_folds=SELECTION_FOLDS, cache_dir=SELECTION_CACHE_DIR, seed=RANDOM_STATE):
+    """Directory with X.npy, y.npy (label codes), folds.npy (test fold of each row) and
+    labels.json for the store's current rows. Reused while the store is unchanged;
+    older caches are removed when a new one is written."""
+    cache_dir = Path(cache_dir)
+    path = cache_dir / f"{store.store_id}-{store.next_seq}-{n_folds}-{seed}"
+    if (path / "labels.json").exists():
+        return path
+
+    X, y = store.load()
+    labels, codes = np.unique(y, return_inverse=True)
+    n_splits = min(n_folds, int(np.bincount(codes).min()) if len(codes) else 0)
+    if len(labels) < 2 or n_splits < 2:
+        raise ValueError("Cross-validation needs at least two gestures with two samples each")
+    folds = np.empty(len(codes), dtype=np.int8)
+    for k, (_, test) in enumerate(StratifiedKFold(n_splits, shuffle=True, random_state=seed).split(X, codes)):
+        folds[test] = k
+
+    tmp = cache_dir / (path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "X.npy", np.ascontiguousarray(X, dtype=np.float32))
+    np.save(tmp / "y.npy", codes.astype(np.int16))
+    np.save(tmp / "folds.npy", folds)
+    with open(tmp / "labels.json", "w") as f:
+        json.dump([str(label) for label in labels], f)
+    for old in cache_dir.iterdir():
+        if old != tmp:
+            shutil.rmtree(old, ignore_errors=True)
+    os.replace(tmp, path)
+    return path
+
+
+def _open_cache(path):
+    path = Path(path)
+    return tuple(np.load(path / name, mmap_mode="r") for name in ("X.npy", "y.npy", "folds.npy"))
+
+
+# -- worker processes -------------------------------------------------------------
+
+_data = None
+
+
+def _init_worker(cache_path):
+    global _data
+    warnings.filterwarnings("ignore", category=ConvergenceWarning)
+    _data = _open_cache(cache_path)
+
+
+def _evaluate(name, spec, fold, seed, keep_model):
+    """(name, fold, accuracy, fit seconds, compiled model or None) for one CV split."""
+    X, y, folds = _data
+    test = folds == fold
+    t0 = time.perf_counter()
+    clf = build_estimator(spec, seed).fit(X[~test], y[~test])
+    fit_seconds = time.perf_counter() - t0
+    accuracy = float(np.mean(clf.predict(X[test]) == y[test]))
+    return name, fold, accuracy, fit_seconds, compile_model(clf) if keep_model else None
+
+
+# -- selection -----------------------------------------------------------------------
+
+def measure_latency(model, rows, repeats=LATENCY_REPEATS):
+    """Median seconds per single-frame predict_gesture call over rows."""
+    rows = [np.array(row) for row in rows]
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for row in rows:
+            predict_gesture(model, None, row)
+        timings.append((time.perf_counter() - t0) / len(rows))
+    return float(np.median(timings))
+
+
+def select_model(store, candidates=CANDIDATES, n_folds=SELECTION_FOLDS, floor=SELECTION_ACCURACY_FLOOR,
+                 workers=SELECTION_WORKERS, cache_dir=SELECTION_CACHE_DIR, seed=RANDOM_STATE,
+                 progress=None, should_cancel=None):
+    """Cross-validate candidates in parallel and pick one (see module docstring).
+
+    Returns a Selection, or None if should_cancel() became true. ranking lists every
+    candidate as a dict (name, family, params, accuracy, accuracy_std, latency_ms,
+    fit_seconds), most accurate first. progress(fraction, stage) as in train().
+    """
+    report = progress or (lambda fraction, stage: None)
+    cancelled = should_cancel or (lambda: False)
+    report(0.0, "caching folds")
+    path = prepare_folds(store, n_folds, cache_dir, seed)
+    X, _, folds = _open_cache(path)
+    n_splits = int(folds.max()) + 1
+
+    scores = {spec["name"]: [] for spec in candidates}
+    fit_seconds = {spec["name"]: 0.0 for spec in candidates}
+    models = {}
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=mp.get_context("spawn"),
+                               initializer=_init_worker, initargs=(str(path),))
+    pending = {pool.submit(_evaluate, spec["name"], spec, k, seed, k == 0)
+               for spec in candidates for k in range(n_splits)}
+    total = len(pending)
+    try:
+        while pending:
+            if cancelled():
+                return None
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, _, accuracy, seconds, model = future.result()
+                scores[name].append(accuracy)
+                fit_seconds[name] += seconds
+                if model is not None:
+                    models[name] = model
+            report(0.9 * (total - len(pending)) / total, "cross-validating")
+    finally:
+        pool.shutdown(wait=not pending, cancel_futures=True)
+
+    report(0.9, "measuring latency")
+    rows = X[:LATENCY_FRAMES]
+    ranking = []
+    for spec in candidates:
+        name = spec["name"]
+        ranking.append({
+            "name": name,
+            "family": spec["family"],
+            "params": spec["params"],
+            "accuracy": round(float(np.mean(scores[name])), 4),
+            "accuracy_std": round(float(np.std(scores[name])), 4),
+            "latency_ms": round(measure_latency(models[name], rows) * 1000, 4),
+            "fit_seconds": round(fit_seconds[name], 3),
+        })
+    ranking.sort(key=lambda r: (-r["accuracy"], r["latency_ms"]))
+    eligible = [r for r in ranking if r["accuracy"] >= floor]
+    chosen = min(eligible, key=lambda r: r["latency_ms"]) if eligible else ranking[0]
+    spec = next(spec for spec in candidates if spec["name"] == chosen["name"])
+    report(1.0, "selected")
+    return Selection(chosen["name"], spec, ranking, bool(eligible))
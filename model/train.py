@@ -1,60 +1,298 @@
-"""Train gesture classifier from collected landmark dataset."""
+"""Train gesture classifier from the collected feature store.
+
+Samples live in the append-only feature store (model/feature_store.py); legacy
+dataset/*.npz files are imported into it on each run. A full rebuild fits a fresh
+forest on every stored row. Afterwards, train() remembers in a manifest how far
+into the store the model has read, and later runs update it incrementally: extra
+trees are grown on only the rows appended since, plus a small per-label replay
+sample of earlier ones read straight from the memory-mapped chunks, and merged into
+the compiled forest. Each bundle records the store and sequence number it has read
+up to, and an incremental run starts from the bundle's, so after a registry rollback
+the restored model is extended with every row it has not seen. Every FULL_REBUILD_EVERY updates, or when labels appear or the
+store is recreated, the next run rebuilds from scratch. Incremental updates are
+stored in the model bundle only; the pickles always hold the last full rebuild.
+
+mode="select" first runs the cross-validated model search in model/selection.py and
+rebuilds with the chosen candidate. Later rebuilds reuse that model spec; families
+other than forests cannot be extended with trees, so they always rebuild in full.
+"""
+import json
+import os
 import pickle
+import time
+from collections import namedtuple
 from pathlib import Path
 
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from config import DATASET_DIR, DEFAULT_MODEL_PATH, LABEL_ENCODER_PATH, TEST_SIZE, RANDOM_STATE
+from config import (
+    DATASET_DIR, FEATURE_STORE_DIR, DEFAULT_MODEL_PATH, LABEL_ENCODER_PATH, MODEL_BUNDLE_PATH,
+    TRAIN_MANIFEST_PATH, SELECTION_CACHE_DIR, TEST_SIZE, RANDOM_STATE, INCREMENTAL_TREES, REPLAY_SAMPLES, FULL_REBUILD_EVERY,
+)
+from model.bundle import file_fingerprint, save_bundle, load_bundle, read_header
+from model.feature_store import FeatureStore
+from model.forest import CompiledForest, merge_forests
+from model.predict import compile_model
+from model.selection import DEFAULT_SPEC, build_estimator, is_forest, select_model
+
+# Message of a run that found nothing to train on and left the saved model untouched.
+UP_TO_DATE = "No new samples since the last training run. Model is up to date."
+
+# Where train() reads samples and writes its outputs; tests and benchmarks pass their own.
+TrainPaths = namedtuple("TrainPaths", "dataset store model encoder bundle manifest selection_cache",
+                        defaults=(SELECTION_CACHE_DIR,))
+DEFAULT_PATHS = TrainPaths(DATASET_DIR, FEATURE_STORE_DIR, DEFAULT_MODEL_PATH, LABEL_ENCODER_PATH,
+                           MODEL_BUNDLE_PATH, TRAIN_MANIFEST_PATH, SELECTION_CACHE_DIR)
+
+N_ESTIMATORS = DEFAULT_SPEC["params"]["n_estimators"]
+# Trees are grown in chunks (warm start) so progress can be reported and training
+# cancelled between chunks; the fitted forest is identical to a single fit.
+TREES_PER_STEP = 10
+HISTORY_LENGTH = 50
 
 
-def load_dataset():
-    """Load dataset from dataset/*.npz (each file: X, y)."""
-    X_list, y_list = [], []
-    for npz_path in DATASET_DIR.glob("*.npz"):
-        data = np.load(npz_path, allow_pickle=True)
-        X_list.append(data["X"])
-        y_list.append(data["y"])
-    if not X_list:
+class _Cancelled(Exception):
+    pass
+
+
+def open_store(paths=DEFAULT_PATHS):
+    """The feature store with any new legacy dataset/*.npz rows imported.
+    Returns (store, names of npz files skipped because they were rewritten)."""
+    store = FeatureStore(paths.store)
+    _, skipped = store.import_npz(paths.dataset)
+    return store, skipped
+
+
+def load_dataset(paths=DEFAULT_PATHS):
+    """All stored samples as (X, y), or (None, None) when there are none."""
+    store, _ = open_store(paths)
+    if not len(store):
         return None, None
-    X = np.vstack(X_list)
-    y = np.concatenate(y_list)
-    return X, y
+    return store.load()
+
+
+def _dump_atomic(obj, path):
+    """Pickle to a temporary file and rename, so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def load_manifest(path=None):
+    path = Path(path or TRAIN_MANIFEST_PATH)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest, path):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _split(X, y):
+    """Train/test split, stratified when every class has at least two samples."""
+    _, counts = np.unique(y, return_counts=True)
+    stratify = y if counts.min() >= 2 else None
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=stratify)
+
+
+def _fit(spec, X, y, seed, report, cancelled, start, end):
+    """Fit the model spec, reporting progress from start to end. Forests grow in
+    TREES_PER_STEP chunks; other families are fitted in one step."""
+    clf = build_estimator(spec, seed)
+    if cancelled():
+        raise _Cancelled
+    if not is_forest(spec):
+        report(start, "fitting")
+        return clf.fit(X, y)
+    n_estimators = clf.n_estimators
+    clf.set_params(n_estimators=0, warm_start=True)
+    for n_trees in range(TREES_PER_STEP, n_estimators + TREES_PER_STEP, TREES_PER_STEP):
+        if cancelled():
+            raise _Cancelled
+        clf.n_estimators = min(n_trees, n_estimators)
+        clf.fit(X, y)
+        report(start + (end - start) * clf.n_estimators / n_estimators, "fitting")
+    return clf
+
 
+def _store_manifest(store, trees, updates, spec):
+    """Training manifest: which store, how far into it the model has read, and the model spec."""
+    return {"store_id": store.store_id, "consumed_seq": store.next_seq, "trees": trees,
+            "updates_since_rebuild": updates, "model_spec": spec}
 
-def train():
-    """Train Random Forest and save model + label encoder."""
+
+def _trained_on(store, paths):
+    """Bundle metadata recording how far into which store the model has read, and the
+    pickle of the last full rebuild it derives from (see predict._bundle_is_current)."""
+    return {"store_id": store.store_id, "consumed_seq": store.next_seq,
+            "source_pickle": file_fingerprint(paths.model)}
+
+
+def _bundle_consumed_seq(store, bundle_path):
+    """consumed_seq recorded in the saved bundle, or None if it was not trained on this store.
+    The bundle is the model being served, which after a rollback is older than the manifest."""
+    metadata = read_header(bundle_path)[0].get("metadata", {})
+    return metadata.get("consumed_seq") if metadata.get("store_id") == store.store_id else None
+
+
+def _full_rebuild(store, paths, report, cancelled, spec=DEFAULT_SPEC, select=False):
+    if len(store) < 10:
+        return False, "Not enough data. Collect samples for at least 2 gestures.", None
+    X, y = store.load()
+
+    classes = np.unique(y)
+    if len(classes) < 2:
+        return False, f"Only found one gesture ({classes[0]}). Collect samples for at least one more gesture (e.g., thumbs_down) to train a classifier.", None
+
+    le = LabelEncoder()
+    y_enc = le.fit_transform(y)
+
+    selection, fit_start = None, 0.1
+    if select:
+        selection = select_model(store, cache_dir=paths.selection_cache, progress=lambda f, stage: report(0.05 + 0.45 * f, stage),
+                                 should_cancel=cancelled)
+        if selection is None:
+            raise _Cancelled
+        spec, fit_start = selection.spec, 0.5
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y_enc, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_enc
+    )
+
+    clf = _fit(spec, X_train, y_train, RANDOM_STATE, report, cancelled, fit_start, 0.9)
+    report(0.9, "evaluating")
+    acc = clf.score(X_test, y_test)
+    if cancelled():
+        raise _Cancelled
+
+    report(0.95, "saving")
+    Path(paths.model).parent.mkdir(parents=True, exist_ok=True)
+    _dump_atomic(clf, paths.model)
+    _dump_atomic(le, paths.encoder)
+    compiled = compile_model(clf, le)
+    save_bundle(compiled, paths.bundle, accuracy=round(float(acc), 4), samples=int(len(X)),
+                mode="select" if select else "full", model_spec=spec["name"], **_trained_on(store, paths))
+    manifest = _store_manifest(store, getattr(compiled, "n_trees", 0), 0, spec)
+    message = f"Model trained! Accuracy: {acc:.2%}. Ready to detect!"
+    if selection is not None:
+        manifest["selection"] = {"chosen": selection.name, "floor_met": selection.floor_met,
+                                 "ranking": selection.ranking}
+        floor = "" if selection.floor_met else " (no candidate reached the accuracy floor)"
+        message = f"Selected {selection.name}{floor}. {message}"
+    return True, message, (manifest, len(X), len(X), acc)
+
+
+def _incremental_update(store, paths, manifest, new_X, new_y, report, cancelled):
+    current, _ = load_bundle(paths.bundle, verify=True)  # the new trees extend it
+    labels = sorted(set(current.labels) | set(new_y))
+    rng = np.random.default_rng(RANDOM_STATE + manifest["updates_since_rebuild"] + 1)
+    report(0.05, "replay")
+    replay_X, replay_y = store.sample(max(1, REPLAY_SAMPLES // len(labels)), rng, labels,
+                                      max_seq=manifest["consumed_seq"])
+    X = np.concatenate([new_X, replay_X])
+    y = np.concatenate([new_y, replay_y])
+
+    X_train, X_test, y_train, y_test = _split(X, y)
+    le = LabelEncoder()
+    y_train_enc = le.fit_transform(y_train)
+    spec = manifest.get("model_spec", DEFAULT_SPEC)
+    extra = dict(spec, params=dict(spec["params"], n_estimators=INCREMENTAL_TREES))
+    clf = _fit(extra, X_train, y_train_enc, RANDOM_STATE + current.n_trees, report, cancelled, 0.1, 0.85)
+    report(0.85, "merging")
+    merged = merge_forests([current, CompiledForest.from_sklearn(clf, le)])
+    acc = float(np.mean(merged.labels[merged.predict(X_test)] == y_test)) if len(X_test) else 1.0
+    if cancelled():
+        raise _Cancelled
+
+    report(0.95, "saving")
+    save_bundle(merged, paths.bundle, accuracy=round(acc, 4), samples=len(store), mode="incremental",
+                model_spec=spec["name"], **_trained_on(store, paths))
+    manifest = _store_manifest(store, merged.n_trees, manifest["updates_since_rebuild"] + 1, spec)
+    message = f"Model updated with {len(new_X)} new samples! Accuracy: {acc:.2%}. Ready to detect!"
+    return True, message, (manifest, len(store), len(new_X), acc)
+
+
+def train(progress=None, should_cancel=None, mode="auto", paths=DEFAULT_PATHS):
+    """Train the gesture classifier and save model + label encoder.
+
+    mode: "full" always rebuilds; "incremental" trains on rows added to the store
+    since the last run when the manifest allows it; "auto" does the same but also
+    rebuilds every FULL_REBUILD_EVERY updates; "select" runs model selection and
+    rebuilds with the chosen model. progress(fraction, stage) is called as
+    training advances; should_cancel() is polled between steps and stops training
+    without saving anything. Each run's wall time and dataset size go to the manifest history.
+    """
+    report = progress or (lambda fraction, stage: None)
+    cancelled = should_cancel or (lambda: False)
+    t0 = time.perf_counter()
     try:
-        X, y = load_dataset()
-        if X is None or len(X) < 10:
-            return False, "Not enough data. Collect samples for at least 2 gestures."
-        
-        classes = np.unique(y)
-        if len(classes) < 2:
-            return False, f"Only found one gesture ({classes[0]}). Collect samples for at least one more gesture (e.g., thumbs_down) to train a classifier."
-
-        le = LabelEncoder()
-        y_enc = le.fit_transform(y)
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y_enc, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_enc
-        )
-        
-        clf = RandomForestClassifier(n_estimators=100, random_state=RANDOM_STATE)
-        clf.fit(X_train, y_train)
-        acc = clf.score(X_test, y_test)
-        
-        DEFAULT_MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(DEFAULT_MODEL_PATH, "wb") as f:
-            pickle.dump(clf, f)
-        with open(LABEL_ENCODER_PATH, "wb") as f:
-            pickle.dump(le, f)
-            
-        return True, f"Model trained! Accuracy: {acc:.2%}. Ready to detect!"
+        report(0.0, "loading")
+        store, skipped = open_store(paths)
+        note = f" Skipped rewritten dataset files: {', '.join(skipped)}." if skipped else ""
+        manifest = load_manifest(paths.manifest)
+        history = manifest.get("history", []) if manifest else []
+        spec = manifest.get("model_spec", DEFAULT_SPEC) if manifest else DEFAULT_SPEC
+        reason = None
+        if mode == "select":
+            reason = "model selection requested"
+        elif mode == "full":
+            reason = "full rebuild requested"
+        elif manifest is None or "store_id" not in manifest or not Path(paths.bundle).exists():
+            reason = "no previous training run"
+        elif manifest["store_id"] != store.store_id:
+            reason = "feature store was recreated"
+        elif _bundle_consumed_seq(store, paths.bundle) is None:
+            reason = "saved model does not record which samples it was trained on"
+        elif not is_forest(spec):
+            reason = "model family does not support incremental updates"
+        elif mode == "auto" and manifest["updates_since_rebuild"] >= FULL_REBUILD_EVERY:
+            reason = "periodic full rebuild"
+
+        if reason is None:
+            manifest = dict(manifest, consumed_seq=_bundle_consumed_seq(store, paths.bundle))
+            new_X, new_y = store.load(min_seq=manifest["consumed_seq"])
+            if not len(new_X):
+                return True, UP_TO_DATE + note
+            if not set(new_y) <= set(load_bundle(paths.bundle, verify=False)[0].labels):
+                reason = "new gesture labels"
+        if reason is None:
+            ok, message, result = _incremental_update(store, paths, manifest, new_X, new_y, report, cancelled)
+            run_mode = "incremental"
+        else:
+            ok, message, result = _full_rebuild(store, paths, report, cancelled, spec, select=mode == "select")
+            run_mode = "select" if mode == "select" else "full"
+        if not ok:
+            return ok, message
+
+        new_manifest, samples, new_samples, acc = result
+        seconds = time.perf_counter() - t0
+        history.append({
+            "mode": run_mode,
+            "reason": reason,
+            "model": new_manifest["model_spec"]["name"],
+            "samples": int(samples),
+            "new_samples": int(new_samples),
+            "trees": new_manifest["trees"],
+            "seconds": round(seconds, 3),
+            "accuracy": round(float(acc), 4),
+            "finished": time.time(),
+        })
+        new_manifest["history"] = history[-HISTORY_LENGTH:]
+        _save_manifest(new_manifest, Path(paths.manifest))
+        report(1.0, "done")
+        return True, f"{message}{note} ({run_mode}, {samples} samples, {seconds:.1f}s)"
+    except _Cancelled:
+        return False, "Training cancelled."
     except Exception as e:
         return False, f"Training failed: {str(e)}"
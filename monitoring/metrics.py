@@ -0,0 +1,263 @@
+"""Low-overhead counters, gauges and fixed-bucket histograms in Prometheus text format."""
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond stages up to slow alert sends.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if registry is None:
+            registry = REGISTRY
+        if registry is not False:
+            registry.register(self)
+
+    def labels(self, **labels):
+        """Child metric for one combination of label values (cached)."""
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _series(self):
+        if self.labelnames:
+            return list(self._children.items())
+        return [((), self)]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        for key, child in self._series():
+            lines.extend(child._render_samples(self.name, self.labelnames, key))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    type_name = "counter"
+
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        super().__init__(name, help_text, labelnames, registry)
+        self.value = 0
+
+    def _new_child(self):
+        return Counter(self.name, self.help, registry=False)
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def _render_samples(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback at scrape time."""
+    type_name = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), registry=None):
+        super().__init__(name, help_text, labelnames, registry)
+        self.value = 0.0
+        self._fn = None
+
+    def _new_child(self):
+        return Gauge(self.name, self.help, registry=False)
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, fn):
+        """Report fn() instead of the stored value."""
+        self._fn = fn
+
+    def get(self):
+        return self._fn() if self._fn is not None else self.value
+
+    def _render_samples(self, name, labelnames, key):
+        return [f"{name}{_format_labels(labelnames, key)} {_format_value(self.get())}"]
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; observe() is one bisect and two additions."""
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        super().__init__(name, help_text, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self):
+        return Histogram(self.name, self.help, buckets=self.buckets, registry=False)
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """Context manager observing the elapsed seconds of its block."""
+        return _Timer(self)
+
+    def _render_samples(self, name, labelnames, key):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, c in zip(self.buckets + (float("inf"),), counts):
+            cumulative += c
+            le = ("le", _format_value(bound))
+            lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class RateMeter:
+    """Smoothed events-per-second from the intervals between tick() calls."""
+
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.rate = 0.0
+        self._last = None
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self._last is not None and now > self._last:
+            instant = 1.0 / (now - self._last)
+            if self.rate:
+                self.rate += self.smoothing * (instant - self.rate)
+            else:
+                self.rate = instant
+        self._last = now
+        return self.rate
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        """All registered metrics in Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Pipeline
+FRAMES_CAPTURED = Counter("gesture_frames_captured_total", "Frames read from the camera.")
+FRAMES_DROPPED = Counter("gesture_frames_dropped_total", "Captured frames discarded before inference.")
+FRAMES_PROCESSED = Counter("gesture_frames_processed_total", "Frames run through hand detection.")
+STAGE_SECONDS = Histogram("gesture_stage_seconds", "Time spent per pipeline stage.", ["stage"])
+HANDS_PER_FRAME = Histogram("gesture_hands_per_frame", "Hands detected per processed frame.",
+                            buckets=(0, 1, 2, 3, 4, 6, 8))
+INFERENCE_FPS = Gauge("gesture_inference_fps", "Smoothed frames per second through inference.")
+FRAMES_SKIPPED = Counter("gesture_frames_skipped_total", "Frames that reused the last result (idle scene).")
+INFERENCE_DUTY_CYCLE = Gauge("gesture_inference_duty_cycle", "Fraction of frames that ran inference.")
+
+# Alerts
+ALERTS_TRIGGERED = Counter("gesture_alerts_triggered_total", "Distress alerts triggered.")
+ALERT_SEND_SECONDS = Histogram("gesture_alert_send_seconds", "Time of one alert send attempt per channel.",
+                               ["channel"])
+ALERT_DELIVERY_SECONDS = Histogram("gesture_alert_delivery_seconds", "Time from trigger to delivery per channel.",
+                                   ["channel"])
+ALERT_SEND_FAILURES = Counter("gesture_alert_send_failures_total", "Failed alert send attempts.", ["channel"])
+ALERTS_COALESCED = Counter("gesture_alerts_coalesced_total", "Alerts merged into another alert's delivery.")
+ALERTS_DROPPED = Counter("gesture_alerts_dropped_total", "Alerts dropped because the dispatch queue was full.")
+ALERT_QUEUE_DEPTH = Gauge("gesture_alert_queue_depth", "Alerts waiting for the dispatch worker.", ["dispatcher"])
+EVIDENCE_FRAMES_DROPPED = Counter("gesture_evidence_frames_dropped_total",
+                                  "Frames not buffered as evidence because the encode backlog was full.")
+
+# Web
+STREAM_CLIENTS = Gauge("gesture_stream_clients", "Connected /video_feed viewers.")
+HTTP_REQUEST_SECONDS = Histogram("gesture_http_request_seconds", "Flask request handling time.", ["endpoint"])
+
+
+def start_metrics_server(port, host="0.0.0.0", registry=REGISTRY):
+    """Serve registry.render() at /metrics on a daemon thread (for processes without Flask)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -16,8 +16,8 @@ sys.path.insert(0, str(sys_path))
 from config import DATASET_DIR, GESTURE_EMOJI_MAP
 from detection.camera import get_camera, frame_to_rgb
 from detection.landmarks import HandLandmarker
-from data.collect import save_samples
 from data.preprocess import landmarks_to_features
+from model.feature_store import get_feature_store
 
 def main():
     cap = get_camera()
@@ -48,7 +48,8 @@ def main():
         key = cv2.waitKey(1) & 0xFF
         if key == ord(" "):
             if buffer:
-                n = save_samples(gesture_name, buffer)
+                features = np.stack([landmarks_to_features(lms) for lms in buffer])
+                n = get_feature_store().append(features, gesture_name)
                 print(f"Saved {n} samples. Total buffer cleared.")
             buffer.clear()
         elif key == ord("q"):
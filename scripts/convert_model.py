@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Convert the pickled classifier + label encoder into a memory-mapped model bundle.
+Run: python scripts/convert_model.py [--model gesture_classifier.pkl] [--encoder label_encoder.pkl] [-o out.gmb]
+The bundle is checked against the pickled model on random inputs before the command returns.
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DEFAULT_MODEL_PATH, LABEL_ENCODER_PATH, MODEL_BUNDLE_PATH
+from model.bundle import file_fingerprint, save_bundle, load_bundle
+from model.compiled import CompiledModel
+from model.forest import CompiledForest
+from model.predict import compile_model, load_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH))
+    parser.add_argument("--encoder", default=str(LABEL_ENCODER_PATH))
+    parser.add_argument("-o", "--output", default=str(MODEL_BUNDLE_PATH))
+    args = parser.parse_args()
+
+    model, encoder = load_model(args.model, args.encoder, compiled=False)
+    if model is None:
+        print(f"No model found at {args.model}")
+        sys.exit(2)
+    if encoder is None:
+        print(f"Warning: no label encoder at {args.encoder}; using the model's class labels")
+    compiled = compile_model(model, encoder)
+    if not isinstance(compiled, CompiledModel):
+        print(f"Cannot compile {type(model).__name__} into a bundle")
+        sys.exit(2)
+    header = save_bundle(compiled, args.output, source=Path(args.model).name,
+                         source_pickle=file_fingerprint(args.model))
+
+    t0 = time.perf_counter()
+    loaded, _ = load_bundle(args.output, verify=True)
+    load_ms = (time.perf_counter() - t0) * 1000
+    X = np.random.default_rng(0).random((1000, compiled.n_features)).astype(np.float32)
+    # Forests match sklearn bit for bit; folded linear/MLP weights only up to rounding.
+    expected = model.predict_proba(X)
+    if isinstance(compiled, CompiledForest):
+        matches = np.array_equal(loaded.predict_proba(X), expected)
+    else:
+        matches = np.allclose(loaded.predict_proba(X), expected, rtol=1e-9, atol=1e-12)
+    if not matches:
+        print("Bundle predictions differ from the pickled model")
+        sys.exit(1)
+
+    size_kb = Path(args.output).stat().st_size / 1024
+    if isinstance(compiled, CompiledForest):
+        summary = f"{compiled.n_trees} trees, {len(compiled.feature)} nodes"
+    else:
+        summary = f"{header['model_type']} model, {sum(a.size for a in compiled.arrays().values())} weights"
+    print(f"Wrote {args.output}: {summary}, "
+          f"{len(header['labels'])} labels, {size_kb:.0f} KiB (load {load_ms:.2f} ms, predictions match)")
+
+
+if __name__ == "__main__":
+    main()
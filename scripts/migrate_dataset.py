@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Import dataset/*.npz sample files into the append-only feature store.
+Run: python scripts/migrate_dataset.py [--dataset dataset/] [--store dataset/store] [--compact]
+Safe to run repeatedly: files already imported are skipped and files that grew since
+contribute only their new rows. Afterwards the row and label counts of the npz files
+and the store are compared. The npz files are left in place; delete them once the
+store is verified.
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import DATASET_DIR, FEATURE_STORE_DIR
+from model.feature_store import FeatureStore
+
+
+def npz_label_counts(dataset_dir):
+    counts = {}
+    for path in sorted(Path(dataset_dir).glob("*.npz")):
+        labels, n = np.unique(np.load(path, allow_pickle=True)["y"].astype(str), return_counts=True)
+        for label, c in zip(labels, n):
+            counts[label] = counts.get(label, 0) + int(c)
+    return dict(sorted(counts.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default=str(DATASET_DIR), help="Directory with legacy .npz files")
+    parser.add_argument("--store", default=str(FEATURE_STORE_DIR), help="Feature store directory")
+    parser.add_argument("--compact", action="store_true", help="Merge small chunks afterwards")
+    args = parser.parse_args()
+
+    store = FeatureStore(args.store)
+    imported, skipped = store.import_npz(args.dataset)
+    print(f"Imported {imported} rows into {args.store} ({len(store)} rows in {len(store.chunks)} chunks)")
+    for name in skipped:
+        print(f"Skipped {name}: rewritten since it was imported (only appended rows can be imported)")
+    if args.compact:
+        removed = store.compact()
+        print(f"Compaction removed {removed} chunks ({len(store.chunks)} left)")
+
+    expected = npz_label_counts(args.dataset)
+    actual = store.label_counts()
+    mismatched = {label: (n, actual.get(label, 0)) for label, n in expected.items() if actual.get(label, 0) < n}
+    print(f"{'label':<16} {'npz':>8} {'store':>8}")
+    for label in sorted(set(expected) | set(actual)):
+        print(f"{label:<16} {expected.get(label, 0):>8} {actual.get(label, 0):>8}")
+    if mismatched:
+        print(f"Store is missing rows for: {', '.join(mismatched)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
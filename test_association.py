@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from detection.association import HandTracker, associate_hands, association_costs
+from detection.verification import VerificationEngine
+
+
+def test_overlapping_boxes_go_to_the_best_fit():
+    # Person 0 is wide and listed first; the wrist sits near the centre of person 1.
+    boxes = np.array([[0, 0, 400, 400], [250, 100, 350, 300]])
+    wrists = np.array([[300, 200], [60, 80]])
+    assert associate_hands(wrists, boxes).tolist() == [1, 0]
+
+
+def test_each_person_gets_at_most_two_hands():
+    boxes = np.array([[0, 0, 100, 200], [100, 0, 200, 200]])
+    wrists = np.array([[40, 100], [60, 100], [50, 120], [900, 900]])
+    owner = associate_hands(wrists, boxes)
+    assert owner[3] == -1
+    assert np.bincount(owner[owner >= 0], minlength=2).max() <= 2
+    # Three hands inside person 0 only: one of them cannot be theirs.
+    assert sorted(owner[:3].tolist()) == [-1, 0, 0]
+    assert associate_hands(np.zeros((0, 2)), boxes).shape == (0,)
+    assert associate_hands(wrists, np.zeros((0, 4))).tolist() == [-1] * 4
+
+
+def test_costs_scale_to_crowds():
+    rng = np.random.default_rng(0)
+    centres = rng.uniform(0, 1920, size=(60, 2))
+    boxes = np.hstack([centres - (40, 120), centres + (40, 120)])
+    wrists = centres[:50] + rng.normal(scale=10, size=(50, 2))
+    assert association_costs(wrists, boxes).shape == (50, 60)
+    owner = associate_hands(wrists, boxes)
+    assert (owner == np.arange(50)).mean() > 0.9
+
+
+def test_hand_tracks_survive_person_id_swaps():
+    tracker = HandTracker(max_distance=0.1, max_missing=2)
+    ids = []
+    for t in range(10):
+        wrists = [[0.2 + 0.01 * t, 0.5], [0.7 - 0.01 * t, 0.5]]
+        # The person detector swaps its IDs halfway through.
+        person_ids = [7, 8] if t < 5 else [8, 7]
+        ids.append([track.id for track in tracker.update(wrists, person_ids)])
+    assert all(frame == ids[0] for frame in ids)
+
+    tracker.update([[0.2, 0.5]], [-1])  # second hand gone, first leaves every box
+    first = tracker.tracks[0]
+    assert first.person_id == 8  # remembered through a brief gap
+    for _ in range(3):
+        tracker.update([[0.2, 0.5]], [-1])
+    assert first.person_id == -1 and tracker.stats()["tracks"] == 1
+
+
+def test_verification_per_hand_track_names_the_owner():
+    verifier = VerificationEngine(threshold_count=2, time_window=20, min_confidence=0.5)
+    assert verifier.update(3, True, 0.9, owner_id=8) == (False, None)
+    ready, message = verifier.update(3, True, 0.9, owner_id=7)
+    assert ready and "Person ID 7 (hand 3)" in message
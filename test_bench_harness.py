@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+from benchmarks.harness import summarize, compare, synthetic_hands
+
+
+def test_summarize_percentiles():
+    stats = summarize(np.full(100, 0.002))
+    assert stats["n"] == 100
+    assert stats["p50_ms"] == stats["p99_ms"] == 2.0
+    assert stats["throughput_per_s"] == 500.0
+
+
+def test_compare_flags_only_regressions():
+    baseline = {"results": {"a": {"p50_ms": 1.0, "p95_ms": 2.0},
+                            "b": {"p50_ms": 1.0, "p95_ms": 2.0},
+                            "c": {"skipped": "no model"}}}
+    current = {"a": {"p50_ms": 1.05, "p95_ms": 2.1},
+               "b": {"p50_ms": 1.5, "p95_ms": 1.0},
+               "c": {"p50_ms": 9.0, "p95_ms": 9.0}}
+    regressions = compare(current, baseline, tolerance=0.15)
+    assert [(stage, metric) for stage, metric, *_ in regressions] == [("b", "p50_ms")]
+
+
+def test_synthetic_hands_are_normalized():
+    hands = synthetic_hands(50)
+    assert hands.shape == (50, 21, 3) and hands.dtype == np.float32
+    assert hands[..., :2].min() > -0.1 and hands[..., :2].max() < 1.1
@@ -0,0 +1,153 @@
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pytest
+
+from detection import broadcast
+from detection.broadcast import FrameBroadcaster, AdaptiveQuality
+
+
+class FakePipeline:
+    """Counts read_frame calls; each call yields a distinct small frame."""
+
+    def __init__(self, period=0.005):
+        self.period = period
+        self.reads = 0
+
+    def read_frame(self):
+        time.sleep(self.period)
+        self.reads += 1
+        frame = np.full((32, 32, 3), self.reads % 255, dtype=np.uint8)
+        return frame, "Peace", 0.9, "✌️"
+
+
+def test_many_subscribers_share_one_producer():
+    source = FakePipeline()
+    broadcaster = FrameBroadcaster(source, idle_timeout=0.1)
+    seen = {}
+
+    def viewer(name, n):
+        with broadcaster.subscribe() as sub:
+            seqs = []
+            for packet, _ in sub:
+                seqs.append(packet.seq)
+                if len(seqs) == n:
+                    break
+            seen[name] = seqs
+
+    threads = [threading.Thread(target=viewer, args=(i, 10)) for i in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    broadcaster.stop()
+
+    assert len(seen) == 5
+    for seqs in seen.values():
+        assert seqs == sorted(set(seqs))
+    # Five viewers, but every frame was read and encoded once.
+    assert broadcaster.frames_encoded == source.reads
+    assert source.reads < 5 * 10
+    assert broadcaster.latest().label == "Peace"
+
+
+def test_producer_stops_when_idle():
+    source = FakePipeline()
+    broadcaster = FrameBroadcaster(source, idle_timeout=0.05)
+    with broadcaster.subscribe() as sub:
+        next(sub)
+    time.sleep(0.3)
+    reads = source.reads
+    time.sleep(0.1)
+    assert source.reads == reads
+    assert broadcaster.subscriber_count == 0
+
+
+def test_variants_are_encoded_once_per_level():
+    source = FakePipeline()
+    broadcaster = FrameBroadcaster(source, idle_timeout=0.1)
+    with broadcaster.subscribe(level=2) as sub:
+        packet, jpeg = next(sub)
+    broadcaster.stop()
+    assert jpeg is broadcaster.encoded(packet, 2)
+    assert set(packet.variants) == {0, 2}
+
+
+def test_adaptive_quality_steps_down_and_back_up():
+    quality = AdaptiveQuality(4, upgrade_after=5, smoothing=1.0)
+    budget = 1.0 / 30
+    assert quality.record(budget * 2, budget) == 1
+    assert quality.record(budget * 2, budget) == 2
+    for _ in range(5):
+        quality.record(budget * 0.1, budget)
+    assert quality.level == 1
+
+    pinned = AdaptiveQuality(4, level=3, smoothing=1.0)
+    assert pinned.record(budget * 5, budget) == 3
+
+
+def test_max_fps_paces_viewer():
+    source = FakePipeline(period=0.002)
+    broadcaster = FrameBroadcaster(source, idle_timeout=0.1)
+    with broadcaster.subscribe(max_fps=20) as sub:
+        start = time.time()
+        for _ in range(5):
+            next(sub)
+        elapsed = time.time() - start
+    broadcaster.stop()
+    assert elapsed >= 4 / 20 * 0.9
+    assert sub.skipped > 0
+
+
+def test_subscription_ends_when_broadcaster_stops():
+    broadcaster = FrameBroadcaster(FakePipeline(), idle_timeout=0.1)
+    received = []
+
+    def viewer():
+        with broadcaster.subscribe() as sub:
+            for packet, _ in sub:
+                received.append(packet.seq)
+
+    thread = threading.Thread(target=viewer)
+    thread.start()
+    time.sleep(0.1)
+    broadcaster.stop()
+    thread.join(1.0)
+    assert not thread.is_alive() and received
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_subscription_ends_when_producer_thread_dies(monkeypatch):
+    producers = []
+
+    def broken_encoder(*args, **kwargs):
+        producers.append(threading.current_thread())
+        raise RuntimeError("encoder crashed")
+
+    monkeypatch.setattr(broadcast, "encode_level", broken_encoder)
+    broadcaster = FrameBroadcaster(FakePipeline(), idle_timeout=0.1)
+    with broadcaster.subscribe() as sub:
+        sub.poll_timeout = 5.0
+        start = time.time()
+        assert list(sub) == []
+    assert time.time() - start < 1.0 and not broadcaster.running
+    producers[0].join(1.0)  # its uncaught exception is reported before the test ends
+
+
+def test_read_errors_are_retried():
+    class FlakySource(FakePipeline):
+        def read_frame(self):
+            if self.reads < 2:
+                self.reads += 1
+                raise OSError("camera unplugged")
+            return super().read_frame()
+
+    broadcaster = FrameBroadcaster(FlakySource(), idle_timeout=0.1, error_retry=0.01)
+    with broadcaster.subscribe() as sub:
+        packet, _ = next(sub)
+    broadcaster.stop()
+    assert packet.label == "Peace"
@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from model.bundle import BundleError, file_fingerprint, load_bundle, read_header, save_bundle
+from model.forest import CompiledForest
+from model.predict import load_model, predict_gesture
+
+ROOT = Path(__file__).resolve().parent
+
+
+def _forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 63))
+    y = np.array(["fist", "peace", "wave"])[(X[:, 0] > 0).astype(int) + (X[:, 1] > 0.5)]
+    encoder = LabelEncoder()
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, encoder.fit_transform(y))
+    return model, encoder, rng.normal(size=(100, 63))
+
+
+def test_round_trip_is_exact_and_memory_mapped(tmp_path):
+    model, encoder, X = _forest()
+    path = tmp_path / "m.gmb"
+    save_bundle(CompiledForest.from_sklearn(model, encoder), path, accuracy=0.9)
+    forest, labels = load_bundle(path, verify=True)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert not forest.threshold.flags.owndata
+    assert list(labels.classes_) == list(encoder.classes_)
+    assert list(labels.inverse_transform([2, 0])) == list(encoder.inverse_transform([2, 0]))
+    header, _ = read_header(path)
+    assert header["feature_schema"]["n_features"] == 63
+    assert header["metadata"] == {"accuracy": 0.9}
+    assert predict_gesture(forest, labels, X[0]) == predict_gesture(model, encoder, X[0])
+
+
+def test_rejects_corrupt_and_foreign_files(tmp_path):
+    model, encoder, _ = _forest()
+    path = tmp_path / "m.gmb"
+    save_bundle(CompiledForest.from_sklearn(model, encoder), path)
+    raw = bytearray(path.read_bytes())
+    raw[-1] ^= 0xFF
+    path.write_bytes(bytes(raw))
+    with pytest.raises(BundleError, match="checksum"):
+        load_bundle(path, verify=True)
+    load_bundle(path)  # only the header is checked by default
+    path.write_bytes(bytes(raw[:-100]))
+    with pytest.raises(BundleError, match="truncated"):
+        load_bundle(path)
+    (tmp_path / "x.gmb").write_bytes(b"not a bundle at all")
+    with pytest.raises(BundleError, match="not a model bundle"):
+        load_bundle(tmp_path / "x.gmb")
+
+
+def test_load_model_prefers_current_bundle(tmp_path):
+    model, encoder, X = _forest()
+    bundle = tmp_path / "m.gmb"
+    save_bundle(CompiledForest.from_sklearn(model, encoder), bundle)
+    forest, _ = load_model(bundle)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    forest, _ = load_model(bundle_path=bundle)
+    assert hasattr(forest, "bundle_header")
+
+
+def test_bundle_loading_does_not_import_sklearn(tmp_path):
+    model, encoder, _ = _forest()
+    bundle = tmp_path / "m.gmb"
+    save_bundle(CompiledForest.from_sklearn(model, encoder), bundle)
+    code = ("import sys; from model.predict import load_model; "
+            f"m, e = load_model({str(bundle)!r}); "
+            "assert 'sklearn' not in sys.modules; print(m.n_trees)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                         env=dict(os.environ, PYTHONPATH=str(ROOT)))
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "10"
+
+
+def _default_pickles(tmp_path, monkeypatch, model, encoder):
+    """Pickle model and encoder and make them load_model's defaults; returns the model path."""
+    import pickle
+    import model.predict as predict_module
+    for name, obj in (("m.pkl", model), ("e.pkl", encoder)):
+        with open(tmp_path / name, "wb") as f:
+            pickle.dump(obj, f)
+    monkeypatch.setattr(predict_module, "DEFAULT_MODEL_PATH", tmp_path / "m.pkl")
+    monkeypatch.setattr(predict_module, "LABEL_ENCODER_PATH", tmp_path / "e.pkl")
+    return tmp_path / "m.pkl"
+
+
+def test_bundle_is_current_while_its_source_pickle_is_unchanged(tmp_path, monkeypatch):
+    model, encoder, X = _forest()
+    pickle_path = _default_pickles(tmp_path, monkeypatch, model, encoder)
+    bundle = tmp_path / "m.gmb"
+    save_bundle(CompiledForest.from_sklearn(model, encoder), bundle, source_pickle=file_fingerprint(pickle_path))
+    os.utime(pickle_path, (bundle.stat().st_mtime + 60,) * 2)  # a checkout can leave the pickle newer
+    assert hasattr(load_model(bundle_path=bundle)[0], "bundle_header")
+
+    retrained = RandomForestClassifier(n_estimators=3, random_state=1).fit(X, model.predict(X))
+    _default_pickles(tmp_path, monkeypatch, retrained, encoder)
+    forest, _ = load_model(bundle_path=bundle)
+    assert not hasattr(forest, "bundle_header") and forest.n_trees == 3
+
+
+def test_load_model_falls_back_to_pickles_when_bundle_is_broken(tmp_path, monkeypatch, capsys):
+    model, encoder, X = _forest()
+    _default_pickles(tmp_path, monkeypatch, model, encoder)
+    bundle = tmp_path / "m.gmb"
+    save_bundle(CompiledForest.from_sklearn(model, encoder), bundle)
+    bundle.write_bytes(bundle.read_bytes()[:-100])
+
+    for loaded in (load_model(bundle_path=bundle), load_model(bundle)):
+        forest, _ = loaded
+        assert not hasattr(forest, "bundle_header")
+        assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert capsys.readouterr().out.count("ERROR: Failed to load model bundle") == 2
@@ -0,0 +1,73 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+from detection.capture import FrameRingBuffer, CaptureThread
+
+
+class FakeCapture:
+    """Stands in for cv2.VideoCapture: returns numbered frames at a fixed rate."""
+
+    def __init__(self, n_frames=50, period=0.001):
+        self.n_frames = n_frames
+        self.period = period
+        self.count = 0
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if self.count >= self.n_frames:
+            return False, None
+        time.sleep(self.period)
+        self.count += 1
+        return True, np.full((4, 4, 3), self.count, dtype=np.uint8)
+
+    def release(self):
+        self.opened = False
+
+
+def test_ring_buffer_drops_oldest():
+    buf = FrameRingBuffer(capacity=2)
+    for i in range(5):
+        buf.put(i)
+    assert len(buf) == 2
+    assert buf.dropped == 3
+    seq, _, frame = buf.get_latest(timeout=0)
+    assert (seq, frame) == (5, 4)
+    # The older buffered frame was never consumed, so it counts as dropped too.
+    assert buf.dropped == 4
+    assert buf.get_latest(timeout=0) is None
+
+
+def test_ring_buffer_close_wakes_consumer():
+    buf = FrameRingBuffer()
+    buf.close()
+    assert buf.get_latest(timeout=1.0) is None
+
+
+def test_capture_thread_counters():
+    cap = FakeCapture(n_frames=40)
+    capture = CaptureThread(cap, FrameRingBuffer(capacity=2)).start()
+    processed = 0
+    last_seq = 0
+    deadline = time.time() + 5
+    while cap.count < cap.n_frames and time.time() < deadline:
+        item = capture.buffer.get_latest(timeout=0.5)
+        if item is None:
+            continue
+        seq, _, frame = item
+        assert seq > last_seq
+        assert int(frame[0, 0, 0]) == seq
+        last_seq = seq
+        processed += 1
+        time.sleep(0.004)  # slower consumer than producer
+    capture.stop()
+    item = capture.buffer.get_latest(timeout=0)
+    if item is not None:
+        processed += 1
+    assert capture.captured == 40
+    assert processed + capture.buffer.dropped == capture.captured
@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+
+from detection.cascade import PersonHandCascade, crop_box
+from detection.landmarks import HandBatch, RIGHT
+
+
+class BlobLandmarker:
+    """Finds white squares in the image and reports each as a hand of 21 landmarks around its centre."""
+
+    def __init__(self):
+        self.calls = []
+
+    def process_batch(self, image):
+        self.calls.append(image.shape)
+        mask = (image.min(axis=2) > 200).astype(np.uint8)
+        n, _, _, centroids = cv2.connectedComponentsWithStats(mask)
+        h, w = image.shape[:2]
+        hands = np.zeros((n - 1, 21, 3), dtype=np.float32)
+        offsets = np.linspace(-2, 2, 21)
+        for i, (cx, cy) in enumerate(centroids[1:]):
+            hands[i, :, 0] = (cx + offsets) / w
+            hands[i, :, 1] = (cy - offsets) / h
+            hands[i, :, 2] = 0.01
+        return HandBatch(hands, np.full(n - 1, RIGHT, dtype=np.int8), np.full(n - 1, 0.9, dtype=np.float32))
+
+    def close(self):
+        pass
+
+
+def _scene(hand_centres, size=(480, 640)):
+    frame = np.full(size + (3,), 40, dtype=np.uint8)
+    for x, y in hand_centres:
+        frame[y - 6:y + 6, x - 6:x + 6] = 255
+    return frame
+
+
+def test_no_persons_skips_landmarking():
+    landmarker = BlobLandmarker()
+    cascade = PersonHandCascade(landmarker=landmarker)
+    batch, person_ids = cascade.process(_scene([(100, 100)]), [])
+    assert len(batch) == 0 and len(person_ids) == 0
+    assert landmarker.calls == [] and cascade.stats()["skipped"] == 1
+
+
+def test_hands_are_mapped_back_and_tagged_with_their_person():
+    # Person 7 has two hands, person 9 one; a hand outside every box is never seen.
+    hands = [(120, 150), (200, 160), (470, 300), (620, 20)]
+    persons = [{"id": 7, "box": np.array([80, 100, 260, 470])}, {"id": 9, "box": np.array([400, 120, 560, 470])}]
+    landmarker = BlobLandmarker()
+    cascade = PersonHandCascade(tile=256, padding=0.1, max_persons=2, landmarker=landmarker)
+    batch, person_ids = cascade.process(_scene(hands), persons)
+
+    assert landmarker.calls == [(256, 512, 3)]  # one mosaic pass for both persons
+    centres = batch.landmarks[:, 10, :2] * (640, 480)
+    found = sorted(zip(person_ids.tolist(), centres.round().astype(int).tolist()))
+    expected = [(7, [120, 150]), (7, [200, 160]), (9, [470, 300])]
+    assert [pid for pid, _ in found] == [pid for pid, _ in expected]
+    for (_, got), (_, want) in zip(found, expected):
+        assert np.abs(np.array(got) - want).max() <= 2
+
+
+def test_crowds_take_one_pass_per_group():
+    persons = [{"id": i, "box": np.array([20 + 60 * i, 100, 70 + 60 * i, 400])} for i in range(10)]
+    hands = [(45 + 60 * i, 200) for i in range(10)]
+    landmarker = BlobLandmarker()
+    cascade = PersonHandCascade(tile=128, max_persons=4, landmarker=landmarker)
+    batch, person_ids = cascade.process(_scene(hands), persons)
+    assert len(landmarker.calls) == 3
+    assert sorted(person_ids.tolist()) == list(range(10))
+    assert np.abs(batch.landmarks[np.argsort(person_ids), 10, 0] * 640 - [h[0] for h in hands]).max() <= 2
+
+
+def test_crop_box_is_padded_and_clamped():
+    assert crop_box([10, 20, 110, 220], 640, 480, padding=0.1) == (0, 0, 120, 240)
+    assert crop_box([600, 400, 640, 480], 640, 480, padding=0.5) == (580, 360, 640, 480)
+
+
+def test_hand_in_overlapping_crops_is_kept_once_for_the_best_fitting_person():
+    # The hand at (300, 200) is inside person 2's box and in the padded crop of person 1.
+    persons = [{"id": 1, "box": np.array([100, 100, 290, 470])}, {"id": 2, "box": np.array([260, 100, 420, 470])}]
+    cascade = PersonHandCascade(tile=256, padding=0.2, max_persons=2, landmarker=BlobLandmarker())
+    batch, person_ids = cascade.process(_scene([(300, 200)]), persons)
+    assert person_ids.tolist() == [2] and len(batch) == 1
+    assert cascade.stats()["duplicates"] == 1
+
+
+def test_each_group_keeps_its_own_landmarker_in_person_id_order(monkeypatch):
+    import detection.cascade as cascade_module
+    created = []
+
+    def make_landmarker(**kwargs):
+        created.append(BlobLandmarker())
+        return created[-1]
+
+    monkeypatch.setattr(cascade_module, "HandLandmarker", make_landmarker)
+    cascade = PersonHandCascade(tile=128, max_persons=1)
+    persons = [{"id": i, "box": np.array([20 + 200 * k, 100, 170 + 200 * k, 400])} for k, i in enumerate((5, 2, 9))]
+    hands = [(95 + 200 * k, 200) for k in range(3)]
+    for _ in range(2):
+        _, person_ids = cascade.process(_scene(hands), persons)
+    assert len(created) == 3 and all(len(landmarker.calls) == 2 for landmarker in created)
+    assert person_ids.tolist() == [2, 5, 9]  # group 0 is always the lowest ID
+    cascade.close()
@@ -0,0 +1,70 @@
+import pickle
+import sys
+import warnings
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from model.bundle import load_bundle, save_bundle
+from model.compiled import CompiledLinear, CompiledMLP
+from model.predict import compile_model, predict_gesture, predict_gesture_batch
+
+ESTIMATORS = {
+    "linear": lambda: LogisticRegression(max_iter=1000),
+    "scaled_linear": lambda: make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+    "mlp": lambda: MLPClassifier(hidden_layer_sizes=(32,), max_iter=300, random_state=0),
+    "scaled_mlp": lambda: make_pipeline(StandardScaler(), MLPClassifier(hidden_layer_sizes=(32, 16),
+                                                                         activation="tanh", max_iter=300,
+                                                                         random_state=0)),
+}
+
+
+def _fit(name, labels=("fist", "peace", "wave")):
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=2.0, scale=3.0, size=(400, 63))
+    y = np.array(labels)[(X[:, 0] > 2).astype(int) + (X[:, 1] > 3) * (len(labels) - 2)]
+    encoder = LabelEncoder()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # MLP convergence
+        model = ESTIMATORS[name]().fit(X, encoder.fit_transform(y))
+    return model, encoder, rng.normal(loc=2.0, scale=3.0, size=(200, 63))
+
+
+@pytest.mark.parametrize("name", list(ESTIMATORS))
+def test_probabilities_match_sklearn(name):
+    model, encoder, X = _fit(name)
+    compiled = compile_model(model, encoder)
+    assert isinstance(compiled, CompiledMLP if "mlp" in name else CompiledLinear)
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=1e-9, atol=1e-12)
+    assert np.array_equal(compiled.predict(X), model.predict(X))
+    assert list(compiled.labels) == list(encoder.classes_)
+    # Selection workers send compiled models back to the parent process.
+    assert np.array_equal(pickle.loads(pickle.dumps(compiled)).predict_proba(X), compiled.predict_proba(X))
+
+
+def test_binary_models_get_two_columns():
+    model, encoder, X = _fit("scaled_linear", labels=("fist", "peace"))
+    compiled = compile_model(model, encoder)
+    assert compiled.predict_proba(X).shape == (len(X), 2)
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("name", ["scaled_linear", "scaled_mlp"])
+def test_bundle_round_trip(tmp_path, name):
+    model, encoder, X = _fit(name)
+    compiled = compile_model(model, encoder)
+    save_bundle(compiled, tmp_path / "m.gmb")
+    loaded, labels = load_bundle(tmp_path / "m.gmb")
+    assert type(loaded) is type(compiled)
+    assert np.array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
+    assert list(labels.classes_) == list(encoder.classes_)
+    batch = predict_gesture_batch(loaded, labels, X)
+    singles = [predict_gesture(compiled, encoder, x) for x in X]
+    assert [(label, emoji) for label, _, emoji in batch] == [(label, emoji) for label, _, emoji in singles]
+    np.testing.assert_allclose([conf for _, conf, _ in batch], [conf for _, conf, _ in singles], rtol=1e-12)
@@ -0,0 +1,238 @@
+import sys
+import json
+import socketserver
+import threading
+import time
+from email import message_from_bytes, policy
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+
+from alerts.dispatch import AlertDispatcher, SMTPChannel, WebhookChannel
+from alerts.notifier import AlertEngine
+
+
+class LocalSMTP(socketserver.ThreadingTCPServer):
+    """Minimal SMTP stand-in: accepts AUTH PLAIN and records every message."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.drop_after = None  # close each connection after this many messages
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        sent = 0
+        self.reply("220 localhost ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.wfile.write(b"250-localhost\r\n250 AUTH PLAIN\r\n")
+            elif command.startswith("AUTH"):
+                self.reply("235 ok")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 ok")
+            elif command == "DATA":
+                self.reply("354 go on")
+                data = b""
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data += chunk
+                server.messages.append(message_from_bytes(data, policy=policy.default))
+                self.reply("250 queued")
+                sent += 1
+                if server.drop_after is not None and sent >= server.drop_after:
+                    return
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+class FlakyChannel:
+    name = "flaky"
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, alert):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("unreachable")
+        self.sent.append(alert)
+
+    def close(self):
+        pass
+
+
+class SlowChannel(FlakyChannel):
+    name = "slow"
+
+    def __init__(self, delay):
+        super().__init__(0)
+        self.delay = delay
+
+    def send(self, alert):
+        time.sleep(self.delay)
+        super().send(alert)
+
+
+def smtp_channel(server):
+    return SMTPChannel("monitor@example.com", "guard@example.com", "secret", "127.0.0.1", server.port,
+                       use_ssl=False)
+
+
+def test_trigger_returns_immediately_and_smtp_connection_is_reused():
+    server = LocalSMTP()
+    engine = AlertEngine(channels=[SlowChannel(0.3), smtp_channel(server)], coalesce_seconds=0)
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    t0 = time.perf_counter()
+    engine.trigger(frame, "ALERT: Person ID 1 detected performing distress signal 3 times!")
+    assert time.perf_counter() - t0 < 0.1  # slow channels do not hold up the frame loop
+    frame[:] = 255  # the caller keeps drawing on its frame
+    assert engine.dispatcher.flush(5)
+    engine.trigger(frame, "ALERT: Person ID 2 detected performing distress signal 3 times!")
+    engine.close()
+    server.close()
+
+    assert len(server.messages) == 2 and server.connections == 1
+    first = server.messages[0]
+    assert first["Subject"] == "🆘 DISTRESS SIGNAL DETECTED"
+    parts = first.get_payload()
+    assert "Person ID 1" in parts[0].get_payload(decode=True).decode()
+    jpeg = parts[1].get_payload(decode=True)
+    assert jpeg[:2] == b"\xff\xd8"
+    assert cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR).max() < 10  # copy taken at trigger
+
+
+def test_smtp_reconnects_when_server_closed_idle_connection():
+    server = LocalSMTP()
+    server.drop_after = 1
+    channel = smtp_channel(server)
+    dispatcher = AlertDispatcher([channel], coalesce_seconds=0, max_retries=0).start()
+    for i in range(3):
+        dispatcher.submit(f"alert {i}")
+        assert dispatcher.flush(5)
+        time.sleep(0.05)
+    dispatcher.stop()
+    server.close()
+    assert len(server.messages) == 3 and channel.connections == 3
+    assert dispatcher.stats()["failures"] == {"email": 0}
+
+
+def test_retries_with_exponential_backoff():
+    waits = []
+    channel = FlakyChannel(failures=3)
+    dispatcher = AlertDispatcher([channel], max_retries=3, backoff=0.5, backoff_max=1.5,
+                                 sleep=waits.append).start()
+    dispatcher.submit("help")
+    assert dispatcher.flush(5)
+    dispatcher.stop()
+    assert waits == [0.5, 1.0, 1.5]
+    assert len(channel.sent) == 1 and dispatcher.stats()["failures"] == {"flaky": 3}
+
+
+def test_burst_is_coalesced_after_the_first_delivery():
+    channel = SlowChannel(0.2)
+    dispatcher = AlertDispatcher([channel], coalesce_seconds=0.3).start()
+    dispatcher.submit("alert 0")
+    time.sleep(0.05)  # first alert is being delivered
+    for i in range(1, 6):
+        dispatcher.submit(f"alert {i}")
+    assert dispatcher.flush(5)
+    dispatcher.stop()
+    counts = [alert.count for alert in channel.sent]
+    assert counts == [1, 5]
+    assert channel.sent[1].messages == tuple(f"alert {i}" for i in range(1, 6))
+    assert dispatcher.stats()["coalesced"] == 4
+
+
+def test_full_queue_drops_and_counts():
+    dispatcher = AlertDispatcher([FlakyChannel(0)], max_queue=2)  # not started
+    assert dispatcher.submit("a") and dispatcher.submit("b")
+    assert not dispatcher.submit("c")
+    assert dispatcher.stats()["dropped"] == 1
+    dispatcher.start()
+    assert dispatcher.flush(5)
+    dispatcher.stop()
+
+
+def test_webhook_posts_json_to_local_stub():
+    received = []
+
+    class Hook(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Hook)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    dispatcher = AlertDispatcher([WebhookChannel(f"http://127.0.0.1:{server.server_address[1]}/alert",
+                                                 include_image=True)]).start()
+    dispatcher.submit("help", np.zeros((8, 8, 3), dtype=np.uint8), location="lobby")
+    assert dispatcher.flush(5)
+    dispatcher.stop()
+    server.shutdown()
+    server.server_close()
+    assert received[0]["message"] == "help" and received[0]["count"] == 1
+    assert received[0]["location"] == "lobby" and received[0]["image_jpeg"]
+
+
+def test_direct_sends_go_through_the_dispatcher_channels():
+    server = LocalSMTP()
+    engine = AlertEngine(channels=[smtp_channel(server)], coalesce_seconds=0)
+    assert engine.send_email_alert(np.zeros((8, 8, 3), dtype=np.uint8), "help")
+    assert engine.send_local_notification("help")  # no log channel configured: nothing to send
+    engine.close()
+    server.close()
+    assert len(server.messages) == 1 and server.messages[0].get_payload()[1].get_payload(decode=True)[:2] == b"\xff\xd8"
+
+    engine = AlertEngine()  # email not configured
+    assert not engine.send_email_alert(None, "help")
+    assert engine.send_local_notification("help")
+    engine.close()
+
+
+def test_queue_depth_is_reported_per_dispatcher():
+    from monitoring.metrics import ALERT_QUEUE_DEPTH
+    first = AlertDispatcher([FlakyChannel(0)], name="first")  # not started
+    second = AlertDispatcher([FlakyChannel(0)], name="second")
+    first.submit("a")
+    first.submit("b")
+    second.submit("c")
+    assert ALERT_QUEUE_DEPTH.labels(dispatcher="first").get() == 2
+    assert ALERT_QUEUE_DEPTH.labels(dispatcher="second").get() == 1
+    assert 'gesture_alert_queue_depth{dispatcher="first"} 2' in ALERT_QUEUE_DEPTH.render()
@@ -0,0 +1,140 @@
+import sys
+import json
+import threading
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+
+from alerts.evidence import EvidenceBuffer, EvidenceRecorder
+from detection.association import HandTrack
+from detection.offline import mjpeg_frame_offsets
+
+
+def _frame(i, size=(120, 160)):
+    rng = np.random.default_rng(i)
+    return rng.integers(0, 255, size + (3,), dtype=np.uint8)
+
+
+def test_buffer_is_capped_in_bytes_not_frames():
+    buffer = EvidenceBuffer(max_bytes=200_000, max_width=160, quality=90)
+    for i in range(100):
+        buffer.add(_frame(i), timestamp=float(i))
+    stats = buffer.stats()
+    assert stats["bytes"] <= 200_000 and stats["dropped"] == 100 - len(buffer)
+    assert 0 < len(buffer) < 100
+    kept = buffer.since(0.0)
+    assert kept[-1].timestamp == 99.0 and stats["bytes"] == sum(item.nbytes for item in kept)
+
+    # Smaller frames: more of them fit in the same budget.
+    small = EvidenceBuffer(max_bytes=200_000, max_width=160, quality=90)
+    for i in range(100):
+        small.add(_frame(i, (30, 40)), timestamp=float(i))
+    assert len(small) > len(buffer)
+
+
+def test_wide_frames_are_downscaled():
+    buffer = EvidenceBuffer(max_width=80)
+    item = buffer.add(_frame(0), timestamp=0.0)
+    decoded = cv2.imdecode(np.frombuffer(item.jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (60, 80, 3)
+
+
+def test_alert_writes_pre_and_post_event_clip_with_detections(tmp_path):
+    recorder = EvidenceRecorder(EvidenceBuffer(max_bytes=10_000_000), out_dir=tmp_path,
+                                pre_seconds=1.0, post_seconds=0.5, encode_backlog=100)
+    track = HandTrack(4, np.array([0.5, 0.5]), 7)
+    for i in range(48):  # 16 fps, exact in binary
+        t = 100.0 + i / 16
+        item = recorder.add(_frame(i), timestamp=t)
+        persons = [{"id": 7, "box": np.array([10, 20, 90, 110])}]
+        recorder.set_detections(item, persons, np.full((1, 21, 3), 0.25), [track])
+        if i == 30:
+            recorder.trigger("ALERT: Person ID 7 (hand 4) detected performing distress signal 3 times!")
+        if i == 32:
+            recorder.trigger("second alert")  # extends the clip in progress
+    recorder.close()
+
+    (clip_dir,) = list(tmp_path.iterdir())
+    assert recorder.last_written == clip_dir
+    metadata = json.loads((clip_dir / "metadata.json").read_text())
+    assert metadata["messages"][1] == "second alert" and metadata["fps"] == 16.0
+    # 1 s before the alert at frame 30 (from frame 14), until 0.5 s after the alert at frame 32 (frame 40).
+    assert metadata["frames"] == 27
+    assert len(mjpeg_frame_offsets(clip_dir / "clip.mjpeg")) == 27
+
+    detections = np.load(clip_dir / "detections.npz")
+    assert detections["frame_timestamp"][[0, -1]].tolist() == [100.875, 102.5]
+    assert detections["frame_inferred"].all()
+    assert detections["person_id"].tolist() == [7] * 27
+    assert detections["person_box"][0].tolist() == [10, 20, 90, 110]
+    assert detections["hand_owner"].tolist() == [7] * 27 and detections["hand_id"][0] == 4
+    assert detections["hand_landmarks"].shape == (27, 21, 3)
+
+
+def test_clip_is_finished_by_the_first_frame_after_the_window(tmp_path):
+    recorder = EvidenceRecorder(EvidenceBuffer(), out_dir=tmp_path, pre_seconds=0.5, post_seconds=0.5)
+    for i in range(5):
+        recorder.add(_frame(i), timestamp=i * 0.25)
+    recorder.trigger("help")  # at 1.0 s
+    for i in range(5, 9):
+        recorder.add(_frame(i), timestamp=i * 0.25)
+    recorder.flush()
+    assert recorder.stats()["clips_written"] == 1 and not recorder.stats()["recording"]
+    metadata = json.loads((recorder.last_written / "metadata.json").read_text())
+    assert metadata["frames"] == 5  # 0.5 .. 1.5 s; frames without detections
+    assert not np.load(recorder.last_written / "detections.npz")["frame_inferred"].any()
+    recorder.close()
+
+
+class GatedBuffer(EvidenceBuffer):
+    """Encodes only once released, so the test can look at a frame the writer has not reached yet."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+
+    def encode(self, item):
+        self.release.wait(5)
+        return super().encode(item)
+
+
+def test_recorder_encodes_on_the_writer_thread(tmp_path):
+    buffer = GatedBuffer(max_width=80)
+    recorder = EvidenceRecorder(buffer, out_dir=tmp_path)
+    frame = _frame(0)
+    item = recorder.add(frame, timestamp=0.0)
+    frame[:] = 0  # the caller draws on its frame
+    assert item.jpeg == b"" and recorder.stats()["bytes"] == frame.nbytes  # the raw copy counts until encoded
+    buffer.release.set()
+    recorder.close()
+    decoded = cv2.imdecode(np.frombuffer(item.jpeg, np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (60, 80, 3) and decoded.max() > 100  # encoded from the copy taken in add()
+    assert item.pixels is None and recorder.stats()["bytes"] == len(item.jpeg)
+
+
+def test_frames_waiting_to_be_encoded_count_against_the_cap(tmp_path):
+    frame_bytes = _frame(0).nbytes
+    buffer = GatedBuffer(max_bytes=3 * frame_bytes)
+    recorder = EvidenceRecorder(buffer, out_dir=tmp_path, encode_backlog=100)
+    items = [recorder.add(_frame(i), timestamp=float(i)) for i in range(10)]
+    stats = recorder.stats()
+    assert stats["frames"] == 3 and stats["bytes"] == 3 * frame_bytes and stats["dropped"] == 7
+    assert all(item.pixels is None for item in items[:7])  # evicted copies are released at once
+    buffer.release.set()
+    recorder.close()
+    assert [item.jpeg != b"" for item in items] == [False] * 7 + [True] * 3
+    assert recorder.stats()["bytes"] == sum(len(item.jpeg) for item in items[7:])
+
+
+def test_full_encode_backlog_drops_new_frames(tmp_path):
+    buffer = GatedBuffer()
+    recorder = EvidenceRecorder(buffer, out_dir=tmp_path, encode_backlog=2)
+    items = [recorder.add(_frame(i), timestamp=float(i)) for i in range(5)]
+    assert items[2:] == [None] * 3 and recorder.stats()["frames_dropped"] == 3
+    buffer.release.set()
+    recorder.flush()
+    assert recorder.add(_frame(5), timestamp=5.0) is not None  # slots are freed once encoded
+    recorder.close()
+    assert len(buffer) == 3
@@ -0,0 +1,124 @@
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pytest
+
+from model.feature_store import FeatureStore
+
+
+def _rows(n, seed=0, labels=("fist", "peace", "wave")):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, 63)).astype(np.float32), np.array(labels)[rng.integers(0, len(labels), n)]
+
+
+def _sorted_rows(X, y):
+    order = np.lexsort(X.T[::-1])
+    return X[order], y[order]
+
+
+def test_append_and_read_back_by_label(tmp_path):
+    store = FeatureStore(tmp_path, chunk_rows=64)
+    X1, y1 = _rows(40, 0)
+    X2, y2 = _rows(30, 1)
+    assert store.append(X1, y1) == 40
+    assert store.append(X2, "ok") == 30
+    assert len(store) == 70 and store.next_seq == 70
+    assert store.label_counts()["ok"] == 30
+    X, y = store.load()
+    expected = _sorted_rows(np.vstack([X1, X2]), np.concatenate([y1, ["ok"] * 30]))
+    np.testing.assert_array_equal(_sorted_rows(X, y)[0], expected[0])
+    assert (_sorted_rows(X, y)[1] == expected[1]).all()
+
+    Xf, yf = store.load(labels=["fist"])
+    assert set(yf) == {"fist"} and len(Xf) == (y1 == "fist").sum()
+    Xn, yn = store.load(min_seq=40)
+    assert len(Xn) == 30 and set(yn) == {"ok"}
+    chunk = next(store.iter_chunks())[0]
+    assert isinstance(chunk, np.memmap)
+
+
+def test_rejects_wrong_width(tmp_path):
+    store = FeatureStore(tmp_path)
+    with pytest.raises(ValueError):
+        store.append(np.zeros((3, 62)), "fist")
+
+
+def test_interrupted_append_is_invisible_and_cleaned_up(tmp_path):
+    store = FeatureStore(tmp_path)
+    store.append(*_rows(10))
+    # A crash after writing chunk files but before the manifest rename.
+    for suffix in ("X", "y", "seq"):
+        np.save(tmp_path / f"chunk_000099.{suffix}.npy", np.zeros(3))
+    (tmp_path / "manifest.json.tmp").write_text("{ partial")
+    reopened = FeatureStore(tmp_path)
+    assert len(reopened) == 10
+    reopened.append(*_rows(5, 1))
+    assert not list(tmp_path.glob("chunk_000099.*"))
+    assert len(FeatureStore(tmp_path)) == 15
+
+
+def test_two_writers_do_not_lose_appends(tmp_path):
+    a, b = FeatureStore(tmp_path), FeatureStore(tmp_path)
+    a.append(*_rows(10, 0))
+    b.append(*_rows(10, 1))
+    a.append(*_rows(10, 2))
+    assert len(FeatureStore(tmp_path)) == 30
+    assert json.loads((tmp_path / "manifest.json").read_text())["next_seq"] == 30
+
+
+def test_compaction_keeps_rows_and_sequence_numbers(tmp_path):
+    store = FeatureStore(tmp_path, chunk_rows=50)
+    for seed in range(6):
+        store.append(*_rows(20, seed))
+    before = _sorted_rows(*store.load())
+    recent = _sorted_rows(*store.load(min_seq=90))
+    assert store.compact() > 0
+    assert len(store.chunks) < 6
+    after = _sorted_rows(*store.load())
+    np.testing.assert_array_equal(before[0], after[0])
+    np.testing.assert_array_equal(recent[0], _sorted_rows(*store.load(min_seq=90))[0])
+    assert len(list(tmp_path.glob("chunk_*.X.npy"))) == len(store.chunks)
+
+
+def test_reader_with_old_manifest_survives_compaction_elsewhere(tmp_path):
+    writer = FeatureStore(tmp_path, chunk_rows=50)
+    for seed in range(6):
+        writer.append(*_rows(20, seed))
+    # Opened before the compaction, like the app's long-lived instance.
+    reader, sampler = FeatureStore(tmp_path, chunk_rows=50), FeatureStore(tmp_path, chunk_rows=50)
+    expected = _sorted_rows(*reader.load())
+    assert writer.compact() > 0
+    np.testing.assert_array_equal(_sorted_rows(*reader.load())[0], expected[0])
+    assert len(reader.chunks) == len(writer.chunks)  # the reader moved to the new manifest
+    X, y = sampler.sample(5, np.random.default_rng(0))
+    assert {label: (y == label).sum() for label in set(y)} == {"fist": 5, "peace": 5, "wave": 5}
+
+
+def test_sample_per_label_and_before_seq(tmp_path):
+    store = FeatureStore(tmp_path)
+    store.append(*_rows(300, 0))
+    store.append(np.ones((50, 63)), "fist")
+    X, y = store.sample(20, np.random.default_rng(0))
+    assert {label: (y == label).sum() for label in set(y)} == {"fist": 20, "peace": 20, "wave": 20}
+    X, y = store.sample(1000, np.random.default_rng(0), labels=["fist"], max_seq=300)
+    assert len(X) == (_rows(300, 0)[1] == "fist").sum()
+    assert not (X == 1).all(axis=1).any()
+
+
+def test_import_npz_is_incremental(tmp_path):
+    dataset = tmp_path / "dataset"
+    dataset.mkdir()
+    X, y = _rows(50)
+    np.savez(dataset / "fist.npz", X=X, y=y)
+    store = FeatureStore(tmp_path / "store")
+    assert store.import_npz(dataset) == (50, [])
+    assert store.import_npz(dataset) == (0, [])
+    X2, y2 = _rows(10, 1)
+    np.savez(dataset / "fist.npz", X=np.vstack([X, X2]), y=np.concatenate([y, y2]))
+    assert store.import_npz(dataset) == (10, [])
+    np.savez(dataset / "fist.npz", X=X2, y=y2)
+    assert store.import_npz(dataset) == (0, ["fist.npz"])
+    assert len(store) == 60
@@ -0,0 +1,81 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from config import DEFAULT_MODEL_PATH, GESTURE_DISPLAY_NAMES
+from model.forest import CompiledForest
+from model.predict import load_model, predict_gesture, predict_gesture_batch
+
+
+def _fit(cls, n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 63))
+    y = np.array(["fist", "peace", "wave", "ok"])[(X[:, 0] > 0) + 2 * (X[:, 5] > 0.3)]
+    encoder = LabelEncoder()
+    model = cls(n_estimators=25, random_state=0).fit(X, encoder.fit_transform(y))
+    return model, encoder, rng.normal(size=(200, 63))
+
+
+@pytest.mark.parametrize("cls", [RandomForestClassifier, ExtraTreesClassifier])
+def test_probabilities_match_sklearn_exactly(cls):
+    model, encoder, X = _fit(cls)
+    forest = CompiledForest.from_sklearn(model, encoder)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(forest.predict(X), model.predict(X))
+    assert list(forest.labels) == list(encoder.classes_)
+
+
+def test_single_vector_and_batch_agree():
+    model, encoder, X = _fit(RandomForestClassifier)
+    forest = CompiledForest.from_sklearn(model, encoder)
+    batch = predict_gesture_batch(forest, encoder, X)
+    singles = [predict_gesture(forest, encoder, x) for x in X]
+    assert batch == singles
+    reference = [predict_gesture(model, encoder, x) for x in X]
+    assert singles == reference
+    assert singles[0][0] == GESTURE_DISPLAY_NAMES.get(encoder.inverse_transform([model.predict(X[:1])[0]])[0])
+
+
+@pytest.mark.skipif(not DEFAULT_MODEL_PATH.exists(), reason="no saved model")
+def test_saved_model_is_compiled_and_faster():
+    forest, encoder = load_model()
+    model, _ = load_model(compiled=False)
+    assert isinstance(forest, CompiledForest)
+    X = np.random.default_rng(1).random((300, model.n_features_in_)).astype(np.float32)
+    assert np.array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+    def per_call(fn, x, n):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn(x)
+        return (time.perf_counter() - t0) / n
+
+    sklearn_s = per_call(lambda x: predict_gesture(model, encoder, x), X[0], 20)
+    compiled_s = per_call(lambda x: predict_gesture(forest, encoder, x), X[0], 200)
+    assert compiled_s * 10 < sklearn_s
+
+
+def test_merge_remaps_classes_onto_label_union():
+    from model.forest import merge_forests
+    model_a, encoder_a, X = _fit(RandomForestClassifier)
+    rng = np.random.default_rng(3)
+    Xb = rng.normal(size=(200, 63))
+    yb = np.array(["rock", "fist"])[(Xb[:, 2] > 0).astype(int)]
+    encoder_b = LabelEncoder()
+    model_b = RandomForestClassifier(n_estimators=5, random_state=0).fit(Xb, encoder_b.fit_transform(yb))
+    a = CompiledForest.from_sklearn(model_a, encoder_a)
+    b = CompiledForest.from_sklearn(model_b, encoder_b)
+    merged = merge_forests([a, b])
+    assert list(merged.labels) == sorted(set(a.labels) | set(b.labels))
+    assert merged.n_trees == a.n_trees + b.n_trees
+    expected = np.zeros((len(X), len(merged.labels)))
+    for forest in (a, b):
+        columns = [list(merged.labels).index(label) for label in forest.labels]
+        expected[:, columns] += forest.predict_proba(X) * forest.n_trees
+    np.testing.assert_allclose(merged.predict_proba(X), expected / merged.n_trees)
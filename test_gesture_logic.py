@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from detection.gesture_logic import is_distress_signal
 
 def test_gestures():
@@ -27,5 +28,48 @@ def test_gestures():
     
     print(f"Distress Signal: {is_distress_signal(lms_distress)}")
 
+
+
+def _distress_hand(curl=0.1, tuck=0.05):
+    lms = np.zeros((21, 3))
+    lms[0] = [0.5, 0.9, 0.0]
+    for mcp in [5, 9, 13, 17]:
+        lms[mcp] = [0.5 + (mcp - 11) * 0.02, 0.5, 0.0]
+    for tip, pip in [(8, 6), (12, 10), (16, 14), (20, 18)]:
+        lms[pip] = [0.5, 0.6, 0.0]
+        lms[tip] = [0.5, 0.6 + curl, 0.0]
+    lms[4] = [0.55, 0.5 + tuck, 0.0]
+    return lms
+
+
+def test_batch_matches_single_hand_and_grades_confidence():
+    from detection.gesture_logic import is_distress_signal_batch
+    open_palm = np.array([[0.5, 0.5 - i * 0.01, 0.0] for i in range(21)])
+    loose, tight = _distress_hand(curl=0.01, tuck=0.01), _distress_hand(curl=0.1, tuck=0.05)
+    no_hand = np.full((21, 3), np.nan)
+    hands = np.stack([open_palm, loose, tight, no_hand, np.zeros((21, 3))])
+
+    flags, conf = is_distress_signal_batch(hands)
+    assert flags.tolist() == [False, True, True, False, False]
+    assert conf[0] == conf[3] == conf[4] == 0.0
+    assert 0.5 < conf[1] < conf[2] <= 1.0
+    for lms, f, c in zip(hands[:3], flags, conf):
+        assert is_distress_signal(lms) == (bool(f), pytest.approx(float(c)))
+
+    empty_flags, empty_conf = is_distress_signal_batch(np.zeros((0, 21, 3)))
+    assert empty_flags.shape == empty_conf.shape == (0,)
+
+
+def test_loosely_detected_fist_still_counts_towards_an_alert():
+    from detection.gesture_logic import is_distress_signal_batch
+    from detection.verification import VerificationEngine
+    # Barely detected: fingertips and thumb just past their joints.
+    flags, conf = is_distress_signal_batch(_distress_hand(curl=0.005, tuck=0.005)[None])
+    assert flags[0]
+    verifier = VerificationEngine(threshold_count=3)  # confidence floor from config
+    results = [verifier.update(1, True, float(conf[0])) for _ in range(3)]
+    assert results[-1][0]
+
+
 if __name__ == "__main__":
     test_gestures()
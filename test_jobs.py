@@ -0,0 +1,176 @@
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from model.jobs import TrainingJobQueue, SUCCEEDED, FAILED, CANCELLED
+from model.registry import ModelRegistry
+
+
+# Trainers run in a spawned worker process, so they must be module-level functions.
+def train_ok(progress, should_cancel):
+    for i in range(5):
+        progress((i + 1) / 5, "fitting")
+    return True, "trained"
+
+
+def train_fail(progress, should_cancel):
+    return False, "Not enough data."
+
+
+def train_instant(progress, should_cancel):
+    return True, "trained"
+
+
+def train_up_to_date(progress, should_cancel):
+    return True, "No new samples since the last training run. Model is up to date.", False
+
+
+def train_raises(progress, should_cancel):
+    raise RuntimeError("boom")
+
+
+def train_until_cancelled(progress, should_cancel):
+    for _ in range(600):
+        if should_cancel():
+            return False, "Training cancelled."
+        progress(0.5, "fitting")
+        time.sleep(0.05)
+    return True, "not cancelled"
+
+
+def _queue(trainer, registry):
+    return TrainingJobQueue(registry=registry, trainer=trainer, loader=lambda: ("new-model", "new-encoder"), poll=0.05)
+
+
+def test_registry_publish_and_rollback():
+    registry = ModelRegistry()
+    assert registry.rollback() is None
+    v1 = registry.publish("m1", "e1", source="disk")
+    v2 = registry.publish("m2", "e2", source="training", job_id="abc")
+    assert registry.current is v2 and (v2.model, v2.encoder) == ("m2", "e2")
+    assert [v["current"] for v in registry.versions()] == [False, True]
+    assert registry.versions()[1]["job_id"] == "abc"
+    assert registry.rollback() is v1
+    assert registry.current is v1
+    assert registry.rollback() is None
+    assert registry.publish("m3", "e3").version == 3
+
+
+def test_readers_always_see_matching_model_and_encoder():
+    registry = ModelRegistry(keep=2)
+    registry.publish(0, 0)
+    stop = threading.Event()
+    mismatches = []
+
+    def reader():
+        while not stop.is_set():
+            version = registry.current
+            if version.model != version.encoder:
+                mismatches.append(version)
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for i in range(1, 2000):
+        registry.publish(i, i)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert not mismatches
+
+
+def test_successful_job_publishes_new_version():
+    registry = ModelRegistry()
+    registry.publish("old", "old-encoder", source="disk")
+    jobs = _queue(train_ok, registry)
+    job = jobs.submit()
+    assert jobs.wait(job.id, timeout=60).status == SUCCEEDED
+    assert job.progress == 1.0 and job.message == "trained"
+    assert registry.current.model == "new-model" and job.model_version == registry.current.version
+    jobs.close()
+
+
+class _InlineProcess:
+    """Runs the worker at start(), so it has always exited before the queue is read."""
+
+    def __init__(self, target, args, daemon):
+        self.target, self.args, self.exitcode = target, args, None
+
+    def start(self):
+        self.target(*self.args)
+        self.exitcode = 0
+
+    def is_alive(self):
+        return False
+
+    def join(self):
+        pass
+
+
+class _LaggingQueue(queue.Queue):
+    """Its first get() times out although the worker's result is already queued."""
+
+    lagged = False
+
+    def get(self, block=True, timeout=None):
+        if not self.lagged:
+            self.lagged = True
+            raise queue.Empty
+        return super().get(block, timeout)
+
+
+class _InlineContext:
+    Queue = _LaggingQueue
+    Process = _InlineProcess
+    Event = threading.Event
+
+
+def test_result_posted_after_get_timed_out_is_read():
+    registry = ModelRegistry()
+    registry.publish("old", "old-encoder")
+    jobs = _queue(train_instant, registry)
+    jobs._ctx = _InlineContext()
+    job = jobs.wait(jobs.submit().id, timeout=60)
+    assert job.status == SUCCEEDED and registry.current.model == "new-model"
+    jobs.close()
+
+
+def test_up_to_date_run_does_not_publish():
+    registry = ModelRegistry()
+    current = registry.publish("old", "old-encoder")
+    jobs = _queue(train_up_to_date, registry)
+    job = jobs.wait(jobs.submit().id, timeout=60)
+    assert job.status == SUCCEEDED and job.model_version == current.version
+    assert registry.current is current and len(registry.versions()) == 1
+    jobs.close()
+
+
+def test_failed_jobs_keep_current_model():
+    registry = ModelRegistry()
+    current = registry.publish("old", "old-encoder")
+    for trainer, message in ((train_fail, "Not enough data."), (train_raises, "Training failed: boom")):
+        jobs = _queue(trainer, registry)
+        job = jobs.wait(jobs.submit().id, timeout=60)
+        assert job.status == FAILED and job.message == message
+        assert registry.current is current
+        jobs.close()
+
+
+def test_cancel_running_and_queued_jobs():
+    registry = ModelRegistry()
+    current = registry.publish("old", "old-encoder")
+    jobs = _queue(train_until_cancelled, registry)
+    running = jobs.submit()
+    queued = jobs.submit()
+    deadline = time.monotonic() + 60
+    while running.stage != "fitting" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert jobs.cancel(queued.id) and queued.status == CANCELLED
+    assert jobs.cancel(running.id)
+    assert jobs.wait(running.id, timeout=60).status == CANCELLED
+    assert not jobs.cancel(running.id)
+    assert registry.current is current
+    jobs.close()
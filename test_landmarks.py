@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2, classification_pb2
+from detection.landmarks import HandLandmarker, LEFT, RIGHT
+
+
+def _fake_results(hands, labels):
+    landmark_lists, handedness = [], []
+    for arr, label in zip(hands, labels):
+        lms = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in arr:
+            lm = lms.landmark.add()
+            lm.x, lm.y, lm.z = float(x), float(y), float(z)
+        landmark_lists.append(lms)
+        cls = classification_pb2.ClassificationList()
+        c = cls.classification.add()
+        c.label, c.score = label, 0.75
+        handedness.append(cls)
+    return SimpleNamespace(multi_hand_landmarks=landmark_lists or None,
+                           multi_handedness=handedness or None)
+
+
+class FakeHands:
+    def __init__(self, results):
+        self.results = results
+
+    def process(self, frame):
+        return self.results
+
+    def close(self):
+        pass
+
+
+def test_process_batch_fills_reused_buffer():
+    rng = np.random.default_rng(0)
+    hands = rng.random((2, 21, 3)).astype(np.float32)
+    landmarker = HandLandmarker(max_num_hands=2)
+    landmarker.hands.close()
+    landmarker.hands = FakeHands(_fake_results(hands, ["Right", "Left"]))
+
+    batch = landmarker.process_batch(None)
+    assert len(batch) == 2
+    assert batch.landmarks.dtype == np.float32
+    np.testing.assert_allclose(batch.landmarks, hands, rtol=1e-6)
+    assert batch.handedness.tolist() == [RIGHT, LEFT]
+    assert batch.handedness_names() == ["Right", "Left"]
+    np.testing.assert_allclose(batch.scores, [0.75, 0.75])
+
+    kept = landmarker.process(None)
+    landmarker.hands = FakeHands(_fake_results([], []))
+    assert len(landmarker.process_batch(None)) == 0
+    # process() returns copies that survive the next call.
+    np.testing.assert_allclose(np.stack(kept), hands, rtol=1e-6)
@@ -0,0 +1,48 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from monitoring.metrics import Registry, Counter, Gauge, Histogram, RateMeter
+
+
+def test_prometheus_text_format():
+    registry = Registry()
+    frames = Counter("frames_total", "Frames.", registry=registry)
+    clients = Gauge("clients", "Clients.", registry=registry)
+    latency = Histogram("stage_seconds", "Stage time.", ["stage"], buckets=(0.01, 0.1), registry=registry)
+    frames.inc(3)
+    clients.inc()
+    latency.labels(stage="landmarks").observe(0.005)
+    latency.labels(stage="landmarks").observe(0.05)
+    latency.labels(stage="landmarks").observe(1.0)
+
+    text = registry.render()
+    assert "# TYPE frames_total counter\nframes_total 3\n" in text
+    assert "clients 1" in text
+    assert 'stage_seconds_bucket{stage="landmarks",le="0.01"} 1' in text
+    assert 'stage_seconds_bucket{stage="landmarks",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="landmarks",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="landmarks"} 3' in text
+
+
+def test_gauge_callback_and_rate_meter():
+    gauge = Gauge("queue_depth", "Depth.", registry=False)
+    gauge.set_function(lambda: 7)
+    assert gauge.render()[-1] == "queue_depth 7"
+
+    meter = RateMeter()
+    for i in range(10):
+        meter.tick(i * 0.1)
+    assert abs(meter.rate - 10.0) < 1e-6
+
+
+def test_observe_is_cheap():
+    hist = Histogram("hot_seconds", "Hot path.", registry=False)
+    n = 20000
+    start = time.perf_counter()
+    for _ in range(n):
+        hist.observe(0.003)
+    per_call = (time.perf_counter() - start) / n
+    assert hist.count == n
+    assert per_call < 20e-6
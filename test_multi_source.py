@@ -0,0 +1,93 @@
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+from detection.multi_source import MultiSourceEngine, parse_sources
+
+
+class FakeSourcePipeline:
+    """Yields a fixed number of frames labelled with the source it was opened for."""
+
+    def __init__(self, source, n_frames=5):
+        self.source = source
+        self.remaining = n_frames
+        self._last_landmarks = None
+
+    def read_frame(self):
+        if self.remaining == 0:
+            return None, "—", 0.0, "👋"
+        self.remaining -= 1
+        frame = np.zeros((24, 32, 3), dtype=np.uint8)
+        return frame, f"src-{self.source}", 0.5, "✊"
+
+    def release(self):
+        pass
+
+
+def make_fake_pipeline(source):
+    return FakeSourcePipeline(source)
+
+
+def test_parse_sources():
+    assert parse_sources("0, 1,rtsp://cam/stream") == [0, 1, "rtsp://cam/stream"]
+    assert parse_sources("") == []
+
+
+def test_engine_aggregates_all_sources():
+    sources = ["a.mp4", "b.mp4", "c.mp4"]
+    engine = MultiSourceEngine(sources, workers=2, pipeline_factory=make_fake_pipeline, queue_size=64).start()
+    deadline = time.time() + 30
+    while not engine.all_finished() and time.time() < deadline:
+        time.sleep(0.05)
+    stats = engine.stats()
+    engine.stop()
+
+    assert engine.all_finished()
+    assert stats["workers"] == 2
+    assert stats["frames"] == 15
+    for i, source in enumerate(sources):
+        latest = engine.latest(i)
+        assert latest["label"] == f"src-{source}"
+        assert latest["seq"] == 5
+        assert latest["jpeg"][:2] == b"\xff\xd8"
+
+
+class BrokenSourcePipeline(FakeSourcePipeline):
+    """Fails on its third read, like a camera that disconnects."""
+
+    def read_frame(self):
+        if self.remaining == 2:
+            raise OSError("device disconnected")
+        return super().read_frame()
+
+
+def make_pipeline_with_broken_source(source):
+    return BrokenSourcePipeline(source) if source == "bad.mp4" else FakeSourcePipeline(source)
+
+
+def test_failing_source_does_not_stop_the_workers_other_sources():
+    engine = MultiSourceEngine(["bad.mp4", "good.mp4"], workers=1, queue_size=64,
+                               pipeline_factory=make_pipeline_with_broken_source).start()
+    deadline = time.time() + 30
+    while not engine.all_finished() and time.time() < deadline:
+        time.sleep(0.05)
+    engine.stop()
+
+    bad, good = engine.states[0], engine.states[1]
+    assert bad.finished and bad.error == "device disconnected" and bad.latest["seq"] == 3
+    assert good.finished and good.error is None and good.latest["seq"] == 5
+
+
+def test_wait_for_returns_once_a_source_is_finished_or_the_engine_stopped():
+    engine = MultiSourceEngine(["a.mp4"], pipeline_factory=make_fake_pipeline, queue_size=64).start()
+    deadline = time.time() + 30
+    while not engine.all_finished() and time.time() < deadline:
+        time.sleep(0.05)
+    start = time.time()
+    assert engine.wait_for(0, 4)["seq"] == 5  # results still newer than after_seq come first
+    assert engine.wait_for(0, 5, timeout=10) is None
+    engine.stop()
+    assert not engine.running and engine.wait_for(0, 5, timeout=10) is None
+    assert time.time() - start < 1.0
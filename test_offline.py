@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+from detection.offline import mjpeg_frame_offsets, plan_shards, iter_shard_frames, merge_results
+
+
+def _write_mjpeg(path, n):
+    with open(path, "wb") as f:
+        for i in range(n):
+            frame = np.full((16, 16, 3), i * 10, dtype=np.uint8)
+            f.write(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n")
+            f.write(cv2.imencode(".jpg", frame)[1].tobytes())
+            f.write(b"\r\n")
+
+
+def test_mjpeg_shards_cover_every_frame(tmp_path):
+    path = tmp_path / "feed.mjpeg"
+    _write_mjpeg(path, 7)
+    assert len(mjpeg_frame_offsets(path)) == 7
+    shards = plan_shards(path, shard_size=3)
+    assert [(s.start, s.stop) for s in shards] == [(0, 3), (3, 6), (6, 7)]
+    indices = [i for s in shards for i, frame, _ in iter_shard_frames(s)]
+    assert indices == list(range(7))
+
+
+def test_frame_directory_shards(tmp_path):
+    for i in range(4):
+        cv2.imwrite(str(tmp_path / f"{i:04d}.png"), np.zeros((8, 8, 3), dtype=np.uint8))
+    (tmp_path / "notes.txt").write_text("ignored")
+    shards = plan_shards(tmp_path, shard_size=10)
+    assert len(shards) == 1 and shards[0].stop == 4
+    assert len(list(iter_shard_frames(shards[0]))) == 4
+
+
+def test_merge_results_is_columnar():
+    lms = np.random.rand(21, 3).astype(np.float32)
+    result = {
+        "path": "a.mp4", "fps": 10.0, "frames": 2,
+        "columns": {"frame": [0, 1], "hand": [-1, 0], "label": [None, "Fist"],
+                    "confidence": [0.0, 0.8], "distress": [False, True],
+                    "distress_confidence": [0.0, 0.9],
+                    "landmarks": [np.full((21, 3), np.nan, dtype=np.float32), lms]},
+        "timings": {},
+    }
+    merged = merge_results([result])
+    assert list(merged["labels"]) == ["Fist"]
+    assert merged["label"].tolist() == [-1, 0]
+    assert np.allclose(merged["timestamp"], [0.0, 0.1])
+    assert merged["landmarks"].shape == (2, 21, 3)
+    assert merged["distress"].dtype == bool
+
+
+def _with_exif_thumbnail(jpeg, thumbnail):
+    """jpeg with an APP1 (EXIF) segment carrying a whole thumbnail JPEG, SOI to EOI."""
+    payload = b"Exif\x00\x00" + thumbnail
+    return jpeg[:2] + b"\xff\xe1" + (len(payload) + 2).to_bytes(2, "big") + payload + jpeg[2:]
+
+
+def test_mjpeg_frames_with_embedded_thumbnails_are_not_cut_short(tmp_path):
+    rng = np.random.default_rng(0)
+    thumbnail = cv2.imencode(".jpg", np.zeros((8, 8, 3), dtype=np.uint8))[1].tobytes()
+    frames = [_with_exif_thumbnail(cv2.imencode(".jpg", rng.integers(0, 255, (48, 64, 3), dtype=np.uint8))[1]
+                                   .tobytes(), thumbnail) for _ in range(3)]
+    path = tmp_path / "feed.mjpeg"
+    with open(path, "wb") as f:
+        for jpeg in frames:
+            f.write(b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + jpeg + b"\r\n")
+        f.write(frames[0][:len(frames[0]) // 2])  # a recording cut off mid-frame
+    offsets = mjpeg_frame_offsets(path)
+    assert [end - start for start, end in offsets] == [len(jpeg) for jpeg in frames]
+    shard = plan_shards(path, shard_size=10)[0]
+    assert [frame.shape for _, frame, _ in iter_shard_frames(shard)] == [(48, 64, 3)] * 3
+    (tmp_path / "empty.mjpeg").write_bytes(b"")
+    assert mjpeg_frame_offsets(tmp_path / "empty.mjpeg") == []
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+from benchmarks.harness import synthetic_hands
+from detection.overlay import draw_hands, draw_persons
+
+CONNECTIONS = [
+    (0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6), (6, 7), (7, 8),
+    (0, 9), (9, 10), (10, 11), (11, 12), (0, 13), (13, 14), (14, 15), (15, 16),
+    (0, 17), (17, 18), (18, 19), (19, 20), (5, 9), (9, 13), (13, 17),
+]
+
+
+def _draw_per_point(frame, hands):
+    """The original circle-and-line drawing, kept as the reference image."""
+    h, w = frame.shape[:2]
+    for hand in hands:
+        pts = [(int(lm[0] * w), int(lm[1] * h)) for lm in hand]
+        for pt in pts:
+            cv2.circle(frame, pt, 4, (0, 255, 0), -1)
+        for i, j in CONNECTIONS:
+            cv2.line(frame, pts[i], pts[j], (0, 255, 0), 2)
+    return frame
+
+
+def test_batched_hands_match_per_point_drawing():
+    hands = synthetic_hands(3, seed=1)
+    expected = _draw_per_point(np.zeros((480, 640, 3), np.uint8), hands)
+    actual = draw_hands(np.zeros((480, 640, 3), np.uint8), hands)
+    assert np.array_equal(actual, expected)
+
+
+def test_batched_boxes_match_rectangles():
+    persons = [{"id": 1, "box": np.array([10, 20, 200, 300])},
+               {"id": 7, "box": np.array([150, 40, 400, 460])}]
+    expected = np.zeros((480, 640, 3), np.uint8)
+    for p in persons:
+        x1, y1, x2, y2 = p["box"]
+        cv2.rectangle(expected, (x1, y1), (x2, y2), (255, 0, 0), 2)
+        cv2.putText(expected, f"Person {p['id']}", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
+    actual = draw_persons(np.zeros((480, 640, 3), np.uint8), persons)
+    assert np.array_equal(actual, expected)
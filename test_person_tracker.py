@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from detection.box_tracking import BoxKalman
+from detection.person_tracker import PersonTracker
+
+
+class _Array:
+    def __init__(self, values):
+        self.values = np.asarray(values)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+    def int(self):
+        return _Array(self.values.astype(int))
+
+    def tolist(self):
+        return self.values.tolist()
+
+
+class _Boxes:
+    def __init__(self, ids, xyxy):
+        self.id = _Array(ids) if len(ids) else None
+        self.xyxy = _Array(xyxy)
+
+
+class FakeYolo:
+    """Two people walking at constant velocity; the frame index is stored in pixel (0, 0)."""
+
+    def __init__(self):
+        self.calls = 0
+
+    @staticmethod
+    def truth(i):
+        return np.array([[100 + 4 * i, 50, 180 + 4 * i, 250],
+                         [400 - 3 * i, 60 + i, 470 - 3 * i, 240 + i]], dtype=np.float32)
+
+    def track(self, frame, persist, classes, verbose):
+        self.calls += 1
+        return [type("Result", (), {"boxes": _Boxes([11, 12], self.truth(int(frame[0, 0, 0])))})()]
+
+
+def _frame(i, value=60):
+    frame = np.full((48, 64, 3), value, dtype=np.uint8)
+    frame[0, 0, 0] = i
+    return frame
+
+
+def test_detect_mode_runs_yolo_every_frame():
+    yolo = FakeYolo()
+    tracker = PersonTracker(model=yolo, mode="detect")
+    for i in range(6):
+        results, persons = tracker.track(_frame(i))
+        assert results is not None and [p["id"] for p in persons] == [11, 12]
+    assert yolo.calls == 6
+
+
+def test_propagate_mode_keeps_ids_and_follows_constant_motion():
+    yolo = FakeYolo()
+    tracker = PersonTracker(model=yolo, mode="propagate", detect_interval=5, max_uncertainty=10.0)
+    errors = []
+    for i in range(40):
+        results, persons = tracker.track(_frame(i))
+        assert [p["id"] for p in persons] == [11, 12]
+        assert all(p["box"].dtype.kind == "i" and p["box"].shape == (4,) for p in persons)
+        if results is None and i >= 20:  # velocity has converged
+            errors.append(np.abs(np.array([p["box"] for p in persons]) - FakeYolo.truth(i)).max())
+    assert yolo.calls == 8
+    assert tracker.stats()["redetect_reasons"] == {"interval": 8, "motion": 0, "uncertainty": 0}
+    assert errors and max(errors) <= 6
+
+
+def test_motion_and_uncertainty_force_detection():
+    yolo = FakeYolo()
+    tracker = PersonTracker(model=yolo, mode="propagate", detect_interval=100, motion_threshold=0.05,
+                            max_uncertainty=10.0)
+    tracker.track(_frame(0))
+    tracker.track(_frame(1))
+    results, _ = tracker.track(_frame(2, value=200))  # lights on
+    assert results is not None and tracker.redetect_reasons["motion"] == 1
+
+    tracker = PersonTracker(model=FakeYolo(), mode="propagate", detect_interval=100, max_uncertainty=0.2)
+    for i in range(30):
+        tracker.track(_frame(i))
+    assert tracker.redetect_reasons["uncertainty"] >= 1
+
+
+def test_kalman_drops_lost_ids_and_starts_new_ones():
+    kalman = BoxKalman()
+    kalman.update([1, 2], [[0, 0, 10, 20], [50, 50, 60, 70]])
+    kalman.predict()
+    kalman.update([2, 3], [[52, 50, 62, 70], [100, 100, 110, 120]])
+    assert kalman.ids.tolist() == [2, 3]
+    assert np.allclose(kalman.boxes()[1], [100, 100, 110, 120])
+    assert kalman.uncertainty()[0] < kalman.uncertainty()[1]  # measured twice vs once
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+from detection.landmarks import HandBatch, RIGHT
+from detection.roi_tracking import RoiHandTracker, roi_from_landmarks
+
+
+class FakeLandmarker:
+    """Returns a fixed hand position in the coordinates of whatever image it is given."""
+
+    def __init__(self, frame_xy=None, score=0.9):
+        self.frame_xy = frame_xy  # full-frame pixel position of the wrist, or None for no hand
+        self.score = score
+        self.offset = lambda: (0, 0)
+        self.shapes = []
+
+    def process_batch(self, image):
+        self.shapes.append(image.shape[:2])
+        if self.frame_xy is None:
+            return HandBatch(np.zeros((0, 21, 3), np.float32), np.zeros(0, np.int8), np.zeros(0, np.float32))
+        h, w = image.shape[:2]
+        ox, oy = self.offset()
+        x, y = self.frame_xy[0] - ox, self.frame_xy[1] - oy
+        lms = np.zeros((1, 21, 3), np.float32)
+        lms[0, :, 0] = (x + np.arange(21)) / w
+        lms[0, :, 1] = (y + np.arange(21)) / h
+        return HandBatch(lms, np.array([RIGHT], np.int8), np.array([self.score], np.float32))
+
+    def close(self):
+        pass
+
+
+def _tracker(keyframe_interval=5):
+    tracker = RoiHandTracker(max_num_hands=1, keyframe_interval=keyframe_interval)
+    tracker.close()
+    tracker.full = FakeLandmarker((300, 200))
+    tracker.roi = FakeLandmarker((300, 200))
+    # The crop the tracker is about to take, so the fake can answer in crop coordinates.
+    tracker.roi.offset = lambda: roi_from_landmarks(tracker._last.landmarks, 640, 480, tracker.padding)[:2]
+    return tracker
+
+
+def test_roi_box_is_padded_and_clamped():
+    lms = np.zeros((1, 21, 3), np.float32)
+    lms[0, :, 0] = np.linspace(0.9, 0.99, 21)
+    lms[0, :, 1] = np.linspace(0.1, 0.2, 21)
+    x0, y0, x1, y1 = roi_from_landmarks(lms, 640, 480, padding=0.25)
+    assert x1 <= 640 and y0 >= 0
+    assert x1 - x0 == y1 - y0 >= 96
+
+
+def test_crops_are_mapped_back_to_full_frame():
+    tracker = _tracker()
+    frame = np.zeros((480, 640, 3), np.uint8)
+    first = tracker.process_batch(frame).copy()
+    assert tracker.keyframes == 1 and tracker.full.shapes == [(480, 640)]
+
+    x0, y0, x1, y1 = roi_from_landmarks(first.landmarks, 640, 480, tracker.padding)
+    second = tracker.process_batch(frame)
+    assert tracker.roi_frames == 1
+    assert tracker.roi.shapes == [(y1 - y0, x1 - x0)]
+    np.testing.assert_allclose(second.landmarks[..., :2], first.landmarks[..., :2], atol=1e-5)
+
+
+def test_keyframe_interval_and_fallback():
+    tracker = _tracker(keyframe_interval=3)
+    frame = np.zeros((480, 640, 3), np.uint8)
+    for _ in range(5):
+        tracker.process_batch(frame)
+    assert tracker.keyframes == 2
+
+    tracker.roi.frame_xy = None  # hand lost in the crop -> full-frame detection
+    tracker.process_batch(frame)
+    assert tracker.fallbacks == 1
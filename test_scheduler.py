@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+from detection.scheduler import MotionGatedScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(value):
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def test_static_scene_drops_to_idle_rate():
+    clock = FakeClock()
+    scheduler = MotionGatedScheduler(motion_threshold=0.01, idle_fps=2.0, active_hold=1.0, clock=clock)
+    decisions = []
+    for i in range(60):  # two seconds at 30 fps of an unchanging frame
+        clock.now = i / 30
+        decisions.append(scheduler.should_infer(_frame(50)))
+        if decisions[-1]:
+            scheduler.report(found=False, infer_seconds=0.02)
+    assert sum(decisions) == 4  # first frame, then every 0.5 s
+    stats = scheduler.stats()
+    assert stats["skipped"] == 56
+    assert abs(stats["cpu_saved_s"] - 56 * 0.02) < 1e-6
+
+
+def test_motion_and_hands_restore_full_rate():
+    clock = FakeClock()
+    scheduler = MotionGatedScheduler(motion_threshold=0.01, idle_fps=1.0, active_hold=0.5, clock=clock)
+    scheduler.should_infer(_frame(50))
+    clock.now = 0.1
+    assert not scheduler.should_infer(_frame(50))
+    clock.now = 0.2
+    assert scheduler.should_infer(_frame(120))  # motion
+    clock.now = 0.3
+    assert scheduler.should_infer(_frame(120))  # still within the hold window
+
+    clock.now = 0.8
+    assert not scheduler.should_infer(_frame(120))
+    clock.now = 1.3
+    assert scheduler.should_infer(_frame(120))  # idle-rate inference
+    scheduler.report(found=True)
+    clock.now = 1.35
+    assert scheduler.should_infer(_frame(120))  # a hand keeps it active
@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pytest
+
+from model.bundle import load_bundle
+from model.compiled import CompiledLinear
+from model.feature_store import FeatureStore
+from model.selection import prepare_folds, select_model
+from model.train import TrainPaths, load_manifest, train
+
+LABELS = ["fist", "peace", "wave"]
+CANDIDATES = [
+    {"name": "rf_20", "family": "rf", "params": {"n_estimators": 20}},
+    {"name": "et_10_d6", "family": "et", "params": {"n_estimators": 10, "max_depth": 6}},
+    {"name": "logistic_c1", "family": "logistic", "params": {"C": 1.0}},
+]
+
+
+def _samples(n, seed):
+    rng = np.random.default_rng(seed)
+    centers = {label: np.random.default_rng(sum(map(ord, label))).normal(size=63) for label in LABELS}
+    y = np.array(LABELS)[rng.integers(0, len(LABELS), n)]
+    X = np.stack([centers[label] for label in y]) + rng.normal(scale=0.3, size=(n, 63))
+    return X.astype(np.float32), y
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FeatureStore(tmp_path / "store")
+    store.append(*_samples(300, 0))
+    return store
+
+
+def test_folds_are_cached_until_the_store_changes(store, tmp_path):
+    cache = tmp_path / "cache"
+    path = prepare_folds(store, 5, cache)
+    folds = np.load(path / "folds.npy")
+    assert sorted(np.unique(folds)) == list(range(5))
+    assert prepare_folds(store, 5, cache) == path
+    mtime = (path / "X.npy").stat().st_mtime_ns
+    assert prepare_folds(store, 5, cache) == path and (path / "X.npy").stat().st_mtime_ns == mtime
+
+    store.append(*_samples(30, 1))
+    new_path = prepare_folds(store, 5, cache)
+    assert new_path != path and not path.exists()
+    assert len(np.load(new_path / "y.npy")) == 330
+
+
+def test_picks_fastest_candidate_above_floor(store, tmp_path):
+    stages = []
+    selection = select_model(store, CANDIDATES, n_folds=3, floor=0.9, workers=2, cache_dir=tmp_path / "cache",
+                             progress=lambda fraction, stage: stages.append(stage))
+    assert selection.floor_met
+    ranking = {r["name"]: r for r in selection.ranking}
+    assert set(ranking) == {spec["name"] for spec in CANDIDATES}
+    assert all(r["accuracy"] >= 0.9 and r["latency_ms"] > 0 for r in ranking.values())
+    assert selection.name == min(ranking.values(), key=lambda r: r["latency_ms"])["name"]
+    assert "cross-validating" in stages and "measuring latency" in stages
+
+    unreachable = select_model(store, CANDIDATES, n_folds=3, floor=1.1, workers=2, cache_dir=tmp_path / "cache")
+    assert not unreachable.floor_met and unreachable.name == unreachable.ranking[0]["name"]
+
+
+def test_cancel_returns_none(store, tmp_path):
+    assert select_model(store, CANDIDATES, n_folds=3, workers=1, cache_dir=tmp_path / "cache",
+                        should_cancel=lambda: True) is None
+
+
+def test_train_select_mode_publishes_choice(tmp_path, monkeypatch):
+    monkeypatch.setattr("model.train.select_model",
+                        lambda store, **kw: select_model(store, [CANDIDATES[2]], n_folds=3, workers=1, **kw))
+    dataset = tmp_path / "dataset"
+    dataset.mkdir()
+    np.savez(dataset / "session_0.npz", **dict(zip("Xy", _samples(300, 0))))
+    paths = TrainPaths(dataset, tmp_path / "store", tmp_path / "m.pkl", tmp_path / "e.pkl", tmp_path / "m.gmb",
+                       tmp_path / "manifest.json", tmp_path / "cache")
+
+    ok, message = train(mode="select", paths=paths)
+    assert ok and "Selected logistic_c1" in message and "(select, 300 samples" in message, message
+    assert isinstance(load_bundle(paths.bundle)[0], CompiledLinear)
+    manifest = load_manifest(paths.manifest)
+    assert manifest["model_spec"]["name"] == "logistic_c1"
+    assert manifest["selection"]["chosen"] == "logistic_c1"
+
+    # A linear model cannot take extra trees: new rows trigger a full rebuild of the same spec.
+    np.savez(dataset / "session_1.npz", **dict(zip("Xy", _samples(50, 1))))
+    ok, message = train(paths=paths)
+    assert ok and "(full, 350 samples" in message
+    run = load_manifest(paths.manifest)["history"][-1]
+    assert (run["reason"], run["model"]) == ("model family does not support incremental updates", "logistic_c1")
+    assert isinstance(load_bundle(paths.bundle)[0], CompiledLinear)
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from detection.temporal import TemporalEngine
+
+
+def _hand(x, y=0.5, size=0.1):
+    """Flat open hand with the wrist at (x, y) and fingers pointing up."""
+    rng = np.random.default_rng(0)
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, 0] = x + rng.uniform(-0.3, 0.3, 21) * size
+    points[:, 1] = y - rng.uniform(0.0, 1.5, 21) * size
+    points[0, :2] = (x, y)
+    points[9, :2] = (x, y - size)
+    return points
+
+
+def test_waving_hand_is_recognised():
+    engine = TemporalEngine(window=24, vote_frames=8, min_hold=3, wave_reversals=3, wave_speed=0.08)
+    outputs = []
+    for t in range(60):  # 2 s at 30 fps, 2.5 Hz side-to-side swing of one hand length
+        x = 0.5 + 0.05 * np.sin(2 * np.pi * 2.5 * t / 30)
+        outputs.append(engine.update(0, _hand(x), "Open Palm", 0.9, "🖐️"))
+    assert outputs[0][0] == "Open Palm"
+    label, conf, emoji = outputs[-1]
+    assert (label, emoji) == ("Wave", "👋") and conf >= 0.5
+    assert engine.history(0).reversals >= 3
+
+
+def test_still_hand_is_not_a_wave_and_flicker_is_smoothed():
+    engine = TemporalEngine(window=24, vote_frames=8, min_hold=3)
+    rng = np.random.default_rng(1)
+    labels = []
+    for t in range(90):
+        # Landmark jitter plus a classifier that is wrong on every fifth frame.
+        hand = _hand(0.5) + rng.normal(scale=0.001, size=(21, 3)).astype(np.float32)
+        raw = ("Peace", 0.55) if t % 5 == 4 else ("Thumbs Up", 0.8)
+        labels.append(engine.update(1, hand, raw[0], raw[1], "👍")[0])
+    assert set(labels) == {"Thumbs Up"}
+
+    # A real change of gesture wins after min_hold frames.
+    switched = [engine.update(1, _hand(0.5), "Peace", 0.9, "✌️")[0] for _ in range(10)]
+    assert switched[-1] == "Peace" and switched.index("Peace") >= 3
+
+
+def test_history_is_bounded_and_stale_hands_are_dropped():
+    engine = TemporalEngine(window=6, vote_frames=4, max_missing=2)
+    for t in range(50):
+        engine.update("a", _hand(0.3 + 0.001 * t), "Fist", 0.9, "✊")
+        engine.end_frame(("a",))
+    hist = engine.history("a")
+    assert hist.recent().shape == (6, 21, 3)
+    assert np.allclose(hist.recent()[-1, 0, 0], 0.3 + 0.049)
+    assert len(hist.scores) == 1
+
+    engine.update("b", _hand(0.6), "Fist", 0.9, "✊")
+    for _ in range(3):
+        engine.end_frame(("b",))
+    assert engine.stats()["hands"] == 1 and engine.history("a") is None
@@ -0,0 +1,161 @@
+import shutil
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import pytest
+
+import model.train as train_module
+from model.bundle import load_bundle
+from model.feature_store import FeatureStore
+from model.train import TrainPaths, load_manifest, train
+
+LABELS = ["fist", "peace", "wave"]
+
+
+def _samples(n, labels, seed):
+    rng = np.random.default_rng(seed)
+    centers = {label: np.random.default_rng(sum(map(ord, label))).normal(size=63) for label in labels}
+    y = np.array(labels)[rng.integers(0, len(labels), n)]
+    X = np.stack([centers[label] for label in y]) + rng.normal(scale=0.3, size=(n, 63))
+    return X.astype(np.float32), y
+
+
+def _write(path, X, y):
+    np.savez(path, X=X, y=y)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    dataset = tmp_path / "dataset"
+    dataset.mkdir()
+    _write(dataset / "session_0.npz", *_samples(300, LABELS, 0))
+    return TrainPaths(dataset, tmp_path / "store", tmp_path / "m.pkl", tmp_path / "e.pkl", tmp_path / "m.gmb",
+                      tmp_path / "manifest.json")
+
+
+def test_first_run_is_full_then_up_to_date(paths):
+    ok, message = train(paths=paths)
+    assert ok and "(full, 300 samples" in message
+    manifest = load_manifest(paths.manifest)
+    assert manifest["consumed_seq"] == 300
+    assert manifest["history"][-1]["mode"] == "full"
+    assert paths.model.exists() and paths.bundle.exists()
+    ok, message = train(paths=paths)
+    assert ok and "up to date" in message
+
+
+def test_new_shard_updates_incrementally(paths):
+    train(paths=paths)
+    _write(paths.dataset / "session_1.npz", *_samples(100, LABELS, 1))
+    ok, message = train(paths=paths)
+    assert ok and "100 new samples" in message
+    manifest = load_manifest(paths.manifest)
+    run = manifest["history"][-1]
+    assert (run["mode"], run["samples"], run["new_samples"]) == ("incremental", 400, 100)
+    assert run["accuracy"] > 0.9
+    forest, _ = load_bundle(paths.bundle)
+    assert forest.n_trees == train_module.N_ESTIMATORS + train_module.INCREMENTAL_TREES
+    assert list(forest.labels) == LABELS
+
+
+def test_appended_rows_are_the_only_new_samples(paths):
+    train(paths=paths)
+    X, y = _samples(300, LABELS, 0)
+    X2, y2 = _samples(40, LABELS, 2)
+    _write(paths.dataset / "session_0.npz", np.vstack([X, X2]), np.concatenate([y, y2]))
+    ok, message = train(paths=paths)
+    assert ok and "40 new samples" in message
+
+
+def test_new_label_or_recreated_store_forces_full_rebuild(paths):
+    train(paths=paths)
+    FeatureStore(paths.store).append(_samples(60, ["rock"], 3)[0], "rock")
+    train(paths=paths)
+    run = load_manifest(paths.manifest)["history"][-1]
+    assert (run["mode"], run["reason"]) == ("full", "new gesture labels")
+    assert "rock" in load_bundle(paths.bundle)[0].labels
+
+    shutil.rmtree(paths.store)
+    train(paths=paths)
+    assert load_manifest(paths.manifest)["history"][-1]["reason"] == "feature store was recreated"
+
+
+def test_rewritten_npz_is_skipped_and_reported(paths):
+    train(paths=paths)
+    _write(paths.dataset / "session_0.npz", *_samples(300, LABELS, 5))
+    ok, message = train(paths=paths)
+    assert ok and "Skipped rewritten dataset files: session_0.npz" in message
+    assert len(FeatureStore(paths.store)) == 300
+
+
+def test_periodic_full_rebuild(paths, monkeypatch):
+    monkeypatch.setattr(train_module, "FULL_REBUILD_EVERY", 1)
+    train(paths=paths)
+    for i in (1, 2):
+        _write(paths.dataset / f"session_{i}.npz", *_samples(50, LABELS, i))
+        train(paths=paths)
+    modes = [run["mode"] for run in load_manifest(paths.manifest)["history"]]
+    assert modes == ["full", "incremental", "full"]
+    assert load_bundle(paths.bundle)[0].n_trees == train_module.N_ESTIMATORS
+
+
+def test_cancel_leaves_model_and_manifest_untouched(paths):
+    train(paths=paths)
+    before = load_manifest(paths.manifest)
+    _write(paths.dataset / "session_1.npz", *_samples(100, LABELS, 1))
+    assert train(paths=paths, should_cancel=lambda: True) == (False, "Training cancelled.")
+    assert load_manifest(paths.manifest) == before
+
+
+def test_incremental_run_after_rollback_starts_from_the_restored_model(paths):
+    from model.registry import ModelRegistry
+    registry = ModelRegistry(persist_path=paths.bundle)
+    train(paths=paths)
+    v1 = registry.publish(*load_bundle(paths.bundle))
+    _write(paths.dataset / "session_1.npz", *_samples(100, LABELS, 1))
+    train(paths=paths)
+    registry.publish(*load_bundle(paths.bundle))
+    assert registry.versions()[1]["consumed_seq"] == 400
+
+    assert registry.rollback() is v1 and v1.info["consumed_seq"] == 300
+    assert load_manifest(paths.manifest)["consumed_seq"] == 400
+    _write(paths.dataset / "session_2.npz", *_samples(50, LABELS, 2))
+    ok, message = train(paths=paths)
+    assert ok and "150 new samples" in message
+    forest, _ = load_bundle(paths.bundle)
+    assert forest.n_trees == train_module.N_ESTIMATORS + train_module.INCREMENTAL_TREES
+
+
+def test_bundle_without_training_state_forces_full_rebuild(paths):
+    train(paths=paths)
+    forest, _ = load_bundle(paths.bundle)
+    train_module.save_bundle(forest, paths.bundle)  # as written before bundles recorded consumed_seq
+    _write(paths.dataset / "session_1.npz", *_samples(100, LABELS, 1))
+    train(paths=paths)
+    run = load_manifest(paths.manifest)["history"][-1]
+    assert (run["mode"], run["reason"]) == ("full", "saved model does not record which samples it was trained on")
+
+
+def test_rollback_writes_copied_arrays_and_waits_for_a_publish_in_progress(paths, monkeypatch):
+    import threading
+    import numpy as np
+    from model import registry as registry_module
+    registry = registry_module.ModelRegistry(persist_path=paths.bundle)
+    train(paths=paths)
+    v1 = registry.publish(*load_bundle(paths.bundle))
+    registry.publish(*load_bundle(paths.bundle))
+    written = []
+    monkeypatch.setattr(registry_module, "save_bundle", lambda model, path, **metadata: written.append(model))
+
+    with registry.lock:  # as TrainingJobQueue holds it while loading and publishing a new model
+        rollback = threading.Thread(target=registry.rollback)
+        rollback.start()
+        rollback.join(0.2)
+        assert rollback.is_alive() and not written
+    rollback.join(5)
+    assert registry.current is v1 and len(written) == 1
+    for name, arr in written[0].arrays().items():
+        mapped = v1.model.arrays()[name]
+        assert not np.shares_memory(arr, mapped) and np.array_equal(arr, mapped)
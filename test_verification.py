@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from detection.verification import VerificationEngine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make(**kwargs):
+    clock = FakeClock()
+    options = dict(threshold_count=3, time_window=20, min_confidence=0.8, cooldown=60, track_ttl=120)
+    options.update(kwargs)
+    return VerificationEngine(clock=clock, **options), clock
+
+
+def test_alert_after_threshold_detections_within_window():
+    verifier, clock = make()
+    assert verifier.update(1, True, 0.9) == (False, None)
+    clock.now += 5
+    assert verifier.update(1, True, 0.5) == (False, None)  # below min_confidence, not counted
+    assert verifier.update(1, True, 0.9) == (False, None)
+    clock.now += 5
+    ready, message = verifier.update(1, True, 0.9)
+    assert ready and message == "ALERT: Person ID 1 detected performing distress signal 3 times!"
+
+
+def test_detections_older_than_window_do_not_count():
+    verifier, clock = make()
+    verifier.update(1, True, 0.9)
+    verifier.update(1, True, 0.9)
+    clock.now += 21
+    assert verifier.update(1, True, 0.9) == (False, None)
+    assert len(verifier.tracks[1].times) == 1
+
+
+def test_cooldown_is_configurable_and_per_track():
+    verifier, clock = make(threshold_count=1, cooldown=10)
+    assert verifier.update(1, True, 0.9)[0]
+    clock.now += 9
+    assert verifier.update(1, True, 0.9) == (False, None)
+    assert verifier.update(2, True, 0.9)[0]  # other tracks are not held back
+    clock.now += 1
+    assert verifier.update(1, True, 0.9)[0]
+    assert verifier.stats()["alerts"] == 3
+
+
+def test_tracks_unseen_for_ttl_are_evicted():
+    verifier, clock = make(track_ttl=120)
+    for track_id in range(100):
+        verifier.update(track_id, False, 0.0)
+        clock.now += 1
+    assert len(verifier) == 100
+    clock.now += 50
+    verifier.update(99, False, 0.0)  # tracks 0..29 were last seen more than 120 s ago
+    assert len(verifier) == 70 and verifier.stats()["evicted"] == 30
+    assert list(verifier.tracks)[0] == 30 and list(verifier.tracks)[-1] == 99
+
+
+def test_ttl_never_shorter_than_cooldown():
+    verifier, clock = make(threshold_count=1, cooldown=60, track_ttl=5)
+    assert verifier.track_ttl == 60
+    assert verifier.update(1, True, 0.9)[0]
+    clock.now += 30
+    verifier.update(2, False, 0.0)
+    assert verifier.update(1, True, 0.9) == (False, None)  # still in cooldown, not forgotten
+
+
+def test_memory_bounded_under_track_churn():
+    verifier, clock = make()
+    for track_id in range(5000):
+        verifier.update(track_id, track_id % 2 == 0, 0.9)
+        clock.now += 0.5
+    # Only tracks seen in the last track_ttl seconds are kept.
+    assert len(verifier) <= 241
+    assert all(len(state.times) <= 3 for state in verifier.tracks.values())